@@ -1,18 +1,25 @@
 from django.contrib import admin
-from .models import Business, Category, Country, City, Review, BusinessImage
+from .models import Business, Category, Country, City, Review, BusinessImage, DuplicateScan, DuplicateGroup, AdminExport
 from .models_registration import BusinessRegistration, BusinessPhoto, BusinessClaim
 from .forms import BusinessForm, DuplicateCheckForm
+from .duplicates import active_duplicate_scan, enqueue_duplicate_scan
+from .admin_exports import (
+    KEEP_EXPORTS, admin_csv, csv_chunks, enqueue_admin_export, export_path, fail_abandoned_exports, stream_bytes,
+)
+from .merge import merge_businesses, resolve_merge_groups
+from .page_cache import invalidate_businesses
 from django.utils.html import format_html
 from django.urls import reverse, path
 from django.utils import timezone
 from django.template.response import TemplateResponse
 from django.db.models import Count, Q
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
+from django.core.paginator import Paginator
 from django.core.exceptions import ValidationError
-import csv
 import json
+import os
 from datetime import datetime
 from collections import defaultdict
 
@@ -286,6 +293,8 @@ class BusinessAdmin(admin.ModelAdmin):
     def mark_as_verified(self, request, queryset):
         """Mark selected businesses as verified"""
         updated = queryset.update(verified=True)
+        # update() sends no signals
+        invalidate_businesses(queryset.values_list('pk', 'city_id', 'category_id'))
         self.message_user(request, f"{updated} businesses marked as verified.", level=messages.SUCCESS)
     
     mark_as_verified.short_description = "✓ Mark as verified"
@@ -293,6 +302,7 @@ class BusinessAdmin(admin.ModelAdmin):
     def mark_as_unverified(self, request, queryset):
         """Mark selected businesses as unverified"""
         updated = queryset.update(verified=False)
+        invalidate_businesses(queryset.values_list('pk', 'city_id', 'category_id'))
         self.message_user(request, f"{updated} businesses marked as unverified.", level=messages.SUCCESS)
     
     mark_as_unverified.short_description = "✗ Mark as unverified"
@@ -414,6 +424,7 @@ class BusinessRegistrationAdmin(admin.ModelAdmin):
     approve_registrations.short_description = "Approve selected registrations"
     
     def reject_registrations(self, request, queryset):
+        # Pending registrations have no business listing yet, so no cached page shows them
         updated = queryset.filter(verification_status='pending').update(
             verification_status='rejected',
             reviewed_by=request.user,
@@ -460,21 +471,28 @@ class BusinessClaimAdmin(admin.ModelAdmin):
     actions = ['approve_claims', 'reject_claims']
     
     def approve_claims(self, request, queryset):
-        updated = queryset.filter(status='pending').update(
+        pending = queryset.filter(status='pending')
+        # Read before update(): afterwards the claims no longer match
+        businesses = list(pending.values_list('business_id', 'business__city_id', 'business__category_id'))
+        updated = pending.update(
             status='approved',
             reviewed_by=request.user,
             reviewed_at=timezone.now()
         )
+        invalidate_businesses(businesses)
         self.message_user(request, f'Approved {updated} business claims.')
     
     approve_claims.short_description = "Approve selected claims"
     
     def reject_claims(self, request, queryset):
-        updated = queryset.filter(status='pending').update(
+        pending = queryset.filter(status='pending')
+        businesses = list(pending.values_list('business_id', 'business__city_id', 'business__category_id'))
+        updated = pending.update(
             status='rejected',
             reviewed_by=request.user,
             reviewed_at=timezone.now()
         )
+        invalidate_businesses(businesses)
         self.message_user(request, f'Rejected {updated} business claims.')
     
     reject_claims.short_description = "Reject selected claims"
@@ -491,8 +509,11 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
         custom_urls = [
             path('business-stats/', self.admin_view(self.business_stats_view), name='business_stats'),
             path('export-data/', self.admin_view(self.export_data_view), name='export_data'),
+            path('export-data/<int:export_id>/status/', self.admin_view(self.export_status_view), name='export_status'),
+            path('export-data/<int:export_id>/download/', self.admin_view(self.export_download_view), name='export_download'),
             path('duplicate-detection/', self.admin_view(self.duplicate_detection_view), name='duplicate_detection'),
             path('duplicate-cleanup/', self.admin_view(self.duplicate_cleanup_view), name='duplicate_cleanup'),
+            path('duplicate-recompute/', self.admin_view(self.duplicate_recompute_view), name='duplicate_recompute'),
             path('duplicate-check-ajax/', self.admin_view(self.duplicate_check_ajax), name='duplicate_check_ajax'),
         ]
         return custom_urls + urls
@@ -556,7 +577,7 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
         return TemplateResponse(request, 'admin/business_stats.html', context)
 
     def duplicate_detection_view(self, request):
-        """Detect and display ALL duplicate businesses for manual confirmation"""
+        """Page through the stored duplicate groups for manual confirmation"""
         
         # Get filter parameters
         country_filter = request.GET.get('country', '')
@@ -564,204 +585,107 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
         threshold = int(request.GET.get('threshold', 2))
         show_type = request.GET.get('show_type', 'summary')  # summary, exact, name, address
         
-        # Build base query
-        base_query = Business.objects.select_related('city__country', 'category', 'owner')
+        scan = DuplicateScan.latest_completed()
+        active_scan = active_duplicate_scan()
+        
+        # Build base query over the stored groups
+        groups = DuplicateGroup.objects.filter(scan=scan, count__gte=threshold)
         if country_filter:
-            base_query = base_query.filter(city__country__code__iexact=country_filter)
+            groups = groups.filter(country_code__iexact=country_filter)
         if city_filter:
-            base_query = base_query.filter(city__name__icontains=city_filter)
-        
-        # Find exact duplicates (same name, city, address)
-        exact_duplicates = base_query.values(
-            'name', 'city', 'address'
-        ).annotate(
-            count=Count('id')
-        ).filter(count__gte=threshold).order_by('-count')
-        
-        # Find name duplicates in same city
-        name_duplicates = base_query.values(
-            'name', 'city'
-        ).annotate(
-            count=Count('id')
-        ).filter(count__gte=threshold).order_by('-count')
-        
-        # Find potential address duplicates
-        address_duplicates = base_query.exclude(
-            Q(address__isnull=True) | Q(address='')
-        ).values(
-            'address', 'city'
-        ).annotate(
-            count=Count('id')
-        ).filter(count__gte=threshold).order_by('-count')
-        
-        # Get detailed groups based on what user wants to see
-        detailed_groups = []
+            groups = groups.filter(city_name__icontains=city_filter)
         
-        if show_type == 'exact' or show_type == 'summary':
-            # Get ALL exact duplicate groups
-            for dup in exact_duplicates:
-                try:
-                    city = City.objects.get(id=dup['city'])
-                    businesses = base_query.filter(
-                        name=dup['name'],
-                        city=city,
-                        address=dup['address']
-                    ).order_by('created_at')
-                    
-                    if businesses.count() >= threshold:
-                        detailed_groups.append({
-                            'type': 'exact',
-                            'title': f"Exact Match: {dup['name']} in {city.name}",
-                            'description': f"Same name, city, and address: {dup['address'][:100]}...",
-                            'count': dup['count'],
-                            'businesses': businesses,
-                            'suggested_keep': businesses.first(),  # Keep oldest
-                            'suggested_remove': businesses[1:],   # Remove newer ones
-                        })
-                except City.DoesNotExist:
-                    continue
-        
-        if show_type == 'name' or show_type == 'summary':
-            # Get ALL name duplicate groups (excluding exact matches)
-            exact_pairs = set()
-            for dup in exact_duplicates:
-                exact_pairs.add((dup['name'], dup['city']))
-            
-            for dup in name_duplicates:
-                # Skip if this is already covered by exact duplicates
-                if (dup['name'], dup['city']) in exact_pairs:
-                    continue
-                
-                try:
-                    city = City.objects.get(id=dup['city'])
-                    businesses = base_query.filter(
-                        name=dup['name'],
-                        city=city
-                    ).order_by('created_at')
-                    
-                    if businesses.count() >= threshold:
-                        # Check if these have different addresses (legitimate different locations)
-                        addresses = businesses.values_list('address', flat=True).distinct()
-                        
-                        detailed_groups.append({
-                            'type': 'name',
-                            'title': f"Same Name: {dup['name']} in {city.name}",
-                            'description': f"Same business name, {len(addresses)} different addresses",
-                            'count': dup['count'],
-                            'businesses': businesses,
-                            'suggested_keep': None,  # Requires manual review
-                            'suggested_remove': [],
-                            'addresses': list(addresses),
-                            'needs_manual_review': True,
-                        })
-                except City.DoesNotExist:
-                    continue
-        
-        if show_type == 'address' or show_type == 'summary':
-            # Get ALL address duplicate groups (excluding exact matches)
-            exact_address_pairs = set()
-            for dup in exact_duplicates:
-                exact_address_pairs.add((dup['address'], dup['city']))
-            
-            for dup in address_duplicates:
-                # Skip if this is already covered by exact duplicates
-                if (dup['address'], dup['city']) in exact_address_pairs:
-                    continue
-                
-                try:
-                    city = City.objects.get(id=dup['city'])
-                    businesses = base_query.filter(
-                        address=dup['address'],
-                        city=city
-                    ).order_by('created_at')
-                    
-                    if businesses.count() >= threshold:
-                        # SMART ADDRESS DUPLICATE DETECTION
-                        business_names = businesses.values_list('name', flat=True).distinct()
-                        categories = businesses.values_list('category__name', flat=True).distinct()
-                        
-                        # Only flag as duplicates if businesses have SIMILAR names or categories
-                        # Different businesses at same address (shopping malls, etc.) are legitimate
-                        suspicious_pairs = []
-                        business_list = list(businesses)
-                        
-                        for i, business1 in enumerate(business_list):
-                            for business2 in business_list[i+1:]:
-                                # Check for similar names (fuzzy matching)
-                                name1_normalized = Business.normalize_business_name(business1.name)
-                                name2_normalized = Business.normalize_business_name(business2.name)
-                                
-                                # Flag as suspicious if:
-                                # 1. Very similar normalized names (likely duplicates)
-                                # 2. Same category and similar names
-                                # 3. Empty/generic names that could be duplicates
-                                is_suspicious = False
-                                
-                                # Similar names check
-                                if (len(name1_normalized) > 3 and len(name2_normalized) > 3):
-                                    similarity_ratio = len(set(name1_normalized.split()) & set(name2_normalized.split())) / max(len(name1_normalized.split()), len(name2_normalized.split()))
-                                    if similarity_ratio > 0.6:  # 60% word similarity
-                                        is_suspicious = True
-                                
-                                # Same category + some name similarity
-                                if business1.category == business2.category and business1.category:
-                                    if similarity_ratio > 0.3:  # Lower threshold for same category
-                                        is_suspicious = True
-                                
-                                # Generic or empty names
-                                if (len(name1_normalized) <= 3 or len(name2_normalized) <= 3 or
-                                    name1_normalized in ['business', 'shop', 'store', 'company'] or
-                                    name2_normalized in ['business', 'shop', 'store', 'company']):
-                                    is_suspicious = True
-                                
-                                if is_suspicious and (business1.id, business2.id) not in [(p[1].id, p[0].id) for p in suspicious_pairs]:
-                                    suspicious_pairs.append((business1, business2))
-                        
-                        # Only add to duplicate groups if we found suspicious pairs
-                        if suspicious_pairs:
-                            detailed_groups.append({
-                                'type': 'address',
-                                'title': f"Suspicious Address Duplicates: {dup['address'][:50]}... in {city.name}",
-                                'description': f"Same address with {len(suspicious_pairs)} potentially duplicate business pairs. Review carefully - different businesses at same location are legitimate.",
-                                'count': len(suspicious_pairs) * 2,  # Approximate count
-                                'businesses': businesses,
-                                'suggested_keep': None,  # Requires manual review
-                                'suggested_remove': [],
-                                'business_names': list(business_names),
-                                'needs_manual_review': True,
-                                'suspicious_pairs': suspicious_pairs,
-                                'warning': 'Multiple businesses at same address can be legitimate (shopping malls, office buildings, etc.)'
-                            })
-                except City.DoesNotExist:
-                    continue
-        
-        # Limit display for performance (show top 50 groups)
-        if show_type == 'summary':
-            detailed_groups = detailed_groups[:20]  # Summary shows top 20
-        else:
-            detailed_groups = detailed_groups[:100]  # Individual views show more
+        # Group counts per type in a single query
+        type_counts = dict(groups.values_list('group_type').annotate(total=Count('id')))
         
-        # Get countries and cities for filters
-        countries = Country.objects.filter(
-            cities__businesses__isnull=False
-        ).distinct().order_by('name')
+        if show_type in ('exact', 'name', 'address'):
+            groups = groups.filter(group_type=show_type)
+        
+        # Summary shows top 20 per page, individual views show more
+        paginator = Paginator(groups.order_by('-count', 'id'), 20 if show_type == 'summary' else 100)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        
+        # Load the businesses of every group on this page in one query
+        page_ids = {business_id for group in page_obj for business_id in group.business_ids}
+        businesses_by_id = {
+            str(business.id): business
+            for business in Business.objects.filter(id__in=page_ids).select_related('city__country', 'category', 'owner')
+        }
         
-        cities = City.objects.filter(
-            businesses__isnull=False
+        detailed_groups = []
+        for group in page_obj:
+            businesses = [businesses_by_id[i] for i in group.business_ids if i in businesses_by_id]
+            if len(businesses) < 2:
+                # Already cleaned up since the scan ran
+                continue
+            
+            if group.group_type == 'exact':
+                detailed_groups.append({
+                    'type': 'exact',
+                    'title': f"Exact Match: {group.name} in {group.city_name}",
+                    'description': f"Same name, city, and address: {group.address[:100]}...",
+                    'count': len(businesses),
+                    'businesses': businesses,
+                    'member_ids': ','.join(str(business.id) for business in businesses),
+                    'suggested_keep': businesses[0],  # Keep oldest
+                    'suggested_remove': businesses[1:],  # Remove newer ones
+                })
+            elif group.group_type == 'name':
+                detailed_groups.append({
+                    'type': 'name',
+                    'title': f"Same Name: {group.name} in {group.city_name}",
+                    'description': f"Same business name, {len(group.distinct_values)} different addresses",
+                    'count': len(businesses),
+                    'businesses': businesses,
+                    'member_ids': ','.join(str(business.id) for business in businesses),
+                    'suggested_keep': None,  # Requires manual review
+                    'suggested_remove': [],
+                    'addresses': group.distinct_values,
+                    'needs_manual_review': True,
+                })
+            else:
+                detailed_groups.append({
+                    'type': 'address',
+                    'title': f"Suspicious Address Duplicates: {group.address[:50]}... in {group.city_name}",
+                    'description': f"Same address with {len(group.suspicious_pairs)} potentially duplicate business pairs. Review carefully - different businesses at same location are legitimate.",
+                    'count': len(businesses),
+                    'businesses': businesses,
+                    'member_ids': ','.join(str(business.id) for business in businesses),
+                    'suggested_keep': None,  # Requires manual review
+                    'suggested_remove': [],
+                    'business_names': group.distinct_values,
+                    'needs_manual_review': True,
+                    'suspicious_pairs': [
+                        (businesses_by_id[a], businesses_by_id[b])
+                        for a, b in group.suspicious_pairs
+                        if a in businesses_by_id and b in businesses_by_id
+                    ],
+                    'warning': 'Multiple businesses at same address can be legitimate (shopping malls, office buildings, etc.)'
+                })
+        
+        # Countries present in the stored report for the filter dropdown
+        countries = Country.objects.filter(
+            code__in=DuplicateGroup.objects.filter(scan=scan).values('country_code')
         ).order_by('name')
         
+        filter_params = request.GET.copy()
+        filter_params.pop('page', None)
+        
         context = {
             'title': 'Duplicate Detection & Manual Confirmation',
-            'exact_count': exact_duplicates.count(),
-            'name_count': name_duplicates.count(), 
-            'address_count': address_duplicates.count(),
-            'exact_groups': exact_duplicates.count(),
-            'name_groups': name_duplicates.count(),
-            'address_groups': address_duplicates.count(),
+            'scan': scan,
+            'active_scan': active_scan,
+            'exact_count': type_counts.get('exact', 0),
+            'name_count': type_counts.get('name', 0),
+            'address_count': type_counts.get('address', 0),
+            'exact_groups': type_counts.get('exact', 0),
+            'name_groups': type_counts.get('name', 0),
+            'address_groups': type_counts.get('address', 0),
             'detailed_groups': detailed_groups,
+            'page_obj': page_obj,
+            'filter_query': filter_params.urlencode(),
             'show_type': show_type,
             'countries': countries,
-            'cities': cities,
             'current_country': country_filter,
             'current_city': city_filter,
             'current_threshold': threshold,
@@ -770,29 +694,42 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
         
         return TemplateResponse(request, 'admin/duplicate_detection.html', context)
     
+    def duplicate_recompute_view(self, request):
+        """Enqueue a background recompute of the stored duplicate report"""
+        if request.method == 'POST':
+            scan = enqueue_duplicate_scan(user=request.user)
+            messages.info(
+                request,
+                f'Duplicate scan #{scan.pk} is {scan.get_status_display().lower()}. '
+                'Refresh this page in a moment to see the new results.'
+            )
+        return redirect('admin:duplicate_detection')
+    
     def duplicate_cleanup_view(self, request):
-        """Handle bulk duplicate cleanup"""
+        """Merge selected duplicates into the business that is kept"""
         
         if request.method == 'POST':
             action = request.POST.get('action')
             
             if action == 'cleanup_selected':
                 # Get selected business IDs to remove
-                remove_ids = request.POST.getlist('remove_ids')
+                remove_ids = {str(id).strip() for id in request.POST.getlist('remove_ids') if id.strip()}
                 
                 if remove_ids:
                     try:
-                        # Convert to proper format and remove duplicates
-                        remove_ids = [str(id).strip() for id in remove_ids if id.strip()]
-                        businesses_to_remove = Business.objects.filter(id__in=remove_ids)
-                        count = businesses_to_remove.count()
+                        # Each posted group lists its members oldest first
+                        member_lists = [group.split(',') for group in request.POST.getlist('group_members') if group]
+                        merge_groups = resolve_merge_groups(member_lists, remove_ids=remove_ids)
+                        stats = merge_businesses(merge_groups)
                         
-                        # Delete the businesses
-                        businesses_to_remove.delete()
+                        # Selected businesses without a surviving group member are simply removed
+                        leftover_ids = remove_ids - {loser for _, losers in merge_groups for loser in losers}
+                        Business.objects.filter(id__in=leftover_ids).delete()
                         
                         messages.success(
                             request, 
-                            f'Successfully removed {count} duplicate businesses.'
+                            f'Successfully merged {stats["deleted"]} duplicate businesses into '
+                            f'{stats["groups"]} kept businesses and removed {len(leftover_ids)} others.'
                         )
                     except Exception as e:
                         messages.error(
@@ -803,32 +740,17 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
                     messages.warning(request, 'No businesses selected for removal.')
             
             elif action == 'cleanup_all_exact':
-                # Automatically cleanup all exact duplicates
+                # Automatically merge all exact duplicates into the oldest business
                 try:
-                    exact_duplicates = Business.objects.values(
-                        'name', 'city', 'address'
-                    ).annotate(
-                        count=Count('id')
-                    ).filter(count__gt=1)
-                    
-                    total_removed = 0
-                    for dup in exact_duplicates:
-                        businesses = Business.objects.filter(
-                            name=dup['name'],
-                            city_id=dup['city'],
-                            address=dup['address']
-                        ).order_by('created_at')
-                        
-                        if businesses.count() > 1:
-                            # Keep the first, remove the rest
-                            to_remove = businesses[1:]
-                            removed_count = to_remove.count()
-                            to_remove.delete()
-                            total_removed += removed_count
+                    scan = DuplicateScan.latest_completed()
+                    member_lists = DuplicateGroup.objects.filter(
+                        scan=scan, group_type='exact'
+                    ).values_list('business_ids', flat=True)
+                    stats = merge_businesses(resolve_merge_groups(member_lists))
                     
                     messages.success(
                         request,
-                        f'Successfully removed {total_removed} duplicate businesses automatically.'
+                        f'Successfully merged {stats["deleted"]} duplicate businesses automatically.'
                     )
                 except Exception as e:
                     messages.error(
@@ -836,122 +758,82 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
                         f'Error during automatic cleanup: {str(e)}'
                     )
         
+        # Refresh the stored report in the background
+        if request.method == 'POST':
+            enqueue_duplicate_scan(user=request.user)
+        
         # Redirect back to duplicate detection
         return redirect('admin:duplicate_detection')
 
     def export_data_view(self, request):
-        """Export business data as CSV"""
-        
-        export_type = request.GET.get('type', 'summary')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if export_type == 'all':
-            # Export all businesses
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="all_businesses_{timestamp}.csv"'
-            
-            writer = csv.writer(response)
-            writer.writerow(['Name', 'Category', 'Country', 'City', 'Address', 'Phone', 'Email', 'Website', 'Verified', 'Status'])
-            
-            businesses = Business.objects.select_related('category', 'city__country').order_by('city__country__name', 'city__name', 'name')
-            for business in businesses:
-                writer.writerow([
-                    business.name,
-                    business.category.name if business.category else 'Uncategorized',
-                    business.city.country.name if business.city else '',
-                    business.city.name if business.city else '',
-                    business.address or '',
-                    business.phone or '',
-                    business.email or '',
-                    business.website or '',
-                    'Yes' if business.verified else 'No',
-                    business.status.title()
-                ])
-            
-            return response
-        
-        elif export_type == 'summary':
-            # Export summary statistics
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="business_summary_{timestamp}.csv"'
-            
-            writer = csv.writer(response)
-            writer.writerow(['Metric', 'Count', 'Percentage'])
-            
-            total = Business.objects.count()
-            writer.writerow(['Total Businesses', total, '100%'])
-            writer.writerow(['', '', ''])
-            
-            # By country
-            writer.writerow(['BY COUNTRY', '', ''])
-            countries = Business.objects.select_related('city__country').values(
-                'city__country__name'
-            ).annotate(count=Count('id')).order_by('-count')
-            
-            for country in countries:
-                percentage = f"{(country['count']/total*100):.1f}%"
-                writer.writerow([country['city__country__name'], country['count'], percentage])
-            
-            writer.writerow(['', '', ''])
-            
-            # By city (top 15)
-            writer.writerow(['TOP CITIES', '', ''])
-            cities = Business.objects.values('city__name', 'city__country__name').annotate(
-                count=Count('id')
-            ).order_by('-count')[:15]
-            
-            for city in cities:
-                city_name = f"{city['city__name']}, {city['city__country__name']}"
-                percentage = f"{(city['count']/total*100):.1f}%"
-                writer.writerow([city_name, city['count'], percentage])
-            
-            return response
-        
-        elif export_type in ['germany', 'spain', 'france']:
-            # Export specific country
-            country = Country.objects.get(slug=export_type)
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="businesses_{export_type}_{timestamp}.csv"'
-            
-            writer = csv.writer(response)
-            writer.writerow(['Name', 'Category', 'City', 'Address', 'Phone', 'Email', 'Website', 'Verified'])
-            
-            businesses = Business.objects.filter(city__country=country).select_related('category', 'city').order_by('city__name', 'name')
-            for business in businesses:
-                writer.writerow([
-                    business.name,
-                    business.category.name if business.category else 'Uncategorized',
-                    business.city.name,
-                    business.address or '',
-                    business.phone or '',
-                    business.email or '',
-                    business.website or '',
-                    'Yes' if business.verified else 'No'
-                ])
-            
+        """Stream business data as CSV, or queue it as a background export"""
+        
+        export_type = request.GET.get('type') or request.POST.get('type')
+        compressed = (request.GET.get('gzip') or request.POST.get('gzip')) == '1'
+        
+        if request.method == 'POST' and export_type:
+            # Long exports are written to a file in the background
+            export = enqueue_admin_export(export_type, compressed=compressed, user=request.user)
+            messages.info(request, f'Export #{export.pk} is queued. This page shows its progress.')
+            return redirect('admin:export_data')
+        
+        csv_export = admin_csv(export_type) if export_type else None
+        if csv_export:
+            # Rows are read and written chunk by chunk while the response streams
+            stem, _, rows = csv_export
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f'{stem}_{timestamp}.csv.gz' if compressed else f'{stem}_{timestamp}.csv'
+            response = StreamingHttpResponse(
+                stream_bytes(csv_chunks(rows), compressed),
+                content_type='application/gzip' if compressed else 'text/csv'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
             return response
         
-        else:
-            # Show export options page
-            context = {
-                'title': 'Export Business Data',
-                'total_businesses': Business.objects.count(),
-                'countries': Country.objects.filter(cities__businesses__isnull=False).distinct().annotate(
-                    business_count=Count('cities__businesses')
-                ).order_by('-business_count')
-            }
-            return TemplateResponse(request, 'admin/export_data.html', context)
+        # Show export options page
+        fail_abandoned_exports()
+        context = {
+            'title': 'Export Business Data',
+            'total_businesses': Business.objects.count(),
+            'countries': Country.objects.filter(cities__businesses__isnull=False).distinct().annotate(
+                business_count=Count('cities__businesses')
+            ).order_by('-business_count'),
+            'exports': AdminExport.objects.select_related('requested_by')[:KEEP_EXPORTS],
+        }
+        return TemplateResponse(request, 'admin/export_data.html', context)
+
+    def export_status_view(self, request, export_id):
+        """Progress of a background export, polled by the export page"""
+        fail_abandoned_exports()
+        export = get_object_or_404(AdminExport, pk=export_id)
+        return JsonResponse({
+            'id': export.pk,
+            'status': export.status,
+            'status_display': export.get_status_display(),
+            'rows': export.rows,
+            'total_rows': export.total_rows,
+            'progress': export.progress,
+            'error': export.error,
+            'download_url': (
+                reverse('admin:export_download', args=[export.pk]) if export.status == 'completed' else None
+            ),
+        })
+
+    def export_download_view(self, request, export_id):
+        """Download the file of a completed background export"""
+        export = get_object_or_404(AdminExport, pk=export_id, status='completed')
+        path = export_path(export)
+        if not os.path.exists(path):
+            raise Http404('The export file no longer exists.')
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=export.file_name)
 
     def index(self, request, extra_context=None):
         """Enhanced admin index with quick stats"""
         extra_context = extra_context or {}
         
-        # Count duplicates for quick stats
-        exact_duplicates = Business.objects.values(
-            'name', 'city', 'address'
-        ).annotate(
-            count=Count('id')
-        ).filter(count__gt=1).count()
+        # Duplicate count comes from the last stored scan, never computed live
+        scan = DuplicateScan.latest_completed()
+        exact_duplicates = scan.exact_groups if scan else None
         
         # Add quick stats to the main admin page
         extra_context.update({
@@ -960,6 +842,7 @@ class BusinessDirectoryAdminSite(admin.AdminSite):
             'cities_with_businesses': City.objects.filter(businesses__isnull=False).count(),
             'categories_with_businesses': Category.objects.filter(businesses__isnull=False).count(),
             'duplicate_groups': exact_duplicates,
+            'duplicate_scan': scan,
         })
         
         return super().index(request, extra_context)
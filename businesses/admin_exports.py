@@ -0,0 +1,214 @@
+"""
+CSV exports for the admin "Export Business Data" page.
+
+Rows are read with ``values_list().iterator()`` (no model instances, no
+full result set in memory) and turned into CSV text a chunk at a time, so
+the same generators feed both
+
+- a StreamingHttpResponse, optionally gzip compressed on the fly, and
+- an AdminExport job that writes the file in the background, recording its
+  progress so the admin page can poll it and offer the download.
+"""
+
+import csv
+import io
+import logging
+import os
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .background import fail_abandoned_jobs, run_in_background
+from .exporting import EXPORT_CHUNK_SIZE, ExportFile
+from .models import AdminExport, Business, Country
+
+logger = logging.getLogger(__name__)
+
+KEEP_EXPORTS = 10
+# Seconds after which a queued or running export is taken for dead
+EXPORT_TIMEOUT = 3600
+
+BUSINESS_COLUMNS = [
+    ('Name', 'name'),
+    ('Category', 'category__name'),
+    ('Country', 'city__country__name'),
+    ('City', 'city__name'),
+    ('Address', 'address'),
+    ('Phone', 'phone'),
+    ('Email', 'email'),
+    ('Website', 'website'),
+    ('Verified', 'verified'),
+    ('Status', 'status'),
+]
+# Country exports leave out the columns that are the same on every row
+COUNTRY_COLUMNS = [column for column in BUSINESS_COLUMNS if column[0] not in ('Country', 'Status')]
+
+
+def export_dir():
+    """Where background exports are written (not under MEDIA_ROOT: downloads go through the admin)"""
+    return getattr(settings, 'ADMIN_EXPORT_DIR', os.path.join(settings.BASE_DIR, 'data_export', 'admin'))
+
+
+def export_path(export):
+    """The file of a completed AdminExport, or None"""
+    return os.path.join(export_dir(), export.file_name) if export.file_name else None
+
+
+def business_cell(lookup, value):
+    if lookup == 'category__name':
+        return value or 'Uncategorized'
+    if lookup == 'verified':
+        return 'Yes' if value else 'No'
+    if lookup == 'status':
+        return value.title()
+    return value or ''
+
+
+def business_rows(queryset, columns):
+    """Header, then one CSV row per business, streamed from the database"""
+    lookups = [lookup for _, lookup in columns]
+    yield [header for header, _ in columns]
+    for row in queryset.values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [business_cell(lookup, value) for lookup, value in zip(lookups, row)]
+
+
+def summary_rows():
+    """Business totals by country and for the top 15 cities"""
+    total = Business.objects.count()
+    yield ['Metric', 'Count', 'Percentage']
+    yield ['Total Businesses', total, '100%']
+    yield ['', '', '']
+
+    yield ['BY COUNTRY', '', '']
+    countries = Business.objects.values('city__country__name').annotate(count=Count('id')).order_by('-count')
+    for country in countries:
+        yield [country['city__country__name'], country['count'], f"{(country['count']/total*100):.1f}%"]
+    yield ['', '', '']
+
+    yield ['TOP CITIES', '', '']
+    cities = Business.objects.values('city__name', 'city__country__name').annotate(
+        count=Count('id')
+    ).order_by('-count')[:15]
+    for city in cities:
+        yield [
+            f"{city['city__name']}, {city['city__country__name']}",
+            city['count'],
+            f"{(city['count']/total*100):.1f}%",
+        ]
+
+
+def admin_csv(export_type):
+    """``(file name stem, businesses queryset or None, rows)`` for an export type, or None if unknown.
+
+    Types are 'all', 'summary' or a country slug.
+    """
+    if export_type == 'all':
+        queryset = Business.objects.order_by('city__country__name', 'city__name', 'name')
+        return 'all_businesses', queryset, business_rows(queryset, BUSINESS_COLUMNS)
+    if export_type == 'summary':
+        return 'business_summary', None, summary_rows()
+
+    country = Country.objects.filter(slug=export_type).first()
+    if country is None:
+        return None
+    queryset = Business.objects.filter(city__country=country).order_by('city__name', 'name')
+    return f'businesses_{country.slug}', queryset, business_rows(queryset, COUNTRY_COLUMNS)
+
+
+def csv_chunks(rows, chunk_rows=EXPORT_CHUNK_SIZE):
+    """Yield ``(text, rows)`` chunks of CSV (as ExportFile takes them); the header counts as no row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = -1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue(), pending
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue(), max(pending, 0)
+
+
+def stream_bytes(chunks, compressed=False):
+    """The bytes of ``(text, rows)`` chunks for a streaming response, optionally as one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16) if compressed else None
+    for text, _ in chunks:
+        data = text.encode('utf-8')
+        if compressor:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor:
+        yield compressor.flush()
+
+
+def fail_abandoned_exports():
+    """Fail exports whose worker died, so the export page stops polling them"""
+    return fail_abandoned_jobs(AdminExport.objects.all(), EXPORT_TIMEOUT)
+
+
+def enqueue_admin_export(export_type, compressed=False, user=None):
+    """Queue a background export and start it once the transaction commits"""
+    fail_abandoned_exports()
+    export = AdminExport.objects.create(export_type=export_type, compressed=compressed, requested_by=user)
+    transaction.on_commit(lambda: run_in_background(run_admin_export, export.pk))
+    return export
+
+
+def run_admin_export(export_id):
+    """Write an AdminExport's file, saving its progress after every chunk"""
+    export = AdminExport.objects.get(pk=export_id)
+    export.status = 'running'
+    export.started_at = timezone.now()
+    export.save(update_fields=['status', 'started_at'])
+
+    output = None
+    try:
+        csv_export = admin_csv(export.export_type)
+        if csv_export is None:
+            raise ValueError(f'Unknown export type: {export.export_type}')
+        stem, queryset, rows = csv_export
+        if queryset is not None:
+            export.total_rows = queryset.count()
+            export.save(update_fields=['total_rows'])
+
+        os.makedirs(export_dir(), exist_ok=True)
+        path = os.path.join(export_dir(), f'{stem}_{export.pk}_{timezone.now():%Y%m%d_%H%M%S}.csv')
+        with ExportFile(path, 'gzip' if export.compressed else 'none') as output:
+            for chunk in csv_chunks(rows):
+                output.write_chunks([chunk])
+                AdminExport.objects.filter(pk=export.pk).update(rows=output.rows)
+    except Exception as e:
+        logger.exception("Admin export %s failed", export.pk)
+        if output and os.path.exists(output.path):
+            os.remove(output.path)
+        export.status = 'failed'
+        export.error = str(e)
+        export.finished_at = timezone.now()
+        export.save(update_fields=['status', 'error', 'finished_at'])
+        return export
+
+    export.status = 'completed'
+    export.file_name = os.path.basename(output.path)
+    export.rows = output.rows
+    export.bytes = output.raw.bytes
+    export.finished_at = timezone.now()
+    export.save()
+
+    _prune_old_exports()
+    return export
+
+
+def _prune_old_exports():
+    """Keep only the most recent finished exports and their files"""
+    finished = AdminExport.objects.filter(status__in=['completed', 'failed']).order_by('-created_at')
+    for export in finished[KEEP_EXPORTS:]:
+        path = export_path(export)
+        if path and os.path.exists(path):
+            os.remove(path)
+        export.delete()
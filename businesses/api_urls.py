@@ -7,11 +7,13 @@ from rest_framework_simplejwt.views import (
 )
 
 from .api_views import (
+    BusinessAnalyticsAPIView,
     BusinessListAPIView,
     BusinessDetailAPIView,
     BusinessSearchAPIView,
     BusinessStatsAPIView,
     BusinessTranslationAPIView,
+    BusinessDuplicateCheckAPIView,
     CategoryListAPIView,
     CityListAPIView,
     CountryListAPIView,
@@ -38,8 +40,12 @@ urlpatterns = [
     path('businesses/', BusinessListAPIView.as_view(), name='business-list'),
     path('businesses/<slug:slug>/', BusinessDetailAPIView.as_view(), name='business-detail'),
     path('businesses/<int:business_id>/click/', increment_business_clicks, name='business-click'),
+    path('businesses/<slug:slug>/analytics/', BusinessAnalyticsAPIView.as_view(), name='business-analytics'),
     path('businesses/<int:business_id>/reviews/', ReviewListCreateAPIView.as_view(), name='business-reviews'),
     
+    # Duplicate pre-check for bulk uploads
+    path('duplicates/check/', BusinessDuplicateCheckAPIView.as_view(), name='duplicate-check'),
+    
     # Search endpoints
     path('search/', BusinessSearchAPIView.as_view(), name='business-search'),
     
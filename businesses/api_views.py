@@ -7,11 +7,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
 
+from .counters import business_counters, count_click, count_view
 from .models import Business, Category, City, Country, Review
 from .serializers import (
     BusinessSerializer, BusinessListSerializer, BusinessCreateSerializer,
-    CategorySerializer, CitySerializer, CountrySerializer, ReviewSerializer
+    CategorySerializer, CitySerializer, CountrySerializer, ReviewSerializer,
+    DuplicateCheckSerializer
 )
+from .timeseries import SERIES_WINDOWS, business_series
 
 
 class CountryListAPIView(generics.ListAPIView):
@@ -104,11 +107,39 @@ class BusinessDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'slug'
     
     def retrieve(self, request, *args, **kwargs):
-        """Increment view count when business is retrieved"""
+        """Count the view (buffered, see businesses.counters) when business is retrieved"""
         instance = self.get_object()
-        instance.views_count = (instance.views_count or 0) + 1
-        instance.save(update_fields=['views_count'])
-        return super().retrieve(request, *args, **kwargs)
+        count_view(instance.pk)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+class BusinessAnalyticsAPIView(APIView):
+    """Daily views and clicks of a business, for its owner"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, slug):
+        business = get_object_or_404(
+            Business.objects.only('id', 'slug', 'owner_id', 'views_count', 'clicks_count'), slug=slug
+        )
+        if business.owner_id != request.user.pk and not request.user.is_staff:
+            return Response({'error': 'Business not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # ?days=30|90|365 picks one window, all three by default (same single read either way)
+        days = request.query_params.get('days')
+        if days and days not in [str(window) for window in SERIES_WINDOWS]:
+            return Response(
+                {'error': f'days must be one of {", ".join(str(window) for window in SERIES_WINDOWS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        windows = [int(days)] if days else SERIES_WINDOWS
+        
+        series = business_series(business.pk, windows)
+        return Response({
+            'business': business.slug,
+            'lifetime': {'views': business.views_count, 'clicks': business.clicks_count},
+            'series': {str(window): values for window, values in series.items()},
+        })
 
 
 class BusinessSearchAPIView(APIView):
@@ -184,15 +215,45 @@ class BusinessStatsAPIView(APIView):
         return Response(stats)
 
 
+class BusinessDuplicateCheckAPIView(APIView):
+    """Bulk duplicate pre-check for partner uploads and importers"""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = DuplicateCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        candidates = [
+            {
+                'name': row['name'],
+                'city': row['city_id'],
+                'email': row.get('email'),
+                'phone': row.get('phone'),
+                'exclude_id': row.get('exclude_id'),
+            }
+            for row in serializer.validated_data['businesses']
+        ]
+        results = Business.check_potential_duplicates(candidates)
+        
+        return Response({
+            'count': len(results),
+            'duplicates': sum(1 for issues in results if issues),
+            'results': [
+                {'index': index, 'is_duplicate': bool(issues), 'issues': issues}
+                for index, issues in enumerate(results)
+            ],
+        })
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def increment_business_clicks(request, business_id):
     """API endpoint to increment business click count"""
     try:
-        business = Business.objects.get(id=business_id, status='published')
-        business.clicks_count = (business.clicks_count or 0) + 1
-        business.save(update_fields=['clicks_count'])
-        return Response({'success': True, 'clicks': business.clicks_count})
+        business = Business.objects.only('clicks_count').get(id=business_id, status='published')
+        count_click(business.pk)
+        clicks = business.clicks_count + business_counters.pending_count(business.pk, 'clicks_count')
+        return Response({'success': True, 'clicks': clicks})
     except Business.DoesNotExist:
         return Response({'error': 'Business not found'}, status=status.HTTP_404_NOT_FOUND)
 
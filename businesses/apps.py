@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class BusinessesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'businesses'
\ No newline at end of file
+    name = 'businesses'
+
+    def ready(self):
+        """Connect signal receivers and list the flag files"""
+        from . import signals  # noqa: F401
+        from .flag_manifest import flag_manifest
+        flag_manifest.load_flags()
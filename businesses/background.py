@@ -0,0 +1,49 @@
+"""
+Minimal background job runner.
+
+Jobs run in a daemon thread inside the web process so admin actions return
+immediately. Every job records its own state in the database, so a job can
+also be run synchronously from a management command (e.g. from cron). A
+thread dies with its process (a deploy, a killed worker) without recording
+anything, so jobs still active after a timeout are failed by
+fail_abandoned_jobs().
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` in a daemon thread with its own DB connection"""
+
+    def runner():
+        close_old_connections()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background job %s failed", getattr(func, '__name__', func))
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=runner, name=f"bg-{getattr(func, '__name__', 'job')}", daemon=True)
+    thread.start()
+    return thread
+
+
+def fail_abandoned_jobs(queryset, timeout):
+    """Mark the queued or running jobs of ``queryset`` started over ``timeout`` seconds ago as failed.
+
+    Jobs that never started are aged by ``created_at``. Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=timeout)
+    return queryset.filter(status__in=['queued', 'running']).filter(
+        Q(started_at__lt=cutoff) | Q(started_at__isnull=True, created_at__lt=cutoff)
+    ).update(status='failed', error=f'Abandoned: not finished within {timeout} seconds', finished_at=now)
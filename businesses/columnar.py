@@ -0,0 +1,218 @@
+"""
+Columnar (Parquet) snapshots for analytics.
+
+Each table is written as a Hive-style partitioned dataset
+
+    <output>/businesses/country_code=PT/part-0.parquet
+    <output>/reviews/country_code=PT/part-0.parquet
+    <output>/article_views/month=2025-10/part-0.parquet
+
+so pyarrow.dataset, DuckDB, Spark or pandas only read the partitions and
+columns a query needs. Low-cardinality strings (category, city, status...)
+are dictionary encoded, and every row group carries min/max statistics for
+predicate pushdown. Rows are read per partition in keyset chunks (see
+businesses.exporting), converted to Arrow batches right away and flushed
+every ROW_GROUP_SIZE rows, so memory is bounded by one columnar row group.
+
+Needs the ``pyarrow`` package.
+"""
+
+import os
+import shutil
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+
+from travel.models import ArticleView
+
+from .exporting import EXPORT_CHUNK_SIZE, keyset_chunks
+from .models import Business, Country, Review
+
+ROW_GROUP_SIZE = 100_000
+PARQUET_COMPRESSION = 'zstd'
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('Columnar export needs the pyarrow package: pip install pyarrow')
+    return pyarrow
+
+
+def arrow_type(pa, kind):
+    return {
+        'string': pa.string(),
+        'dictionary': pa.string(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }[kind]
+
+
+def to_arrow_value(kind, value):
+    """Python value as Arrow takes it: UUIDs as text, decimals as floats"""
+    if value is None:
+        return None
+    if kind in ('string', 'dictionary'):
+        return str(value)
+    if kind == 'float':
+        return float(value)
+    if kind == 'timestamp':
+        return value.astimezone(dt_timezone.utc)
+    return value
+
+
+class ColumnarTable:
+    """A queryset written as a partitioned Parquet dataset"""
+
+    def __init__(self, name, queryset, columns, partition_key, partitions):
+        self.name = name
+        self.queryset = queryset
+        # (column name, values_list lookup, kind); kinds as in arrow_type()
+        self.columns = columns
+        self.partition_key = partition_key
+        # Callable returning [(partition value, Q filter)]
+        self.partitions = partitions
+
+    def schema(self, pa):
+        return pa.schema([(name, arrow_type(pa, kind)) for name, _, kind in self.columns])
+
+    def write(self, output_dir, chunk_size=EXPORT_CHUNK_SIZE, row_group_size=ROW_GROUP_SIZE):
+        """Write every non-empty partition; returns one manifest entry per file"""
+        pa = import_pyarrow()
+        schema = self.schema(pa)
+        dictionary_columns = [name for name, _, kind in self.columns if kind == 'dictionary']
+        lookups = [lookup for _, lookup, _ in self.columns]
+        table_dir = os.path.join(output_dir, self.name)
+        previous = set(os.listdir(table_dir)) if os.path.isdir(table_dir) else set()
+
+        files = []
+        for value, condition in self.partitions():
+            partition = f'{self.partition_key}={value}'
+            path = os.path.join(table_dir, partition, 'part-0.parquet')
+            rows = row_groups = 0
+            writer = None
+            batches = []
+            pending = 0
+
+            for chunk in keyset_chunks(self.queryset.filter(condition), lookups, chunk_size):
+                batches.append(self.to_batch(pa, schema, chunk))
+                pending += len(chunk)
+                if pending >= row_group_size:
+                    writer = writer or self.open_writer(pa, path, schema, dictionary_columns)
+                    writer.write_table(pa.Table.from_batches(batches, schema), row_group_size=row_group_size)
+                    rows += pending
+                    row_groups += 1
+                    batches, pending = [], 0
+
+            if pending:
+                writer = writer or self.open_writer(pa, path, schema, dictionary_columns)
+                writer.write_table(pa.Table.from_batches(batches, schema), row_group_size=row_group_size)
+                rows += pending
+                row_groups += 1
+            if writer is None:
+                continue
+
+            writer.close()
+            # Readers never see a half-written partition
+            os.replace(f'{path}.tmp', path)
+            previous.discard(partition)
+            files.append({
+                'table': self.name,
+                'partition': partition,
+                'path': os.path.relpath(path, output_dir),
+                'rows': rows,
+                'row_groups': row_groups,
+                'bytes': os.path.getsize(path),
+            })
+
+        # Partitions that are empty now must not linger from an earlier snapshot
+        for partition in previous:
+            if partition.startswith(f'{self.partition_key}='):
+                shutil.rmtree(os.path.join(table_dir, partition))
+        return files
+
+    def open_writer(self, pa, path, schema, dictionary_columns):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return pa.parquet.ParquetWriter(
+            f'{path}.tmp',
+            schema,
+            compression=PARQUET_COMPRESSION,
+            use_dictionary=dictionary_columns,
+            write_statistics=True,
+        )
+
+    def to_batch(self, pa, schema, rows):
+        """values_list rows (pk first) → an Arrow record batch, column by column"""
+        arrays = [
+            pa.array([to_arrow_value(kind, row[index]) for row in rows], type=field.type)
+            for index, ((_, _, kind), field) in enumerate(zip(self.columns, schema), start=1)
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def country_partitions(lookup):
+    """One partition per country code, filtering on ``lookup``"""
+    def partitions():
+        return [(code, Q(**{lookup: code})) for code in Country.objects.order_by('code').values_list('code', flat=True)]
+    return partitions
+
+
+def month_partitions(queryset, field):
+    """One partition per calendar month that has rows (range filters, so the index is used)"""
+    def partitions():
+        result = []
+        for month in queryset.datetimes(field, 'month'):
+            following = (month + timedelta(days=32)).replace(day=1)
+            result.append((month.strftime('%Y-%m'), Q(**{f'{field}__gte': month, f'{field}__lt': following})))
+        return result
+    return partitions
+
+
+def columnar_tables():
+    article_views = ArticleView.objects.all()
+    return [
+        ColumnarTable('businesses', Business.objects.all(), [
+            ('id', 'id', 'string'),
+            ('name', 'name', 'string'),
+            ('slug', 'slug', 'string'),
+            ('category', 'category__name', 'dictionary'),
+            ('city', 'city__name', 'dictionary'),
+            ('country', 'city__country__name', 'dictionary'),
+            ('postal_code', 'postal_code', 'string'),
+            ('latitude', 'latitude', 'float'),
+            ('longitude', 'longitude', 'float'),
+            ('plan', 'plan', 'dictionary'),
+            ('status', 'status', 'dictionary'),
+            ('featured', 'featured', 'bool'),
+            ('verified', 'verified', 'bool'),
+            ('views_count', 'views_count', 'int'),
+            ('clicks_count', 'clicks_count', 'int'),
+            ('created_at', 'created_at', 'timestamp'),
+            ('updated_at', 'updated_at', 'timestamp'),
+            ('published_at', 'published_at', 'timestamp'),
+        ], 'country_code', country_partitions('city__country__code')),
+        ColumnarTable('reviews', Review.objects.all(), [
+            ('id', 'id', 'int'),
+            ('business_id', 'business_id', 'string'),
+            ('category', 'business__category__name', 'dictionary'),
+            ('city', 'business__city__name', 'dictionary'),
+            ('rating', 'rating', 'int'),
+            ('is_approved', 'is_approved', 'bool'),
+            ('response_date', 'response_date', 'timestamp'),
+            ('created_at', 'created_at', 'timestamp'),
+        ], 'country_code', country_partitions('business__city__country__code')),
+        # Articles cover several countries, so views are partitioned by month instead
+        ColumnarTable('article_views', article_views, [
+            ('id', 'id', 'int'),
+            ('article_id', 'article_id', 'int'),
+            ('article', 'article__slug', 'dictionary'),
+            ('article_type', 'article__article_type', 'dictionary'),
+            ('article_category', 'article__category__name', 'dictionary'),
+            ('referrer', 'referrer', 'dictionary'),
+            ('viewed_at', 'viewed_at', 'timestamp'),
+        ], 'month', month_partitions(article_views, 'viewed_at')),
+    ]
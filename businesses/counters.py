@@ -0,0 +1,254 @@
+"""
+Buffered view and click counters.
+
+Page views and clicks are not written to the database per hit. Every
+worker adds them up in memory and a flusher thread applies the totals every
+COUNTER_FLUSH_INTERVAL seconds (and when the worker exits) as one
+``UPDATE ... SET views_count = views_count + CASE ...`` per field and
+batch, so detail pages stay read-only, concurrent hits are never lost, and
+Business.save() (validation, slugs, duplicate keys) is not involved.
+
+With COUNTER_REDIS_URL set (needs the ``redis`` package), workers push
+their totals into a shared Redis hash instead and one of them at a time
+drains it into the database; ``python manage.py flush_counters`` does the
+same from cron. Each drain renames the hash under a unique drain ID, which
+is recorded (CounterDrain) in the transaction that applies it, so a hash
+left by a flusher that died after the commit is discarded, not re-applied.
+COUNTER_FLUSH_INTERVAL = 0 writes every hit straight through (still with
+F(), for development).
+
+    count_view(business.pk)
+    count_click(business.pk)
+
+Every applied batch is also added to today's BusinessDailyStats rows (see
+businesses.timeseries), which back the owner analytics.
+
+Counter updates leave updated_at alone: a view is not a change of the
+listing, and incremental exports should not pick up every viewed business.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Business, CounterDrain
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 10
+UPDATE_BATCH_SIZE = 500
+REDIS_KEY = 'listacross:counters:business'
+REDIS_LOCK_TIMEOUT = 60
+# Applied drain IDs are kept this long; a leftover hash is found by the next drain
+KEEP_DRAINS = timedelta(days=7)
+
+
+def add_amounts(queryset, field, amounts, key='pk', batch_size=UPDATE_BATCH_SIZE):
+    """``field += amount`` for every ``{key value: amount}``, one UPDATE per batch; returns the rows updated"""
+    values = list(amounts)
+    updated = 0
+    for start in range(0, len(values), batch_size):
+        batch = values[start:start + batch_size]
+        updated += queryset.filter(**{f'{key}__in': batch}).update(**{
+            field: F(field) + Case(
+                *[When(**{key: value}, then=Value(amounts[value])) for value in batch],
+                default=Value(0),
+                output_field=models.PositiveIntegerField(),
+            ),
+        })
+    return updated
+
+
+def apply_increments(model, increments, batch_size=UPDATE_BATCH_SIZE):
+    """Add ``{(field, pk): amount}`` to the stored counters; returns the rows updated"""
+    by_field = {}
+    for (field, pk), amount in increments.items():
+        if amount:
+            by_field.setdefault(field, {})[pk] = amount
+
+    return sum(
+        add_amounts(model.objects.all(), field, amounts, batch_size=batch_size)
+        for field, amounts in by_field.items()
+    )
+
+
+class RedisCounterBackend:
+    """Increments shared between workers in one Redis hash of ``field:pk`` → amount"""
+
+    def __init__(self, url=None, key=REDIS_KEY, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError('Shared counters need the redis package: pip install redis')
+            client = redis.Redis.from_url(url)
+        # A redis.Redis connection (or a stand-in with the same methods)
+        self.redis = client
+        self.key = key
+
+    def push(self, increments):
+        pipeline = self.redis.pipeline(transaction=False)
+        for (field, pk), amount in increments.items():
+            pipeline.hincrby(self.key, f'{field}:{pk}', amount)
+        pipeline.execute()
+
+    def drain(self, apply):
+        """Pass the shared increments to ``apply``; returns the rows updated (None if another worker is at it)"""
+        lock = self.redis.lock(f'{self.key}:lock', timeout=REDIS_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            prefix = f'{self.key}:draining:'
+            # Hashes left by flushers that died half way come first
+            draining = [name.decode() for name in self.redis.scan_iter(match=f'{prefix}*')]
+            if self.redis.exists(self.key):
+                draining.append(f'{prefix}{uuid.uuid4().hex}')
+                self.redis.rename(self.key, draining[-1])
+            updated = sum(self.apply_drain(name, name[len(prefix):], apply) for name in draining)
+            CounterDrain.objects.filter(applied_at__lt=timezone.now() - KEEP_DRAINS).delete()
+            return updated
+        finally:
+            lock.release()
+
+    def apply_drain(self, name, drain_id, apply):
+        """Apply the hash ``name`` unless drain ``drain_id`` already was, then delete it"""
+        increments = {}
+        for field_pk, amount in self.redis.hgetall(name).items():
+            field, pk = field_pk.decode().split(':', 1)
+            increments[(field, pk)] = int(amount)
+        updated = 0
+        with transaction.atomic():
+            # Recorded with the increments: a drain already committed is only deleted
+            _, created = CounterDrain.objects.get_or_create(drain_id=drain_id)
+            if created:
+                updated = apply(increments)
+        self.redis.delete(name)
+        return updated
+
+
+class CounterBuffer:
+    """Per-process counter increments for one model, flushed in batches"""
+
+    def __init__(self, model, fields, flush_interval=FLUSH_INTERVAL, backend=None, on_apply=None):
+        self.model = model
+        self.fields = fields
+        self.flush_interval = flush_interval
+        self.backend = backend
+        # Called with every batch of increments written, in the same transaction
+        self.on_apply = on_apply
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flusher = None
+        self.pid = None
+
+    def increment(self, pk, field, amount=1):
+        if field not in self.fields:
+            raise ValueError(f'{field} is not a buffered counter of {self.model.__name__}')
+        if not self.flush_interval:
+            self.apply({(field, str(pk)): amount})
+            return
+
+        with self.lock:
+            self.ensure_flusher()
+            key = (field, str(pk))
+            self.pending[key] = self.pending.get(key, 0) + amount
+
+    def ensure_flusher(self):
+        """Start this worker's flusher on its first hit (also in forked children); call with the lock held"""
+        if self.pid != os.getpid():
+            self.reset()
+            self.pid = os.getpid()
+            self.flusher = threading.Thread(target=self.run_flusher, name='counter-flusher', daemon=True)
+            self.flusher.start()
+
+    def reset(self):
+        # Increments copied from the parent process are the parent's to flush
+        self.pending = {}
+
+    def pending_count(self, pk, field):
+        """Increments of this worker not flushed yet"""
+        return self.pending.get((field, str(pk)), 0)
+
+    def flush(self):
+        """Write (or share) the buffered increments; returns the rows updated"""
+        with self.lock:
+            increments, self.pending = self.pending, {}
+
+        updated = 0
+        if increments:
+            try:
+                if self.backend is not None:
+                    self.backend.push(increments)
+                else:
+                    updated = self.apply(increments)
+            except Exception:
+                # Keep the increments for the next flush instead of dropping them
+                with self.lock:
+                    for key, amount in increments.items():
+                        self.pending[key] = self.pending.get(key, 0) + amount
+                raise
+        if self.backend is not None:
+            updated = self.backend.drain(self.apply) or 0
+        return updated
+
+    def apply(self, increments):
+        """Write ``{(field, pk): amount}`` to the database; returns the rows updated"""
+        with transaction.atomic():
+            updated = apply_increments(self.model, increments)
+            if self.on_apply:
+                self.on_apply(increments)
+        return updated
+
+    def run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing %s counters failed", self.model.__name__)
+
+
+def record_daily_stats(increments):
+    from .timeseries import add_daily_stats
+    add_daily_stats(increments)
+
+
+def build_backend():
+    url = getattr(settings, 'COUNTER_REDIS_URL', '')
+    return RedisCounterBackend(url) if url else None
+
+
+business_counters = CounterBuffer(
+    Business,
+    fields=('views_count', 'clicks_count'),
+    flush_interval=getattr(settings, 'COUNTER_FLUSH_INTERVAL', FLUSH_INTERVAL),
+    backend=build_backend(),
+    on_apply=record_daily_stats,
+)
+
+
+@atexit.register
+def _flush_at_exit():
+    if business_counters.pending:
+        try:
+            business_counters.flush()
+        except Exception:
+            logger.exception("Flushing counters at exit failed")
+
+
+def count_view(business_id):
+    business_counters.increment(business_id, 'views_count')
+
+
+def count_click(business_id):
+    business_counters.increment(business_id, 'clicks_count')
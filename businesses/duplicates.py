@@ -0,0 +1,216 @@
+"""
+Duplicate analysis for the admin duplicate views.
+
+The analysis streams every business once, ordered by city, and groups the
+rows per city in memory. The resulting groups are stored as DuplicateGroup
+rows so the admin pages only page through stored results.
+"""
+
+import logging
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .background import fail_abandoned_jobs, run_in_background
+from .models import Business, City, DuplicateScan, DuplicateGroup
+
+logger = logging.getLogger(__name__)
+
+MIN_GROUP_SIZE = 2
+KEEP_SCANS = 5
+# Seconds after which a queued or running scan is taken for dead
+SCAN_TIMEOUT = 3600
+STREAM_CHUNK_SIZE = 2000
+WRITE_BATCH_SIZE = 1000
+GENERIC_NAMES = ['business', 'shop', 'store', 'company']
+
+
+def active_duplicate_scan():
+    """The queued or running scan, failing scans whose worker died first"""
+    fail_abandoned_jobs(DuplicateScan.objects.all(), SCAN_TIMEOUT)
+    return DuplicateScan.objects.filter(status__in=['queued', 'running']).first()
+
+
+def enqueue_duplicate_scan(user=None):
+    """Queue a duplicate scan and start it in the background.
+
+    Returns the already active scan instead if one is queued or running.
+    """
+    active = active_duplicate_scan()
+    if active:
+        return active
+
+    scan = DuplicateScan.objects.create(requested_by=user)
+    transaction.on_commit(lambda: run_in_background(run_duplicate_scan, scan.pk))
+    return scan
+
+
+def run_duplicate_scan(scan_id=None):
+    """Run a duplicate scan synchronously and store its groups"""
+    if scan_id is None:
+        scan = DuplicateScan.objects.create()
+    else:
+        scan = DuplicateScan.objects.get(pk=scan_id)
+
+    scan.status = 'running'
+    scan.started_at = timezone.now()
+    scan.save(update_fields=['status', 'started_at'])
+
+    try:
+        totals = _compute_groups(scan)
+    except Exception as e:
+        logger.exception("Duplicate scan %s failed", scan.pk)
+        DuplicateGroup.objects.filter(scan=scan).delete()
+        scan.status = 'failed'
+        scan.error = str(e)
+        scan.finished_at = timezone.now()
+        scan.save(update_fields=['status', 'error', 'finished_at'])
+        return scan
+
+    scan.status = 'completed'
+    scan.businesses_scanned = totals['businesses']
+    scan.exact_groups = totals['exact']
+    scan.name_groups = totals['name']
+    scan.address_groups = totals['address']
+    scan.finished_at = timezone.now()
+    scan.save()
+
+    _prune_old_scans()
+    return scan
+
+
+def _compute_groups(scan):
+    """Stream all businesses grouped by city and bulk-write the duplicate groups"""
+    cities = {
+        city_id: (name, code or '')
+        for city_id, name, code in City.objects.values_list('id', 'name', 'country__code')
+    }
+    normalizer = Business()
+    totals = {'businesses': 0, 'exact': 0, 'name': 0, 'address': 0}
+    pending = []
+
+    rows = Business.objects.order_by('city_id', 'created_at').values_list(
+        'id', 'name', 'address', 'city_id', 'category_id', 'address_key'
+    ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+    for city_id, city_rows in groupby(rows, key=lambda row: row[3]):
+        city_rows = list(city_rows)
+        totals['businesses'] += len(city_rows)
+        city_name, country_code = cities.get(city_id, ('', ''))
+
+        for group in _city_groups(city_rows, normalizer):
+            group.scan = scan
+            group.city_id = city_id
+            group.city_name = city_name
+            group.country_code = country_code
+            totals[group.group_type] += 1
+            pending.append(group)
+
+        if len(pending) >= WRITE_BATCH_SIZE:
+            DuplicateGroup.objects.bulk_create(pending)
+            pending = []
+
+    if pending:
+        DuplicateGroup.objects.bulk_create(pending)
+    return totals
+
+
+def _city_groups(rows, normalizer):
+    """Build the exact, name and address groups for the rows of one city"""
+    by_exact = {}
+    by_name = {}
+    by_address = {}
+    for row in rows:
+        # Compare addresses on their canonical key, fall back to the raw text
+        name, address_key = row[1], row[5] or row[2]
+        by_exact.setdefault((name, address_key), []).append(row)
+        by_name.setdefault(name, []).append(row)
+        if address_key:
+            by_address.setdefault(address_key, []).append(row)
+
+    groups = []
+    exact_names = set()
+    exact_addresses = set()
+    for (name, address_key), members in by_exact.items():
+        if len(members) < MIN_GROUP_SIZE:
+            continue
+        exact_names.add(name)
+        exact_addresses.add(address_key)
+        groups.append(DuplicateGroup(
+            group_type='exact',
+            name=name,
+            address=members[0][2] or '',
+            count=len(members),
+            business_ids=[str(row[0]) for row in members],
+        ))
+
+    for name, members in by_name.items():
+        if len(members) < MIN_GROUP_SIZE or name in exact_names:
+            continue
+        addresses = list(dict.fromkeys(row[2] for row in members))
+        groups.append(DuplicateGroup(
+            group_type='name',
+            name=name,
+            count=len(members),
+            business_ids=[str(row[0]) for row in members],
+            distinct_values=addresses,
+        ))
+
+    for address_key, members in by_address.items():
+        if len(members) < MIN_GROUP_SIZE or address_key in exact_addresses:
+            continue
+        pairs = find_suspicious_pairs(members, normalizer)
+        if not pairs:
+            continue
+        groups.append(DuplicateGroup(
+            group_type='address',
+            address=members[0][2],
+            count=len(members),
+            business_ids=[str(row[0]) for row in members],
+            suspicious_pairs=pairs,
+            distinct_values=list(dict.fromkeys(row[1] for row in members)),
+        ))
+
+    return groups
+
+
+def find_suspicious_pairs(members, normalizer):
+    """Flag pairs at the same address that look like the same business.
+
+    Different businesses at one address (shopping malls, office buildings)
+    are legitimate, so a pair is only suspicious when the names are similar,
+    the category matches with some name overlap, or the names are generic.
+    """
+    normalized = [
+        (row[0], normalizer.normalize_business_name(row[1] or ''), row[4])
+        for row in members
+    ]
+    pairs = []
+    for i, (id1, name1, category1) in enumerate(normalized):
+        for id2, name2, category2 in normalized[i + 1:]:
+            words1, words2 = name1.split(), name2.split()
+            similarity_ratio = 0
+            if words1 and words2:
+                similarity_ratio = len(set(words1) & set(words2)) / max(len(words1), len(words2))
+
+            is_suspicious = False
+            if len(name1) > 3 and len(name2) > 3 and similarity_ratio > 0.6:
+                is_suspicious = True
+            if category1 and category1 == category2 and similarity_ratio > 0.3:
+                is_suspicious = True
+            if (len(name1) <= 3 or len(name2) <= 3 or
+                    name1 in GENERIC_NAMES or name2 in GENERIC_NAMES):
+                is_suspicious = True
+
+            if is_suspicious:
+                pairs.append([str(id1), str(id2)])
+    return pairs
+
+
+def _prune_old_scans():
+    """Keep only the most recent finished scans (groups cascade)"""
+    finished = DuplicateScan.objects.filter(status__in=['completed', 'failed']).order_by('-created_at')
+    stale_ids = list(finished.values_list('id', flat=True)[KEEP_SCANS:])
+    if stale_ids:
+        DuplicateScan.objects.filter(id__in=stale_ids).delete()
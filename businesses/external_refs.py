@@ -0,0 +1,164 @@
+"""
+Incremental re-sync of businesses from external sources.
+
+Every imported business is linked to its source record (an OSM node, a
+Google place) by an ExternalReference holding a hash of the data last
+imported. Re-running an import then only costs the delta:
+
+- records whose hash is unchanged are not written, only marked as seen;
+- changed records update their business in bulk, by primary key, so a
+  renamed place stays the same business;
+- new records go through ``Business.objects.bulk_upsert()`` on name/city,
+  which also links businesses imported before references existed;
+- records merged into another business (same name and city in one batch,
+  a phone/email key taken by another business, or dropped by a caller's own
+  dedupe, see link_aliases()) are linked to the surviving business;
+- records skipped as invalid keep their old reference and hash, marked as
+  seen, so the next run tries them again;
+- after a complete run, references that were not seen are flagged stale.
+
+    sync = ExternalSync('osm', update_fields=OSM_UPDATE_FIELDS)
+    sync.write([(place['osm_id'], business), ...])
+    sync.mark_stale(business__city=city)
+"""
+
+import hashlib
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Business, ExternalReference
+
+
+def content_hash(business, fields):
+    """Hash of the values a source provides for a business"""
+    opts = Business._meta
+    values = {name: getattr(business, opts.get_field(name).attname) for name in fields}
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ExternalSync:
+    """Write one source's records, skipping the ones that did not change"""
+
+    def __init__(self, source, update_fields):
+        self.source = source
+        self.update_fields = list(update_fields)
+        self.hash_fields = ['name', 'city', *self.update_fields]
+        self.started = timezone.now()
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0, 'merged': 0}
+
+    def write(self, records):
+        """Sync ``records``, an iterable of ``(external_id, unsaved Business)``.
+
+        Returns the counts of this call in the shape of bulk_upsert().
+        """
+        records = {str(external_id): business for external_id, business in records}
+        if not records:
+            return {key: 0 for key in self.counts}
+
+        now = timezone.now()
+        hashes = {external_id: content_hash(business, self.hash_fields) for external_id, business in records.items()}
+        refs = {
+            ref['external_id']: ref
+            for ref in ExternalReference.objects.filter(source=self.source, external_id__in=records)
+            .values('id', 'external_id', 'business_id', 'content_hash')
+        }
+
+        seen, changed, new = [], [], []
+        for external_id, business in records.items():
+            ref = refs.get(external_id)
+            if ref is None:
+                new.append((external_id, business))
+            elif ref['content_hash'] == hashes[external_id]:
+                seen.append(ref['id'])
+            else:
+                business.pk = ref['business_id']
+                changed.append((external_id, business))
+
+        counts = {'created': 0, 'updated': 0, 'unchanged': len(seen), 'duplicates': 0, 'invalid': 0, 'merged': 0}
+        skipped = []
+        with transaction.atomic():
+            if changed:
+                # Matched by primary key, so a name changed at the source is written too
+                self._add(counts, Business.objects.bulk_upsert(
+                    [business for _, business in changed], conflict=('id',),
+                    update_fields=['name', *self.update_fields], skipped=skipped,
+                ))
+            if new:
+                self._add(counts, Business.objects.bulk_upsert(
+                    [business for _, business in new], update_fields=self.update_fields, skipped=skipped
+                ))
+
+            # Rows bulk_upsert did not write are linked to the business that survived them
+            survivors = {id(business): survivor for business, survivor in skipped}
+            written = [*changed, *new]
+            stored = set(Business.objects.filter(
+                pk__in=[business.pk for _, business in written] + [pk for pk in survivors.values() if pk]
+            ).values_list('pk', flat=True))
+            links = []
+            for external_id, business in written:
+                business_id = survivors.get(id(business), business.pk)
+                if id(business) in survivors and external_id in refs:
+                    # Keep the old hash, so the next run tries the record again
+                    seen.append(refs[external_id]['id'])
+                elif business_id in stored:
+                    links.append(ExternalReference(
+                        source=self.source, external_id=external_id, business_id=business_id,
+                        content_hash=hashes[external_id], last_seen=now, stale=False,
+                    ))
+            if seen:
+                ExternalReference.objects.filter(pk__in=seen).update(last_seen=now, stale=False)
+            ExternalReference.objects.bulk_create(
+                links,
+                update_conflicts=True,
+                unique_fields=['source', 'external_id'],
+                update_fields=['business', 'content_hash', 'last_seen', 'stale'],
+            )
+
+        self._add(self.counts, counts)
+        return counts
+
+    def link_aliases(self, aliases):
+        """Mark records a caller dropped as duplicates (``{external_id: surviving external_id}``) as seen.
+
+        Each is linked to the business of the record that survived it. Known
+        references keep their hash, new ones get none, so a record that later
+        shows up on its own is written again.
+        """
+        if not aliases:
+            return 0
+        now = timezone.now()
+        businesses = dict(ExternalReference.objects.filter(
+            source=self.source, external_id__in=set(aliases.values())
+        ).values_list('external_id', 'business_id'))
+        links = [
+            ExternalReference(
+                source=self.source, external_id=str(alias), business_id=businesses[survivor],
+                content_hash='', last_seen=now, stale=False,
+            )
+            for alias, survivor in aliases.items() if survivor in businesses
+        ]
+        ExternalReference.objects.bulk_create(
+            links,
+            update_conflicts=True,
+            unique_fields=['source', 'external_id'],
+            update_fields=['business', 'last_seen', 'stale'],
+        )
+        return len(links)
+
+    def mark_stale(self, **scope):
+        """Flag references of this source not seen since the sync started.
+
+        Only call this after a complete run over ``scope`` (e.g.
+        ``business__city=city``), or unread records would be flagged too.
+        """
+        return ExternalReference.objects.filter(
+            source=self.source, stale=False, last_seen__lt=self.started, **scope
+        ).update(stale=True)
+
+    @staticmethod
+    def _add(totals, counts):
+        for key, value in counts.items():
+            totals[key] += value
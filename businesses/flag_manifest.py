@@ -0,0 +1,111 @@
+"""
+Country flag manifest for the flag slider and country links.
+
+The flag files in static/assets/flags are listed once per process, at
+startup (BusinessesConfig.ready). The per-country entries (name, slug,
+page URL, flag static URL) are built from the slug registry
+(businesses.slug_registry), which needs no queries once loaded. They are
+rebuilt whenever the registry reloads, i.e. after a Country is saved or
+deleted. Rendering the slider or a country_url link then costs no database
+or filesystem access.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from .slug_registry import slug_registry
+
+FLAG_DIR = 'assets/flags'
+# Used when the flags directory cannot be listed
+KNOWN_FLAGS = [
+    'at', 'be', 'bg', 'hr', 'cy', 'cz', 'dk', 'ee', 'fi', 'fr', 'de',
+    'gr', 'hu', 'ie', 'it', 'lv', 'lt', 'lu', 'mt', 'nl', 'pl', 'pt',
+    'ro', 'sk', 'si', 'es', 'se', 'eu'
+]
+
+
+def scan_flags():
+    """Lower-case codes of the flag PNGs in the static flags directory"""
+    flag_dir = finders.find(FLAG_DIR)
+    if not flag_dir and settings.STATIC_ROOT:
+        flag_dir = os.path.join(settings.STATIC_ROOT, FLAG_DIR)
+    try:
+        return sorted(
+            filename[:-len('.png')].lower() for filename in os.listdir(flag_dir) if filename.endswith('.png')
+        )
+    except (FileNotFoundError, TypeError):
+        return list(KNOWN_FLAGS)
+
+
+class FlagManifest:
+    """Flag slider entries and country page URLs, rebuilt when the slug registry reloads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flags = None
+        self.source = None
+        self.slider = []
+        self.urls = {}
+
+    def load_flags(self):
+        self.flags = scan_flags()
+
+    def ensure_current(self):
+        if self.flags is None:
+            self.load_flags()
+        slug_registry.ensure_loaded()
+        countries = slug_registry.countries_by_code
+        if countries is not self.source:
+            with self.lock:
+                if countries is not self.source:
+                    self.build(countries)
+
+    def build(self, countries):
+        available = set(self.flags)
+        slider = [{
+            'code': 'EU',
+            'name': 'European Union',
+            'slug': '',
+            'url': '/',
+            'flag_url': f'{FLAG_DIR}/eu.png',
+            'static_url': static(f'{FLAG_DIR}/eu.png'),
+            'has_flag': 'eu' in available,
+        }]
+        urls = {}
+        for code, country in sorted(countries.items(), key=lambda item: item[1].name):
+            urls[code] = f'/{country.slug}/'
+            if not country.is_active:
+                continue
+            flag_url = f'{FLAG_DIR}/{code.lower()}.png'
+            slider.append({
+                'code': country.code,
+                'name': country.name,
+                'slug': country.slug,
+                'url': urls[code],
+                'flag_url': flag_url,
+                'static_url': static(flag_url),
+                'has_flag': code.lower() in available,
+            })
+        self.slider, self.urls = slider, urls
+        self.source = countries
+
+    def available_flags(self):
+        if self.flags is None:
+            self.load_flags()
+        return list(self.flags)
+
+    def slider_countries(self):
+        """The EU flag, then every active country by name"""
+        self.ensure_current()
+        return self.slider
+
+    def country_url(self, code):
+        self.ensure_current()
+        return self.urls.get(code.upper(), f'/country/{code.lower()}/')
+
+
+flag_manifest = FlagManifest()
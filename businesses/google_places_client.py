@@ -0,0 +1,187 @@
+"""
+Async Google Places (New) client with rate limiting and a response cache.
+
+Requests run on asyncio with a token-bucket limiter (requests per second
+and burst) shared by every call of a client, a bounded number of requests
+in flight and exponential-backoff retries on 429 and 5xx responses.
+Responses are stored on disk keyed by the request (text query or place ID)
+plus the field mask, because the same place asked for different fields is
+a different response. Entries older than ``max_age`` seconds
+(GOOGLE_PLACES_CACHE_MAX_AGE) are fetched again, and ``refresh=True`` skips
+the cache for reads but still rewrites it. With ``offline=True`` only the
+cache is used, whatever its age.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from django.conf import settings
+
+from .google_places_config import (
+    DETAILS_FIELD_MASK, GOOGLE_PLACES_BURST, GOOGLE_PLACES_CONCURRENCY, GOOGLE_PLACES_DETAILS_URL,
+    GOOGLE_PLACES_RATE_LIMIT, GOOGLE_PLACES_SEARCH_URL, MAX_RESULTS_PER_SEARCH, SEARCH_FIELD_MASK,
+)
+from .overpass import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+class GooglePlacesClient:
+    """Search places and fetch place details concurrently"""
+
+    def __init__(self, api_key, cache_dir=None, rate=GOOGLE_PLACES_RATE_LIMIT, burst=GOOGLE_PLACES_BURST,
+                 concurrency=GOOGLE_PLACES_CONCURRENCY, max_retries=5, timeout=10, offline=False,
+                 max_age=None, refresh=False,
+                 search_url=GOOGLE_PLACES_SEARCH_URL, details_url=GOOGLE_PLACES_DETAILS_URL):
+        self.api_key = api_key
+        self.cache_dir = Path(cache_dir or settings.GOOGLE_PLACES_CACHE_DIR)
+        self.rate = rate
+        self.burst = burst
+        # One budget for every call of this client
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.offline = offline
+        self.max_age = settings.GOOGLE_PLACES_CACHE_MAX_AGE if max_age is None else max_age
+        self.refresh = refresh
+        self.search_url = search_url
+        self.details_url = details_url
+        self.stats = {'cache_hits': 0, 'fetched': 0, 'retries': 0, 'failed': 0}
+
+    # Cache
+
+    @staticmethod
+    def cache_key(*parts):
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def cache_path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def read_cache(self, key):
+        """The cached response, or None when missing, expired or refreshing (offline ignores age)"""
+        path = self.cache_path(key)
+        if not self.offline:
+            if self.refresh:
+                return None
+            try:
+                if self.max_age and time.time() - path.stat().st_mtime > self.max_age:
+                    return None
+            except FileNotFoundError:
+                return None
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write_cache(self, key, data):
+        """Write atomically so an interrupted run never leaves a partial file"""
+        path = self.cache_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    # Requests
+
+    def search_payload(self, query):
+        return {
+            'textQuery': query,
+            'maxResultCount': MAX_RESULTS_PER_SEARCH,
+            'languageCode': 'en',
+            'regionCode': 'EU',  # Prefer European results
+        }
+
+    def search_all(self, queries, field_mask=SEARCH_FIELD_MASK):
+        """Text-search ``queries`` concurrently; one list of places per query (empty on failure)"""
+        requests = []
+        for query in queries:
+            payload = self.search_payload(query)
+            key = self.cache_key('search', json.dumps(payload, sort_keys=True), field_mask)
+            requests.append((key, 'POST', self.search_url, payload, field_mask))
+        responses = asyncio.run(self._run(requests))
+        return [(response or {}).get('places', []) for response in responses]
+
+    def details_all(self, place_ids, field_mask=DETAILS_FIELD_MASK):
+        """Fetch details for ``place_ids`` concurrently; None for places that failed"""
+        requests = [
+            (self.cache_key('details', place_id, field_mask), 'GET',
+             self.details_url.format(place_id=place_id), None, field_mask)
+            for place_id in place_ids
+        ]
+        return asyncio.run(self._run(requests))
+
+    def search(self, query, field_mask=SEARCH_FIELD_MASK):
+        return self.search_all([query], field_mask)[0]
+
+    def details(self, place_id, field_mask=DETAILS_FIELD_MASK):
+        return self.details_all([place_id], field_mask)[0]
+
+    async def _run(self, requests):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            return await asyncio.gather(*[
+                self._request(client, self.bucket, semaphore, *request) for request in requests
+            ])
+
+    async def _request(self, client, bucket, semaphore, key, method, url, payload, field_mask):
+        cached = self.read_cache(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        if self.offline:
+            self.stats['failed'] += 1
+            logger.warning("Places cache miss in offline mode: %s %s", method, url)
+            return None
+
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Goog-Api-Key': self.api_key,
+            'X-Goog-FieldMask': field_mask,
+        }
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    response = await client.request(method, url, json=payload, headers=headers)
+                except httpx.HTTPError as e:
+                    response, error = None, str(e)
+                else:
+                    error = f'{response.status_code} - {response.text[:200]}'
+
+            if response is not None and response.status_code == 200:
+                data = response.json()
+                self.write_cache(key, data)
+                self.stats['fetched'] += 1
+                return data
+            if response is not None and not is_retryable(response.status_code):
+                break
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, response))
+
+        self.stats['failed'] += 1
+        logger.error("Places API error for %s %s: %s", method, url, error)
+        return None
+
+    @staticmethod
+    def _backoff(attempt, response=None):
+        """Exponential backoff with jitter, honouring Retry-After when given"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        return min(30, 0.5 * 2 ** attempt) + random.uniform(0, 0.5)
@@ -23,6 +23,25 @@ MAX_RESULTS_PER_SEARCH = 20  # Max per API call
 DAILY_API_LIMIT = 1000       # Adjust based on your quota
 SEARCHES_PER_CITY = 5        # Number of different search queries per city
 
+# Client throughput: requests per second (token bucket), burst size and requests in flight
+GOOGLE_PLACES_RATE_LIMIT = float(os.getenv('GOOGLE_PLACES_RATE_LIMIT', '10'))
+GOOGLE_PLACES_BURST = int(os.getenv('GOOGLE_PLACES_BURST', '10'))
+GOOGLE_PLACES_CONCURRENCY = int(os.getenv('GOOGLE_PLACES_CONCURRENCY', '8'))
+
+# Fields requested from the API (they also key the response cache)
+SEARCH_FIELD_MASK = (
+    'places.id,places.displayName,places.primaryType,'
+    'places.formattedAddress,places.location,places.nationalPhoneNumber,'
+    'places.internationalPhoneNumber,places.websiteUri,places.businessStatus,'
+    'places.userRatingCount,places.rating,places.priceLevel,places.editorialSummary'
+)
+DETAILS_FIELD_MASK = (
+    'id,displayName,primaryType,formattedAddress,location,'
+    'nationalPhoneNumber,internationalPhoneNumber,websiteUri,'
+    'businessStatus,userRatingCount,rating,priceLevel,'
+    'editorialSummary,openingHours,photos'
+)
+
 # Business categories to search for
 SEARCH_CATEGORIES = [
     # Restaurants
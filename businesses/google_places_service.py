@@ -1,105 +1,51 @@
-import requests
-import time
 import logging
 from typing import Dict, List, Optional, Tuple
 from django.conf import settings
 from django.utils.text import slugify
 from businesses.models import Business, Category, City, Country
+from businesses.external_refs import ExternalSync
+from businesses.google_places_client import GooglePlacesClient
 from businesses.google_places_config import (
-    GOOGLE_PLACES_API_KEY, GOOGLE_PLACES_SEARCH_URL, GOOGLE_PLACES_DETAILS_URL,
-    MAX_RESULTS_PER_SEARCH, SEARCH_CATEGORIES, PRIORITY_CITIES
+    GOOGLE_PLACES_API_KEY, MAX_RESULTS_PER_SEARCH, SEARCH_CATEGORIES, PRIORITY_CITIES
 )
 
 logger = logging.getLogger(__name__)
 
+# Fields refreshed on businesses that already exist
+GOOGLE_UPDATE_FIELDS = ['address', 'phone', 'website', 'latitude', 'longitude']
+
 class GooglePlacesService:
     """Service for importing real businesses from Google Places API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, client: GooglePlacesClient = None, refresh: bool = False):
         self.api_key = api_key or GOOGLE_PLACES_API_KEY
         if not self.api_key or self.api_key in ["YOUR_API_KEY_HERE", "your_google_places_api_key_here"]:
             raise ValueError("Google Places API key not configured")
         
-        self.session = requests.Session()
-        self.rate_limit_delay = 0.1  # Delay between requests
+        # Rate limiting, retries and caching live in the async client
+        self.client = client or GooglePlacesClient(self.api_key, refresh=refresh)
         
     def search_places(self, query: str, location: str = None) -> List[Dict]:
         """Search for places using Google Places API"""
         
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Goog-Api-Key': self.api_key,
-            'X-Goog-FieldMask': (
-                'places.id,places.displayName,places.primaryType,'
-                'places.formattedAddress,places.location,places.nationalPhoneNumber,'
-                'places.internationalPhoneNumber,places.websiteUri,places.businessStatus,'
-                'places.userRatingCount,places.rating,places.priceLevel,places.editorialSummary'
-            )
-        }
-        
         # Build search query
         search_query = query
         if location:
             search_query = f"{query} in {location}"
-            
-        payload = {
-            "textQuery": search_query,
-            "maxResultCount": MAX_RESULTS_PER_SEARCH,
-            "languageCode": "en",
-            "regionCode": "EU"  # Prefer European results
-        }
         
-        try:
-            response = self.session.post(
-                GOOGLE_PLACES_SEARCH_URL,
-                json=payload,
-                headers=headers,
-                timeout=10
-            )
-            
-            # Add rate limiting
-            time.sleep(self.rate_limit_delay)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('places', [])
-            else:
-                logger.error(f"Places API error: {response.status_code} - {response.text}")
-                return []
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Places API request failed: {e}")
-            return []
+        return self.client.search(search_query)
+    
+    def search_places_many(self, queries: List[str]) -> List[List[Dict]]:
+        """Run several text searches concurrently; one list of places per query"""
+        return self.client.search_all(queries)
     
     def get_place_details(self, place_id: str) -> Optional[Dict]:
         """Get detailed information for a specific place"""
-        
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Goog-Api-Key': self.api_key,
-            'X-Goog-FieldMask': (
-                'id,displayName,primaryType,formattedAddress,location,'
-                'nationalPhoneNumber,internationalPhoneNumber,websiteUri,'
-                'businessStatus,userRatingCount,rating,priceLevel,'
-                'editorialSummary,openingHours,photos'
-            )
-        }
-        
-        url = GOOGLE_PLACES_DETAILS_URL.format(place_id=place_id)
-        
-        try:
-            response = self.session.get(url, headers=headers, timeout=10)
-            time.sleep(self.rate_limit_delay)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Place details error: {response.status_code} - {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Place details request failed: {e}")
-            return None
+        return self.client.details(place_id)
+    
+    def get_places_details(self, place_ids: List[str]) -> List[Optional[Dict]]:
+        """Fetch details for many places concurrently (None where a fetch failed)"""
+        return self.client.details_all(place_ids)
     
     def parse_place_data(self, place_data: Dict) -> Dict:
         """Parse Google Places data into our business format"""
@@ -361,8 +307,8 @@ class GooglePlacesService:
         
         return None
     
-    def create_business_from_place(self, place_data: Dict, owner) -> Optional[Business]:
-        """Create a Business object from Google Places data with duplicate prevention"""
+    def build_business_from_place(self, place_data: Dict, owner) -> Optional[Business]:
+        """Build an unsaved Business from Google Places data, or None if it should be skipped"""
         
         parsed_data = self.parse_place_data(place_data)
         
@@ -403,70 +349,62 @@ class GooglePlacesService:
         #     logger.warning(f"Skipping potential duplicate business '{parsed_data['name']}' in {city.name}: {'; '.join(duplicate_issues)}")
         #     return None
             
-        # Check for exact matches by name and city (database constraint will catch this anyway)
-        if Business.objects.filter(name__iexact=parsed_data['name'], city=city).exists():
-            logger.warning(f"Exact duplicate found: '{parsed_data['name']}' in {city.name}. Skipping.")
+        # The upsert gives the business a unique slug
+        return Business(
+            name=parsed_data['name'],
+            category=category,
+            city=city,
+            owner=owner,
+            address=parsed_data['address'],
+            phone=parsed_data['phone'],
+            email=email,
+            website=parsed_data['website'],
+            description=parsed_data['description'],
+            latitude=parsed_data['latitude'],
+            longitude=parsed_data['longitude'],
+            status='active',
+            verified=True,  # Google Places data is verified
+            featured=False
+        )
+    
+    def create_business_from_place(self, place_data: Dict, owner) -> Optional[Business]:
+        """Create a Business object from Google Places data with duplicate prevention"""
+        business = self.build_business_from_place(place_data, owner)
+        if not business:
             return None
         
-        # Create unique slug
-        base_slug = slugify(parsed_data['name'])
-        slug = base_slug
-        counter = 1
-        while Business.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
         try:
-            business = Business.objects.create(
-                name=parsed_data['name'],
-                slug=slug,
-                category=category,
-                city=city,
-                owner=owner,
-                address=parsed_data['address'],
-                phone=parsed_data['phone'],
-                email=email,
-                website=parsed_data['website'],
-                description=parsed_data['description'],
-                latitude=parsed_data['latitude'],
-                longitude=parsed_data['longitude'],
-                status='active',
-                verified=True,  # Google Places data is verified
-                featured=False
-            )
-            
-            logger.info(f"Created business: {business.name} in {city.name}")
-            return business
-            
+            counts = ExternalSync('google', GOOGLE_UPDATE_FIELDS).write([(place_data.get('id', ''), business)])
         except Exception as e:
-            # Check if it's a duplicate constraint violation
-            if 'unique_business' in str(e).lower() or 'duplicate' in str(e).lower():
-                logger.warning(f"Duplicate constraint prevented creation of '{parsed_data['name']}' in {city.name}")
-                return None
-            else:
-                logger.error(f"Failed to create business {parsed_data['name']}: {e}")
-                return None
+            logger.error(f"Failed to create business {business.name}: {e}")
+            return None
+        
+        if not counts['created']:
+            logger.warning(f"Existing or duplicate business: '{business.name}' in {business.city.name}. Not created.")
+            return None
+        
+        logger.info(f"Created business: {business.name} in {business.city.name}")
+        return business
     
     def save_places_to_database(self, places: List[Dict], owner, category_name: str, city_location: str) -> int:
         """
         Save a list of places to the database
         Returns the number of businesses successfully created
         """
-        created_count = 0
-        
         if not places:
             return 0
         
-        # Extract city name from location string (e.g., "Amsterdam, Netherlands" -> "Amsterdam")
-        city_name = city_location.split(',')[0].strip()
-        
+        records = []
         for place_data in places:
             try:
-                business = self.create_business_from_place(place_data, owner, category_name, city_name)
+                business = self.build_business_from_place(place_data, owner)
                 if business:
-                    created_count += 1
+                    records.append((place_data.get('id', ''), business))
             except Exception as e:
                 logger.error(f"Failed to process place {place_data.get('displayName', {}).get('text', 'Unknown')}: {e}")
                 continue
         
-        return created_count
\ No newline at end of file
+        # Unchanged places are skipped; known businesses only get their contact details refreshed
+        counts = ExternalSync('google', GOOGLE_UPDATE_FIELDS).write(records)
+        logger.info(f"Saved places for {city_location}: {counts}")
+        return counts['created']
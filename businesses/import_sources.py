@@ -0,0 +1,181 @@
+"""
+Business sources for the partitioned import runner.
+
+A source turns one city into a stream of ``(external_id, unsaved Business)``
+pairs. The stream must come out in the same order every time it is read for
+the same city, because a resumed partition skips the rows it already wrote.
+Sources with an ``external_source`` are synced through ExternalReference, so
+records that did not change since the last import are not written again.
+"""
+
+import random
+
+from django.contrib.auth import get_user_model
+from django.utils.text import slugify
+
+from .models import Business, Category
+from .pipeline import business_from_osm
+
+# Categories and name templates for generated sample listings
+MAIN_CATEGORIES = [
+    'Restaurant', 'Technology', 'Tourism', 'Retail', 'Health', 'Education',
+    'Finance', 'Real Estate', 'Services', 'Manufacturing', 'Construction', 'Transportation'
+]
+
+BUSINESS_TEMPLATES = {
+    'Restaurant': ['{} Restaurant', '{} Bistro', '{} Café', '{} Grill', '{} Kitchen'],
+    'Technology': ['{} Tech', '{} Digital', '{} Software', '{} Solutions', '{} Systems'],
+    'Tourism': ['Hotel {}', '{} Hotel', '{} Tours', '{} Travel', '{} Hospitality'],
+    'Retail': ['{} Store', '{} Shop', '{} Market', '{} Trading', '{} Commerce'],
+    'Health': ['{} Medical', '{} Health', '{} Clinic', '{} Care', '{} Wellness'],
+    'Education': ['{} Academy', '{} Institute', '{} School', '{} Education', '{} Learning'],
+    'Finance': ['{} Bank', '{} Finance', '{} Capital', '{} Investment', '{} Financial'],
+    'Real Estate': ['{} Properties', '{} Realty', '{} Estates', '{} Housing', '{} Development'],
+    'Services': ['{} Services', '{} Consulting', '{} Solutions', '{} Support', '{} Professional'],
+    'Manufacturing': ['{} Industries', '{} Manufacturing', '{} Production', '{} Factory', '{} Works'],
+    'Construction': ['{} Construction', '{} Building', '{} Engineering', '{} Projects', '{} Development'],
+    'Transportation': ['{} Transport', '{} Logistics', '{} Shipping', '{} Moving', '{} Delivery'],
+}
+
+NAME_SUFFIXES = ['Central', 'Premium', 'Elite', 'Pro', 'Plus', 'Group', 'Company', 'Ltd']
+
+
+class BusinessSource:
+    """Base class: yields (external_id, unsaved business) pairs for a city"""
+
+    name = None
+    # Source name of the external IDs (None: rows have no stable ID)
+    external_source = None
+    # Fields refreshed on businesses that already exist ([] = insert only)
+    update_fields = []
+
+    def __init__(self, limit=60, refresh=False, workers=1):
+        self.limit = limit
+        # Fetch again instead of replaying cached API responses
+        self.refresh = refresh
+        # Processes running this source at once, which split the API rate limits
+        self.workers = workers
+
+    def rows(self, city):
+        raise NotImplementedError
+
+
+class OSMSource(BusinessSource):
+    """Businesses around the city centre from the OpenStreetMap Overpass API"""
+
+    name = 'osm'
+    external_source = 'osm'
+    update_fields = ['address', 'phone', 'website', 'latitude', 'longitude']
+
+    def __init__(self, limit=60, refresh=False, workers=1):
+        super().__init__(limit, refresh, workers)
+        # Reuse the query and category mapping of the collector command
+        from .management.commands.collect_businesses import Command as CollectCommand
+        from .overpass import OVERPASS_BURST, OVERPASS_CONCURRENCY, OVERPASS_RATE, OverpassClient
+        self.collector = CollectCommand()
+        # Every worker process has its own client: together they keep to one host's budget
+        self.collector.overpass = OverpassClient(
+            rate=OVERPASS_RATE / workers,
+            burst=max(1, OVERPASS_BURST // workers),
+            concurrency=max(1, OVERPASS_CONCURRENCY // workers),
+            refresh=refresh,
+        )
+        self.owner = get_user_model().objects.filter(username='admin').first()
+
+    def rows(self, city):
+        if city.latitude is None or city.longitude is None or not self.owner:
+            return
+        places = self.collector.get_osm_businesses(
+            city.name, city.country.name, float(city.latitude), float(city.longitude), self.limit
+        )
+        for place in sorted(places, key=lambda place: (place['name'], place['latitude'], place['longitude'])):
+            category = self.collector.get_category_for_business(place['type'])
+            if not category:
+                continue
+            yield place['osm_id'], business_from_osm(place, city, category, self.owner)
+
+
+class GooglePlacesSource(BusinessSource):
+    """Text searches per category with the Google Places API"""
+
+    name = 'google'
+    external_source = 'google'
+    update_fields = ['address', 'phone', 'website', 'latitude', 'longitude']
+
+    def __init__(self, limit=60, refresh=False, workers=1):
+        super().__init__(limit, refresh, workers)
+        from .google_places_client import GooglePlacesClient
+        from .google_places_config import (
+            GOOGLE_PLACES_API_KEY, GOOGLE_PLACES_BURST, GOOGLE_PLACES_CONCURRENCY, GOOGLE_PLACES_RATE_LIMIT,
+            SEARCH_CATEGORIES, SEARCHES_PER_CITY,
+        )
+        from .google_places_service import GooglePlacesService
+        # The API quota is per key, so the worker processes split it
+        self.service = GooglePlacesService(client=GooglePlacesClient(
+            GOOGLE_PLACES_API_KEY,
+            rate=GOOGLE_PLACES_RATE_LIMIT / workers,
+            burst=max(1, GOOGLE_PLACES_BURST // workers),
+            concurrency=max(1, GOOGLE_PLACES_CONCURRENCY // workers),
+            refresh=refresh,
+        ))
+        self.searches = SEARCH_CATEGORIES[:SEARCHES_PER_CITY]
+        self.owner = get_user_model().objects.first()
+
+    def rows(self, city):
+        produced = 0
+        # All searches of a city run concurrently
+        results = self.service.search_places_many(
+            [f"{category} in {city.name}, {city.country.name}" for category in self.searches]
+        )
+        for places in results:
+            for place in sorted(places, key=lambda place: place.get('id', '')):
+                business = self.service.build_business_from_place(place, self.owner)
+                if business is None or business.city_id != city.pk:
+                    continue
+                yield place['id'], business
+                produced += 1
+                if produced >= self.limit:
+                    return
+
+
+class SampleSource(BusinessSource):
+    """Generated placeholder listings (seeded per city, so reruns are identical)"""
+
+    name = 'sample'
+
+    def __init__(self, limit=15, refresh=False, workers=1):
+        super().__init__(limit, refresh, workers)
+        self.categories = list(Category.objects.filter(name__in=MAIN_CATEGORIES).order_by('name'))
+        self.owner = get_user_model().objects.filter(username='admin').first()
+
+    def rows(self, city):
+        if not self.categories or not self.owner:
+            return
+        rng = random.Random(f"{city.pk}-{city.name}")
+
+        # Ensure we have businesses in multiple categories
+        selected_categories = rng.sample(self.categories, min(8, len(self.categories)))
+        for _ in range(rng.randint(min(8, self.limit), self.limit)):
+            category = rng.choice(selected_categories)
+            template = rng.choice(BUSINESS_TEMPLATES.get(category.name, ['{} Business']))
+
+            # Add some variation to avoid duplicates
+            business_name = template.format(city.name)
+            if rng.choice([True, False]):
+                business_name += f' {rng.choice(NAME_SUFFIXES)}'
+
+            yield None, Business(
+                name=business_name,
+                owner=self.owner,
+                category=category,
+                city=city,
+                verified=True,
+                status='active',
+                description=f'Quality {category.name.lower()} services in {city.name}, {city.country.name}.',
+                phone=f'+{rng.randint(30, 99)} {rng.randint(200000000, 999999999)}',
+                email=f'info@{slugify(business_name)[:20]}.com',
+                address=f'{rng.choice(["Main Street", "Central Avenue", "Market Square", "Business District"])} {rng.randint(1, 200)}',
+            )
+
+
+SOURCES = {source.name: source for source in [OSMSource, GooglePlacesSource, SampleSource]}
@@ -0,0 +1,95 @@
+"""
+Backfill the canonical phone/email/address keys on existing businesses.
+New and edited businesses get their keys on save; run this once after
+deploying the key columns and again after any bulk import that bypassed save().
+"""
+
+from itertools import groupby
+from operator import attrgetter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from businesses.models import Business, City
+from businesses.normalization import normalize_phone, normalize_email, normalize_address
+
+KEY_FIELDS = ['phone_key', 'email_key', 'address_key']
+
+
+class Command(BaseCommand):
+    help = 'Compute normalized phone, email and address keys for existing businesses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per read chunk and per bulk update (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS('🔑 Backfilling normalized business keys...'))
+
+        country_codes = dict(City.objects.values_list('id', 'country__code'))
+        businesses = Business.objects.order_by('city_id', 'created_at').only(
+            'id', 'city_id', 'phone', 'email', 'address', *KEY_FIELDS
+        ).iterator(chunk_size=batch_size)
+
+        scanned = updated = collisions = 0
+        for city_id, city_businesses in groupby(businesses, key=attrgetter('city_id')):
+            country_code = country_codes.get(city_id)
+            seen_phones, seen_emails = set(), set()
+            changed = []
+
+            for business in city_businesses:
+                scanned += 1
+                phone_key = normalize_phone(business.phone, country_code)
+                email_key = normalize_email(business.email)
+                address_key = normalize_address(business.address)
+
+                # The oldest business keeps a contested key; newer ones are
+                # left blank so the unique constraints hold until merged.
+                if phone_key and phone_key in seen_phones:
+                    collisions += 1
+                    phone_key = ''
+                if email_key and email_key in seen_emails:
+                    collisions += 1
+                    email_key = ''
+                seen_phones.add(phone_key)
+                seen_emails.add(email_key)
+
+                new_keys = (phone_key, email_key, address_key)
+                if new_keys != tuple(getattr(business, field) for field in KEY_FIELDS):
+                    changed.append((business, new_keys))
+
+            updated += len(changed)
+            if changed and not dry_run:
+                self.write_city(changed, batch_size)
+
+        self.stdout.write(f'   📊 Businesses scanned: {scanned}')
+        self.stdout.write(f'   💾 Businesses {"to update" if dry_run else "updated"}: {updated}')
+        if collisions:
+            self.stdout.write(self.style.WARNING(
+                f'   ⚠️  {collisions} keys left blank because an older business in the same city already has them. '
+                'These are likely duplicates.'
+            ))
+
+    @transaction.atomic
+    def write_city(self, changed, batch_size):
+        """Clear then set the unique keys so swaps within a city never collide"""
+        businesses = [business for business, _ in changed]
+        for business in businesses:
+            business.phone_key = ''
+            business.email_key = ''
+        Business.objects.bulk_update(businesses, ['phone_key', 'email_key'], batch_size=batch_size)
+
+        for business, new_keys in changed:
+            business.phone_key, business.email_key, business.address_key = new_keys
+        Business.objects.bulk_update(businesses, KEY_FIELDS, batch_size=batch_size)
@@ -0,0 +1,112 @@
+"""
+Benchmark the Google Places pipeline offline against the local stub server.
+
+Runs text searches and detail fetches through GooglePlacesClient against
+businesses.places_stub (no network, no quota), then replays them from the
+response cache, and optionally builds and upserts the businesses inside a
+rolled-back transaction.
+
+    python manage.py benchmark_google_places --searches 100 --details 500 --rate 50
+    python manage.py benchmark_google_places --latency 0.1 --error-rate 0.1 --save
+"""
+
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from businesses.google_places_client import GooglePlacesClient
+from businesses.google_places_config import SEARCH_CATEGORIES
+from businesses.google_places_service import GOOGLE_UPDATE_FIELDS, GooglePlacesService
+from businesses.models import Business, City
+from businesses.places_stub import PlacesStubServer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the async Google Places client against a local stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=50, help='Text searches to run (default: 50)')
+        parser.add_argument('--details', type=int, default=200, help='Place details to fetch (default: 200)')
+        parser.add_argument('--rate', type=float, default=50, help='Requests per second (default: 50)')
+        parser.add_argument('--burst', type=int, default=10, help='Token bucket size (default: 10)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight (default: 16)')
+        parser.add_argument('--latency', type=float, default=0.05, help='Stub response time in seconds (default: 0.05)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of 429/503 responses (default: 0)')
+        parser.add_argument(
+            '--save',
+            action='store_true',
+            help='Also build and upsert the businesses (rolled back afterwards)'
+        )
+
+    def handle(self, *args, **options):
+        cities = City.objects.select_related('country').order_by('-population')[:10]
+        locations = [f'{city.name}, {city.country.name}' for city in cities] or ['Lisboa, Portugal']
+        queries = [
+            f'{SEARCH_CATEGORIES[i % len(SEARCH_CATEGORIES)]} in {locations[i % len(locations)]}'
+            for i in range(options['searches'])
+        ]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Benchmarking {len(queries)} searches + {options["details"]} details '
+            f'(rate {options["rate"]:g}/s, burst {options["burst"]}, concurrency {options["concurrency"]}, '
+            f'latency {options["latency"]:g}s, errors {options["error_rate"]:.0%})'
+        ))
+
+        with PlacesStubServer(latency=options['latency'], error_rate=options['error_rate']) as stub, \
+                tempfile.TemporaryDirectory() as cache_dir:
+            def make_client():
+                return GooglePlacesClient(
+                    'stub-key', cache_dir=cache_dir, rate=options['rate'], burst=options['burst'],
+                    concurrency=options['concurrency'], search_url=stub.search_url, details_url=stub.details_url,
+                )
+
+            for label, client in (('🌐 Cold', make_client()), ('💾 Cached', make_client())):
+                started = time.monotonic()
+                results = client.search_all(queries)
+                search_time = time.monotonic() - started
+
+                place_ids = [place['id'] for places in results for place in places][:options['details']]
+                started = time.monotonic()
+                client.details_all(place_ids)
+                details_time = time.monotonic() - started
+
+                self.stdout.write(
+                    f'{label}: searches {self.rate(len(queries), search_time)}, '
+                    f'details {self.rate(len(place_ids), details_time)} '
+                    f'({client.stats["fetched"]} fetched, {client.stats["cache_hits"]} cached, '
+                    f'{client.stats["retries"]} retries, {client.stats["failed"]} failed)'
+                )
+
+            self.stdout.write(f'🧪 Stub served {stub.requests} requests, {stub.errors} injected errors')
+
+            if options['save']:
+                self.save(GooglePlacesService('stub-key', client=make_client()), results)
+
+    def save(self, service, results):
+        owner = User.objects.first()
+        started = time.monotonic()
+        rows = [
+            business
+            for places in results for place in places
+            for business in [service.build_business_from_place(place, owner)] if business
+        ]
+        build_time = time.monotonic() - started
+
+        started = time.monotonic()
+        with transaction.atomic():
+            counts = Business.objects.bulk_upsert(rows, update_fields=GOOGLE_UPDATE_FIELDS)
+            transaction.set_rollback(True)
+        upsert_time = time.monotonic() - started
+
+        self.stdout.write(
+            f'🏢 Pipeline: built {self.rate(len(rows), build_time)}, '
+            f'upserted {self.rate(len(rows), upsert_time)} '
+            f'({counts["created"]} created, rolled back)'
+        )
+
+    @staticmethod
+    def rate(count, elapsed):
+        return f'{count} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f}/s)'
@@ -1,8 +1,12 @@
 from django.core.management.base import BaseCommand
 from django.utils.text import slugify
 from businesses.models import Business
+from businesses.slugs import SlugAllocator
 import re
 
+# Changed slugs written per bulk update
+BATCH_SIZE = 500
+
 class Command(BaseCommand):
     help = 'Clean up business slugs to remove unnecessary suffixes'
 
@@ -16,12 +20,17 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         
-        businesses = Business.objects.all()
+        businesses = Business.objects.select_related('category').only('id', 'name', 'slug', 'category__name')
         updated_count = 0
+        changed = []
         
         self.stdout.write(f"Processing {businesses.count()} businesses...")
         
-        for business in businesses:
+        # Every taken slug is loaded once; suffixes are handed out in memory
+        allocator = SlugAllocator(Business.objects.all())
+        allocator.load_all()
+        
+        for business in businesses.iterator(chunk_size=2000):
             original_slug = business.slug
             
             # Create a clean slug from just the business name
@@ -49,25 +58,28 @@ class Command(BaseCommand):
                 new_slug = f"{new_slug}-{slugify(business.category.name)}"
             
             # Check for duplicates and add number if needed
-            base_slug = new_slug
-            counter = 1
-            while Business.objects.filter(slug=new_slug).exclude(id=business.id).exists():
-                new_slug = f"{base_slug}-{counter}"
-                counter += 1
+            new_slug = allocator.allocate(new_slug, pk=business.id)
             
             if original_slug != new_slug:
+                allocator.release(original_slug, business.id)
                 if dry_run:
                     self.stdout.write(
                         f"Would update '{business.name}': {original_slug} → {new_slug}"
                     )
                 else:
                     business.slug = new_slug
-                    business.save(update_fields=['slug'])
+                    changed.append(business)
+                    if len(changed) >= BATCH_SIZE:
+                        Business.objects.bulk_update(changed, ['slug'])
+                        changed = []
                     self.stdout.write(
                         self.style.SUCCESS(f"Updated '{business.name}': {original_slug} → {new_slug}")
                     )
                 updated_count += 1
         
+        if changed:
+            Business.objects.bulk_update(changed, ['slug'])
+        
         if dry_run:
             self.stdout.write(f"\nDry run complete. Would update {updated_count} business slugs.")
         else:
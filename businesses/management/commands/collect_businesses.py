@@ -1,10 +1,14 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db.models import Count
 from businesses.models import Country, City, Category, Business
-import requests
-import time
-import json
-import random
-from decimal import Decimal
+from businesses.external_refs import ExternalSync
+from businesses.overpass import OSM_CATEGORY_MAPPING, OverpassClient, build_business_query, parse_businesses
+from businesses.pipeline import business_from_osm
+
+User = get_user_model()
+
+OSM_UPDATE_FIELDS = ['address', 'phone', 'website', 'latitude', 'longitude']
 
 
 class Command(BaseCommand):
@@ -16,44 +20,29 @@ class Command(BaseCommand):
         self.skipped_businesses = 0
         self.errors = 0
         self.processed_cities = 0
+        self.categories = {}
+        self.overpass = OverpassClient()
         
         # OSM to category mapping
-        self.osm_category_mapping = {
-            'restaurant': 'Fine Dining Restaurants',
-            'fast_food': 'Fast Food Restaurants',
-            'cafe': 'Coffee Shops',
-            'pub': 'Pubs',
-            'bar': 'Cocktail Bars',
-            'hotel': 'Business Hotels',
-            'pharmacy': 'Pharmacies',
-            'bank': 'Banks',
-            'hospital': 'General Hospitals',
-            'doctors': 'Private Clinics',
-            'dentist': 'Dental Clinics',
-            'hairdresser': 'Hair Salons',
-            'beauty': 'Beauty Salons',
-            'shop': 'Department Stores',
-            'supermarket': 'Department Stores',
-            'clothes': 'Clothing Stores',
-            'shoes': 'Shoe Stores',
-            'bakery': 'Bakeries',
-            'fuel': 'Gas Stations',
-            'car_repair': 'Auto Repair Shops',
-            'cinema': 'Movie Theaters',
-            'theatre': 'Theaters',
-            'museum': 'Museums',
-            'university': 'Universities',
-            'school': 'Universities',
-            'fitness_centre': 'Fitness Centers',
-            'gym': 'Fitness Centers',
-            'nightclub': 'Nightclubs',
-            'casino': 'Casinos',
-            'atm': 'ATMs',
-            'car_wash': 'Car Wash',
-            'taxi': 'Taxi Services',
-        }
+        self.osm_category_mapping = OSM_CATEGORY_MAPPING
     
     def add_arguments(self, parser):
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Only replay cached Overpass responses, never hit the network'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Fetch every city again instead of replaying cached Overpass responses'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Overpass requests in flight at once (default: 2)'
+        )
         parser.add_argument(
             '--cities',
             type=int,
@@ -66,118 +55,31 @@ class Command(BaseCommand):
             default=60,
             help='Target businesses per city (default: 60)'
         )
+        parser.add_argument(
+            '--owner',
+            default='admin',
+            help='Username that owns the imported businesses (default: admin)'
+        )
     
     def get_osm_businesses(self, city_name, country_name, latitude, longitude, limit=60):
         """Get businesses from OpenStreetMap using Overpass API"""
-        
-        # Overpass API query for various business types
-        overpass_query = f"""
-        [out:json][timeout:25];
-        (
-          node["amenity"~"^(restaurant|fast_food|cafe|pub|bar|hotel|pharmacy|bank|hospital|doctors|dentist|fuel|cinema|theatre|museum|university|school|fitness_centre|gym|nightclub|casino|atm|car_wash|taxi)$"](around:5000,{latitude},{longitude});
-          node["shop"~"^(supermarket|clothes|shoes|bakery|hairdresser|beauty|convenience|mall|department_store|electronics|books|sports|jewelry|furniture|florist|hardware)$"](around:5000,{latitude},{longitude});
-          node["tourism"~"^(hotel|hostel|guest_house|attraction|museum|gallery)$"](around:5000,{latitude},{longitude});
-          node["office"~"^(lawyer|accountant|insurance|real_estate|employment_agency|it|architect|engineer)$"](around:5000,{latitude},{longitude});
-        );
-        out center meta;
-        """
-        
-        overpass_url = "http://overpass-api.de/api/interpreter"
-        
-        try:
-            response = requests.post(
-                overpass_url,
-                data=overpass_query,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                businesses = []
-                
-                for element in data.get('elements', []):
-                    if len(businesses) >= limit:
-                        break
-                        
-                    tags = element.get('tags', {})
-                    name = tags.get('name', '')
-                    
-                    if not name:
-                        continue
-                    
-                    # Determine business type
-                    business_type = None
-                    for key in ['amenity', 'shop', 'tourism', 'office']:
-                        if key in tags:
-                            business_type = tags[key]
-                            break
-                    
-                    if not business_type:
-                        continue
-                    
-                    # Get coordinates
-                    if 'lat' in element and 'lon' in element:
-                        lat = element['lat']
-                        lon = element['lon']
-                    elif 'center' in element:
-                        lat = element['center']['lat']
-                        lon = element['center']['lon']
-                    else:
-                        continue
-                    
-                    # Get address info
-                    address = self.build_address(tags)
-                    phone = tags.get('phone', '')
-                    website = tags.get('website', '')
-                    
-                    businesses.append({
-                        'name': name,
-                        'type': business_type,
-                        'latitude': lat,
-                        'longitude': lon,
-                        'address': address,
-                        'phone': phone,
-                        'website': website
-                    })
-                
-                return businesses
-                
-            else:
-                self.stdout.write(
-                    self.style.ERROR(f'❌ API Error {response.status_code} for {city_name}')
-                )
-                return []
-                
-        except Exception as e:
+        data = self.overpass.fetch(build_business_query(latitude, longitude))
+        if data is None:
             self.stdout.write(
-                self.style.ERROR(f'❌ Request failed for {city_name}: {str(e)}')
+                self.style.ERROR(f'❌ Request failed for {city_name}')
             )
             return []
-    
-    def build_address(self, tags):
-        """Build address from OSM tags"""
-        address_parts = []
-        
-        if 'addr:housenumber' in tags:
-            address_parts.append(tags['addr:housenumber'])
-        if 'addr:street' in tags:
-            address_parts.append(tags['addr:street'])
-        if 'addr:city' in tags:
-            address_parts.append(tags['addr:city'])
-        if 'addr:postcode' in tags:
-            address_parts.append(tags['addr:postcode'])
-            
-        return ', '.join(address_parts) if address_parts else ''
+        return parse_businesses(data, limit)
     
     def get_category_for_business(self, business_type):
         """Map OSM business type to our category"""
         # Direct mapping
         if business_type in self.osm_category_mapping:
             category_name = self.osm_category_mapping[business_type]
-            try:
-                return Category.objects.get(name=category_name)
-            except Category.DoesNotExist:
-                pass
+            if category_name not in self.categories:
+                self.categories[category_name] = Category.objects.filter(name=category_name).first()
+            if self.categories[category_name]:
+                return self.categories[category_name]
         
         # Fallback to first available category
         try:
@@ -188,6 +90,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         max_cities = options['cities']
         businesses_per_city = options['businesses_per_city']
+        owner = User.objects.filter(username=options['owner']).first()
+        if not owner:
+            raise CommandError(f'Owner "{options["owner"]}" not found. Create this user first.')
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -203,7 +108,7 @@ class Command(BaseCommand):
         cities = City.objects.filter(
             latitude__isnull=False,
             longitude__isnull=False
-        ).order_by('-population')[:max_cities]
+        ).annotate(existing_count=Count('businesses')).select_related('country').order_by('-population')[:max_cities]
         
         if not cities.exists():
             self.stdout.write(
@@ -211,7 +116,31 @@ class Command(BaseCommand):
             )
             return
         
+        # Skip cities that already have enough businesses
+        to_fetch = []
         for city in cities:
+            if city.existing_count >= businesses_per_city:
+                self.processed_cities += 1
+                self.stdout.write(
+                    f'⏭️  Skipped: {city.name} already has {city.existing_count} businesses'
+                )
+            else:
+                to_fetch.append(city)
+        
+        # Fetch every remaining city concurrently (cached responses are replayed)
+        self.overpass = OverpassClient(
+            offline=options['offline'], concurrency=options['concurrency'], refresh=options['refresh']
+        )
+        responses = self.overpass.fetch_all(
+            build_business_query(float(city.latitude), float(city.longitude)) for city in to_fetch
+        )
+        self.stdout.write(
+            f'🌐 Overpass: {self.overpass.stats["fetched"]} fetched, '
+            f'{self.overpass.stats["cache_hits"]} from cache, {self.overpass.stats["failed"]} failed'
+        )
+        
+        sync = ExternalSync('osm', OSM_UPDATE_FIELDS)
+        for city, response in zip(to_fetch, responses):
             self.processed_cities += 1
             
             self.stdout.write(
@@ -219,93 +148,45 @@ class Command(BaseCommand):
                 f'({self.processed_cities}/{max_cities})'
             )
             
-            # Check if city already has enough businesses
-            existing_count = Business.objects.filter(city=city).count()
-            if existing_count >= businesses_per_city:
-                self.stdout.write(
-                    f'⏭️  Skipped: {city.name} already has {existing_count} businesses'
-                )
-                continue
-            
             # Get businesses from OpenStreetMap
-            businesses_data = self.get_osm_businesses(
-                city.name,
-                city.country.name,
-                float(city.latitude),
-                float(city.longitude),
-                businesses_per_city
-            )
+            businesses_data = parse_businesses(response, businesses_per_city)
             
             if not businesses_data:
                 self.stdout.write(f'❌ No businesses found for {city.name}')
                 self.errors += 1
                 continue
             
-            # Process each business
-            city_added = 0
+            # Build all rows for the city, then write them in one upsert
+            rows = []
             for business_data in businesses_data:
-                try:
-                    # Check if business already exists
-                    if Business.objects.filter(
-                        name=business_data['name'],
-                        city=city
-                    ).exists():
-                        self.skipped_businesses += 1
-                        continue
-                    
-                    # Get category
-                    category = self.get_category_for_business(business_data['type'])
-                    if not category:
-                        continue
-                    
-                    # Generate safe slug
-                    import re
-                    base_slug = re.sub(r'[^a-zA-Z0-9\-]', '', business_data['name'].lower().replace(' ', '-').replace('&', 'and'))
-                    base_slug = base_slug[:40]  # Limit length
-                    city_slug = re.sub(r'[^a-zA-Z0-9\-]', '', city.name.lower().replace(' ', '-'))
-                    slug = f"{base_slug}-{city_slug}-{self.added_businesses}"
-                    
-                    # Generate safe email
-                    safe_name = re.sub(r'[^a-zA-Z0-9]', '', business_data['name'].lower())[:20]
-                    email = f"info.{safe_name}@example.com"
-                    
-                    # Create business - need to add required fields
-                    business = Business.objects.create(
-                        name=business_data['name'][:200],  # Limit to field max length
-                        slug=slug,
-                        description=f"{business_data['name']} - {category.name} in {city.name}, {city.country.name}",
-                        email=email,
-                        category=category,
-                        city=city,
-                        address=business_data['address'][:500] if business_data['address'] else f"{city.name}, {city.country.name}",
-                        phone=business_data['phone'][:20],
-                        website=business_data['website'][:200] if business_data['website'] else '',
-                        latitude=Decimal(str(business_data['latitude'])),
-                        longitude=Decimal(str(business_data['longitude'])),
-                        owner_id=2  # Admin user
-                    )
-                    
-                    self.added_businesses += 1
-                    city_added += 1
-                    
-                    if city_added % 10 == 0:
-                        self.stdout.write(f'  ✅ Added {city_added} businesses to {city.name}')
-                    
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f'❌ Error adding {business_data["name"]}: {str(e)}'
-                        )
-                    )
-                    self.errors += 1
+                # Get category
+                category = self.get_category_for_business(business_data['type'])
+                if not category:
                     continue
+                # The upsert adds a suffix to a slug that is taken
+                rows.append((business_data['osm_id'], business_from_osm(business_data, city, category, owner)))
+            
+            try:
+                # Unchanged OSM nodes are skipped; known businesses only get their contact details refreshed
+                counts = sync.write(rows)
+            except Exception as e:
+                self.stdout.write(
+                    self.style.ERROR(f'❌ Error saving businesses for {city.name}: {str(e)}')
+                )
+                self.errors += 1
+                continue
+            
+            city_added = counts['created']
+            self.added_businesses += counts['created']
+            self.skipped_businesses += counts['unchanged'] + counts['updated'] + counts['duplicates']
             
             self.stdout.write(
-                self.style.SUCCESS(f'✅ {city.name}: Added {city_added} businesses')
+                self.style.SUCCESS(
+                    f'✅ {city.name}: Added {city_added} businesses '
+                    f'({counts["updated"]} updated, {counts["unchanged"]} unchanged, '
+                    f'{counts["duplicates"]} duplicates)'
+                )
             )
-            
-            # Rate limiting - respect OpenStreetMap's usage policy
-            time.sleep(1)
         
         # Final statistics
         self.stdout.write('\n' + '='*60)
@@ -327,7 +208,6 @@ class Command(BaseCommand):
         
         # Show top cities by business count
         self.stdout.write('\n📊 Top 10 Cities by Business Count:')
-        from django.db.models import Count
         top_cities = City.objects.annotate(
             business_count=Count('businesses')
         ).order_by('-business_count')[:10]
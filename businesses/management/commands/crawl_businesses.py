@@ -0,0 +1,174 @@
+"""
+Crawl city bounding boxes from OpenStreetMap with adaptive quadtree tiles.
+
+Unlike collect_businesses (one 5 km query per city, truncated at a fixed
+limit), each city's box is split wherever the Overpass results hit the
+per-tile cap, so coverage follows business density. Businesses are linked
+to their OSM node, so a re-crawl only writes changed nodes, and a coverage
+report is printed per city.
+
+    python manage.py crawl_businesses --countries PT --cities 20
+    python manage.py crawl_businesses --countries FR --cities 1 --max-depth 8 --offline
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from businesses.external_refs import ExternalSync
+from businesses.models import Category, City
+from businesses.overpass import OSM_CATEGORY_MAPPING, OverpassClient
+from businesses.pipeline import business_from_osm
+from businesses.tiling import MAX_DEPTH, TILE_CAP, TileCrawler
+from .collect_businesses import OSM_UPDATE_FIELDS
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Crawl businesses per city with adaptive quadtree tiles and report coverage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--countries',
+            nargs='+',
+            help='Country codes to crawl (default: all active countries)'
+        )
+        parser.add_argument(
+            '--cities',
+            type=int,
+            default=10,
+            help='Only the N most populated cities (default: 10)'
+        )
+        parser.add_argument(
+            '--radius',
+            type=float,
+            help='Half the side of each city box in km (default: scaled by population)'
+        )
+        parser.add_argument(
+            '--cap',
+            type=int,
+            default=TILE_CAP,
+            help=f'Results per tile query; a full tile is split (default: {TILE_CAP})'
+        )
+        parser.add_argument(
+            '--max-depth',
+            type=int,
+            default=MAX_DEPTH,
+            help=f'Deepest quadtree level (default: {MAX_DEPTH})'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Overpass requests in flight at once (default: 2)'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Only replay cached Overpass responses, never hit the network'
+        )
+        parser.add_argument(
+            '--owner',
+            default='admin',
+            help='Username that owns the imported businesses (default: admin)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Crawl and report coverage without saving businesses'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        owner = User.objects.filter(username=options['owner']).first()
+        if not owner:
+            raise CommandError(f'Owner "{options["owner"]}" not found. Create this user first.')
+
+        cities = City.objects.filter(
+            country__is_active=True, latitude__isnull=False, longitude__isnull=False
+        ).select_related('country')
+        if options['countries']:
+            cities = cities.filter(country__code__in=[code.upper() for code in options['countries']])
+        cities = list(cities.order_by('-population')[:options['cities']])
+        if not cities:
+            raise CommandError('No cities with coordinates found!')
+
+        categories = {
+            category.name: category
+            for category in Category.objects.filter(name__in=set(OSM_CATEGORY_MAPPING.values()))
+        }
+        self.categories = {kind: categories.get(name) for kind, name in OSM_CATEGORY_MAPPING.items()}
+        self.fallback_category = Category.objects.first()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Crawling {len(cities)} cities (cap {options["cap"]}, max depth {options["max_depth"]})'
+        ))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No data will be saved'))
+
+        client = OverpassClient(offline=options['offline'], concurrency=options['concurrency'])
+        crawler = TileCrawler(client, cap=options['cap'], max_depth=options['max_depth'])
+        started = time.monotonic()
+        coverages = crawler.crawl(
+            cities, radius_km=options['radius'],
+            on_level=lambda depth, tiles: self.stdout.write(f'🔲 Level {depth}: {tiles} tiles'),
+        )
+        self.stdout.write(
+            f'🌐 Overpass: {client.stats["fetched"]} fetched, '
+            f'{client.stats["cache_hits"]} from cache, {client.stats["failed"]} failed '
+            f'in {time.monotonic() - started:.1f}s'
+        )
+
+        totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'stale': 0}
+        sync = ExternalSync('osm', OSM_UPDATE_FIELDS)
+        self.stdout.write('\n📊 Coverage per city:')
+        for coverage in coverages:
+            city = coverage.city
+            rows = [
+                (place['osm_id'], business) for place in coverage.places
+                for business in [self.build_business(place, city, owner)] if business
+            ]
+            with transaction.atomic():
+                # Unchanged OSM nodes are skipped; known businesses only get their contact details refreshed
+                counts = sync.write(rows)
+                # Only a fully covered city proves that unseen nodes are gone
+                counts['stale'] = sync.mark_stale(business__city=city) if coverage.coverage >= 1 else 0
+                if dry_run:
+                    transaction.set_rollback(True)
+            for key in totals:
+                totals[key] += counts[key]
+
+            style = self.style.SUCCESS if coverage.coverage >= 1 else self.style.WARNING
+            self.stdout.write(style(
+                f'  {city.name}, {city.country.code}: {coverage.coverage:.0%} covered, '
+                f'{len(coverage.places)} businesses, {coverage.tiles} tiles '
+                f'(depth {coverage.max_depth}, {coverage.splits} split, {coverage.empty} empty) '
+                f'→ {counts["created"]} created, {counts["updated"]} updated'
+            ))
+            if coverage.truncated_km2:
+                self.stdout.write(self.style.WARNING(
+                    f'    ⚠️  {coverage.truncated_km2:.1f} km² still capped at max depth'
+                ))
+            if coverage.failed_km2:
+                self.stdout.write(self.style.ERROR(
+                    f'    ❌ {coverage.failed_km2:.1f} km² could not be fetched'
+                ))
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(self.style.SUCCESS('🎉 Crawl complete!'))
+        self.stdout.write(f'🏙️  Cities crawled: {len(coverages)}')
+        self.stdout.write(f'🔁 Nodes shared between tiles or cities: {sum(c.duplicates for c in coverages)}')
+        self.stdout.write(f'✅ Created: {totals["created"]}')
+        self.stdout.write(f'🔄 Updated: {totals["updated"]}')
+        self.stdout.write(f'⏭️  Unchanged: {totals["unchanged"]}')
+        if totals['duplicates']:
+            self.stdout.write(self.style.WARNING(f'⚠️  Duplicates skipped: {totals["duplicates"]}'))
+        if totals['stale']:
+            self.stdout.write(self.style.WARNING(f'🗑️  No longer in OpenStreetMap (marked stale): {totals["stale"]}'))
+
+    def build_business(self, place, city, owner):
+        category = self.categories.get(place['type']) or self.fallback_category
+        if category is None:
+            return None
+        return business_from_osm(place, city, category, owner)
@@ -1,10 +1,51 @@
-from django.core.management.base import BaseCommand
-from django.core import serializers
-from businesses.models import Business, City, Country, Category
+"""
+Export all business data for migration to a new framework.
+
+Every table is streamed in keyset-paginated chunks (memory stays flat at
+any table size) to JSON Lines in Django's jsonl fixture format (loadable
+with loaddata) and/or CSV, optionally gzip or zstd compressed. Tables are
+exported in parallel, and a manifest with the row count, size and SHA-256
+of every file is written last.
+
+Incremental mode exports only the rows whose updated_at moved, plus
+tombstones for deleted rows: --since gives the start explicitly, --feed
+continues from the watermark stored by the feed's previous run (the first
+run of a feed exports everything). Tables without updated_at (countries,
+cities) are small and always exported whole.
+
+    python manage.py export_for_migration
+    python manage.py export_for_migration --format json --compression zstd
+    python manage.py export_for_migration --format csv --workers 2 --output-dir /backups/export
+    python manage.py export_for_migration --format json --feed search-index
+    python manage.py export_for_migration --since 2025-10-01T00:00:00Z
+"""
+
+import importlib.util
 import json
-import csv
 import os
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from businesses.exporting import (
+    COMPRESSION_SUFFIXES, EXPORT_CHUNK_SIZE, ExportFile, migration_tables, tombstone_table,
+)
+from businesses.models import ExportWatermark, Tombstone
+
+# --format value -> (ExportTable method, file extension)
+FORMATS = {'json': ('jsonl', 'jsonl'), 'csv': ('csv', 'csv')}
+
+# Incremental windows end this far in the past, so rows written by
+# transactions still open when the export starts are picked up next time
+WATERMARK_LAG = timedelta(seconds=30)
+# Tombstones are kept at least this long, and as long as a feed still needs them
+TOMBSTONE_RETENTION = timedelta(days=90)
 
 
 class Command(BaseCommand):
@@ -16,7 +57,7 @@ class Command(BaseCommand):
             type=str,
             choices=['json', 'csv', 'both'],
             default='both',
-            help='Export format (json, csv, or both)'
+            help='Export format (json = JSON Lines fixtures, csv, or both)'
         )
         parser.add_argument(
             '--output-dir',
@@ -24,228 +65,144 @@ class Command(BaseCommand):
             default='data_export',
             help='Output directory for exported files'
         )
+        parser.add_argument(
+            '--compression',
+            choices=list(COMPRESSION_SUFFIXES),
+            default='none',
+            help='Compress the exported files (zstd needs the zstandard package)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help=f'Rows read per query (default: {EXPORT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Files exported in parallel (default: 4)'
+        )
+        parser.add_argument(
+            '--since',
+            help='Only export rows changed (or deleted) since this ISO date/datetime'
+        )
+        parser.add_argument(
+            '--feed',
+            help='Incremental feed name: continue from its stored watermark and advance it'
+        )
 
     def handle(self, *args, **options):
         output_dir = options['output_dir']
         export_format = options['format']
-        
+        compression = options['compression']
+        if compression == 'zstd' and not importlib.util.find_spec('zstandard'):
+            raise CommandError('zstd compression needs the zstandard package: pip install zstandard')
+
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
+
         self.stdout.write(
             self.style.SUCCESS(f'Starting data export to {output_dir}/')
         )
-        
-        # Export in JSON format (preserves relationships)
-        if export_format in ['json', 'both']:
-            self.export_json(output_dir, timestamp)
-        
-        # Export in CSV format (easier to import into other systems)
-        if export_format in ['csv', 'both']:
-            self.export_csv(output_dir, timestamp)
-        
+
+        since = self.parse_since(options['since'])
+        feed = options['feed']
+        watermark = ExportWatermark.objects.filter(feed=feed).first() if feed else None
+        if since is None and watermark:
+            since = watermark.exported_until
+        incremental = since is not None
+        until = timezone.now() - WATERMARK_LAG
+
+        tables = migration_tables()
+        if incremental:
+            tables = [table.changed(since, until) for table in tables] + [tombstone_table(since, until)]
+            self.stdout.write(f'🔁 Incremental export of changes since {since.isoformat()}')
+
+        formats = ['json', 'csv'] if export_format == 'both' else [export_format]
+        jobs = [(table, name) for name in formats for table in tables]
+        label = f'changes_{timestamp}' if incremental else timestamp
+        started = time.monotonic()
+
+        files = []
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = [
+                pool.submit(self.export_table, table, name, output_dir, label, compression, options['chunk_size'])
+                for table, name in jobs
+            ]
+            for future in as_completed(futures):
+                entry = future.result()
+                files.append(entry)
+                self.stdout.write(
+                    f'  ✅ {entry["table"]} ({entry["format"]}): {entry["rows"]:,} records, '
+                    f'{entry["bytes"] / 1024 / 1024:.1f} MB in {entry["seconds"]:.1f}s → {entry["path"]}'
+                )
+
+        order = [(table.name, name) for table, name in jobs]
+        files.sort(key=lambda entry: order.index((entry['table'], entry['format'])))
+        manifest_path = os.path.join(output_dir, f'manifest_{timestamp}.json')
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'exported_at': datetime.now().isoformat(),
+                'seconds': round(time.monotonic() - started, 2),
+                'feed': feed,
+                'since': since.isoformat() if incremental else None,
+                'until': until.isoformat() if incremental else None,
+                'files': files,
+            }, f, indent=2)
+
+        self.stdout.write(f'📋 Manifest (row counts and checksums) → {manifest_path}')
+        if feed:
+            self.advance_watermark(feed, until, files, formats[0])
         self.stdout.write(
             self.style.SUCCESS('✅ Data export completed successfully!')
         )
 
-    def export_json(self, output_dir, timestamp):
-        """Export data in JSON format preserving relationships"""
-        self.stdout.write('📦 Exporting JSON data...')
-        
-        # Export each model separately for better organization
-        models_to_export = [
-            (Country, 'countries'),
-            (City, 'cities'), 
-            (Category, 'categories'),
-            (Business, 'businesses'),
-        ]
-        
-        for model, filename in models_to_export:
-            data = serializers.serialize('json', model.objects.all(), indent=2)
-            filepath = os.path.join(output_dir, f'{filename}_{timestamp}.json')
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(data)
-            
-            count = model.objects.count()
-            self.stdout.write(f'  ✅ {filename}: {count} records → {filepath}')
-
-    def export_csv(self, output_dir, timestamp):
-        """Export data in CSV format for easy import"""
-        self.stdout.write('📋 Exporting CSV data...')
-        
-        # Export Countries
-        self.export_countries_csv(output_dir, timestamp)
-        
-        # Export Cities
-        self.export_cities_csv(output_dir, timestamp)
-        
-        # Export Categories
-        self.export_categories_csv(output_dir, timestamp)
-        
-        # Export Businesses (main data)
-        self.export_businesses_csv(output_dir, timestamp)
-
-    def export_countries_csv(self, output_dir, timestamp):
-        filepath = os.path.join(output_dir, f'countries_{timestamp}.csv')
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'id', 'name', 'code', 'slug', 'is_eu_member', 'is_active'
-            ])
-            
-            for country in Country.objects.all():
-                writer.writerow([
-                    country.id,
-                    country.name,
-                    country.code,
-                    country.slug,
-                    country.is_eu_member,
-                    country.is_active
-                ])
-        
-        count = Country.objects.count()
-        self.stdout.write(f'  ✅ countries: {count} records → {filepath}')
-
-    def export_cities_csv(self, output_dir, timestamp):
-        filepath = os.path.join(output_dir, f'cities_{timestamp}.csv')
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'id', 'name', 'slug', 'country_name', 'country_code',
-                'latitude', 'longitude', 'population', 'is_capital'
-            ])
-            
-            for city in City.objects.select_related('country'):
-                writer.writerow([
-                    city.id,
-                    city.name,
-                    city.slug,
-                    city.country.name,
-                    city.country.code,
-                    str(city.latitude) if city.latitude else '',
-                    str(city.longitude) if city.longitude else '',
-                    city.population or '',
-                    city.is_capital
-                ])
-        
-        count = City.objects.count()
-        self.stdout.write(f'  ✅ cities: {count} records → {filepath}')
-
-    def export_categories_csv(self, output_dir, timestamp):
-        filepath = os.path.join(output_dir, f'categories_{timestamp}.csv')
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'id', 'name', 'slug', 'description', 'icon',
-                'parent_name', 'is_active', 'sort_order', 'created_at'
-            ])
-            
-            for category in Category.objects.select_related('parent'):
-                writer.writerow([
-                    category.id,
-                    category.name,
-                    category.slug,
-                    category.description,
-                    category.icon,
-                    category.parent.name if category.parent else '',
-                    category.is_active,
-                    category.sort_order,
-                    category.created_at.isoformat() if category.created_at else ''
-                ])
-        
-        count = Category.objects.count()
-        self.stdout.write(f'  ✅ categories: {count} records → {filepath}')
-
-    def export_businesses_csv(self, output_dir, timestamp):
-        """Export the main business data - this is your most valuable data!"""
-        filepath = os.path.join(output_dir, f'businesses_{timestamp}.csv')
-        
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'id', 'name', 'slug', 'description', 'short_description',
-                'email', 'phone', 'website', 'address', 
-                'city_name', 'country_name', 'postal_code',
-                'latitude', 'longitude', 'category_name', 
-                'plan', 'status', 'featured', 'verified',
-                'meta_title', 'meta_description', 'keywords',
-                'views_count', 'clicks_count',
-                'monday_hours', 'tuesday_hours', 'wednesday_hours',
-                'thursday_hours', 'friday_hours', 'saturday_hours', 'sunday_hours',
-                'created_at', 'updated_at', 'published_at'
-            ])
-            
-            for business in Business.objects.select_related('city__country', 'category'):
-                writer.writerow([
-                    str(business.id),
-                    business.name,
-                    business.slug,
-                    business.description,
-                    business.short_description,
-                    business.email,
-                    business.phone,
-                    business.website,
-                    business.address,
-                    business.city.name,
-                    business.city.country.name,
-                    business.postal_code,
-                    str(business.latitude) if business.latitude else '',
-                    str(business.longitude) if business.longitude else '',
-                    business.category.name,
-                    business.plan,
-                    business.status,
-                    business.featured,
-                    business.verified,
-                    business.meta_title,
-                    business.meta_description,
-                    business.keywords,
-                    business.views_count,
-                    business.clicks_count,
-                    business.monday_hours,
-                    business.tuesday_hours,
-                    business.wednesday_hours,
-                    business.thursday_hours,
-                    business.friday_hours,
-                    business.saturday_hours,
-                    business.sunday_hours,
-                    business.created_at.isoformat() if business.created_at else '',
-                    business.updated_at.isoformat() if business.updated_at else '',
-                    business.published_at.isoformat() if business.published_at else ''
-                ])
-        
-        count = Business.objects.count()
-        self.stdout.write(f'  ✅ businesses: {count} records → {filepath}')
-        
-        # Create summary file
-        summary_path = os.path.join(output_dir, f'export_summary_{timestamp}.txt')
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            f.write(f"ListAcross.eu Data Export Summary\n")
-            f.write(f"=====================================\n")
-            f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Export Format: CSV + JSON\n\n")
-            f.write(f"Records Exported:\n")
-            f.write(f"- Countries: {Country.objects.count()}\n")
-            f.write(f"- Cities: {City.objects.count()}\n")
-            f.write(f"- Categories: {Category.objects.count()}\n")
-            f.write(f"- Businesses: {Business.objects.count()}\n\n")
-            f.write(f"Key Data Fields Preserved:\n")
-            f.write(f"- Complete business information (name, contact, location)\n")
-            f.write(f"- Geographic data (coordinates, addresses)\n")
-            f.write(f"- Business categorization\n")
-            f.write(f"- SEO metadata (titles, descriptions, keywords)\n")
-            f.write(f"- Business hours and operational data\n")
-            f.write(f"- Statistics (views, clicks)\n")
-            f.write(f"- Timestamps for all records\n\n")
-            f.write(f"Files Generated:\n")
-            f.write(f"- businesses_{timestamp}.csv (main business data)\n")
-            f.write(f"- cities_{timestamp}.csv (location data) \n")
-            f.write(f"- countries_{timestamp}.csv (country data)\n")
-            f.write(f"- categories_{timestamp}.csv (business categories)\n")
-            f.write(f"- JSON files for each entity type\n")
-        
-        self.stdout.write(f'📋 Summary report → {summary_path}')
\ No newline at end of file
+    def parse_since(self, value):
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+            if since is None and parse_date(value):
+                since = datetime.combine(parse_date(value), datetime.min.time())
+        except ValueError:
+            since = None
+        if since is None:
+            raise CommandError(f'--since must be an ISO date or datetime, got "{value}"')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def advance_watermark(self, feed, until, files, export_format):
+        """Record the window end for the next run and prune tombstones no feed needs"""
+        entries = [entry for entry in files if entry['format'] == export_format]
+        ExportWatermark.objects.update_or_create(feed=feed, defaults={
+            'exported_until': until,
+            'rows': sum(entry['rows'] for entry in entries if entry['table'] != 'tombstones'),
+            'tombstones': sum(entry['rows'] for entry in entries if entry['table'] == 'tombstones'),
+        })
+        oldest = ExportWatermark.objects.aggregate(oldest=Min('exported_until'))['oldest']
+        pruned, _ = Tombstone.objects.filter(deleted_at__lt=min(oldest, timezone.now() - TOMBSTONE_RETENTION)).delete()
+        self.stdout.write(f'🔖 Feed "{feed}" exported until {until.isoformat()}')
+        if pruned:
+            self.stdout.write(f'🗑️  Pruned {pruned:,} tombstones no feed needs any more')
+
+    def export_table(self, table, export_format, output_dir, label, compression, chunk_size):
+        """Stream one table to one file (runs in a worker thread)"""
+        method, extension = FORMATS[export_format]
+        path = os.path.join(output_dir, f'{table.name}_{label}.{extension}')
+        started = time.monotonic()
+        try:
+            with ExportFile(path, compression) as output:
+                output.write_chunks(getattr(table, method)(chunk_size))
+        finally:
+            # Worker threads open their own connections
+            connections.close_all()
+        return {
+            'table': table.name,
+            'model': table.model._meta.label_lower,
+            'format': export_format,
+            'seconds': round(time.monotonic() - started, 2),
+            **output.manifest(),
+        }
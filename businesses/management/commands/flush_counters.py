@@ -0,0 +1,22 @@
+"""
+Flush Counters Management Command
+Applies the view/click counts buffered in the shared Redis hash to the database
+(run from cron so counts land even when the site is quiet)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from businesses.counters import business_counters
+
+
+class Command(BaseCommand):
+    help = 'Apply buffered business view/click counts to the database'
+
+    def handle(self, *args, **options):
+        if business_counters.backend is None:
+            raise CommandError(
+                'COUNTER_REDIS_URL is not set: counts are buffered per worker and flushed by the workers themselves'
+            )
+
+        self.stdout.write('🔢 Flushing buffered counters...')
+        updated = business_counters.flush()
+        self.stdout.write(self.style.SUCCESS(f'✅ Updated the counters of {updated} businesses'))
@@ -0,0 +1,368 @@
+"""
+Generate a production-sized synthetic dataset for benchmarking.
+
+Cities and categories are picked with Zipf distributions (a few big cities
+and popular categories hold most listings, like the real directory), every
+business sits at its city's real coordinates jittered by the city's size,
+part of them carry translations, and reviews are spread Zipf-wise over the
+businesses. Everything is written with bulk inserts in batches, so a
+million businesses take minutes instead of hours.
+
+The cities come from the database (run expand_cities first); when --cities
+asks for more than exist, synthetic towns are added around the real ones and
+reused by later runs. Generated businesses belong to the benchmark_generator
+user and reviews to bench_reviewer_* users, so --clear removes them again.
+
+    python manage.py generate_benchmark_data --businesses 1000000 --cities 5000 --reviews 2000000
+    python manage.py generate_benchmark_data --businesses 50000 --translated 0.5 --seed 7
+    python manage.py generate_benchmark_data --clear
+"""
+
+import math
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from businesses.models import Business, Category, City, Review
+from businesses.normalization import COUNTRY_CALLING_CODES
+from businesses.slug_registry import slug_registry
+from businesses.slugs import SlugAllocator
+from businesses.tiling import KM_PER_DEGREE, city_radius_km
+
+User = get_user_model()
+
+BENCHMARK_OWNER = 'benchmark_generator'
+REVIEWER_PREFIX = 'bench_reviewer_'
+BATCH_SIZE = 5000
+# Deleting cascades to related rows; keep each delete collector small
+DELETE_BATCH_SIZE = 2000
+
+ADJECTIVES = ['Golden', 'Royal', 'Central', 'Modern', 'Classic', 'Elite', 'Premium', 'Quality', 'Little', 'Old Town']
+SURNAMES = ['Silva', 'Santos', 'Müller', 'Schmidt', 'Rossi', 'Martin', 'García', 'Nowak', 'Jansen', 'Novák']
+NAME_PATTERNS = ['{adjective} {category}', '{surname} {category}', '{category} {city}', '{surname} & {surname2}']
+STREETS = ['Main Street', 'High Street', 'Market Square', 'Church Road', 'Station Road', 'Park Avenue']
+DISTRICTS = ['North', 'South', 'East', 'West', 'Central', 'Riverside', 'Hill', 'Harbour']
+
+# Short localized descriptions for the generated translations
+TRANSLATION_TEMPLATES = {
+    'de': '{category} in {city}',
+    'es': '{category} en {city}',
+    'fr': '{category} à {city}',
+    'it': '{category} a {city}',
+    'nl': '{category} in {city}',
+    'pl': '{category} w {city}',
+    'pt': '{category} em {city}',
+    'sv': '{category} i {city}',
+}
+
+PLAN_WEIGHTS = {'free': 80, 'local': 12, 'country': 6, 'eu': 2}
+RATING_WEIGHTS = [5, 7, 15, 33, 40]
+REVIEW_TITLES = ['Great service', 'Would come back', 'Average experience', 'Friendly staff', 'Not worth it']
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative Zipf weights for ranks 1..count, for random.choices()"""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset (businesses, cities, translations, reviews) for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--businesses',
+            type=int,
+            default=10000,
+            help='Businesses to generate (default: 10000)'
+        )
+        parser.add_argument(
+            '--cities',
+            type=int,
+            default=500,
+            help='Cities to spread them over; synthetic towns are added if fewer exist (default: 500)'
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=0,
+            help='Reviews to generate over all benchmark businesses (default: 0)'
+        )
+        parser.add_argument(
+            '--reviewers',
+            type=int,
+            help='Reviewer accounts to spread reviews over (default: reviews / 20, 100 to 20000)'
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=1.1,
+            help='Zipf exponent for cities, categories and review popularity (default: 1.1)'
+        )
+        parser.add_argument(
+            '--translated',
+            type=float,
+            default=0.3,
+            help='Share of businesses with translations (default: 0.3)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help=f'Rows per transaction (default: {BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated businesses, reviews and reviewers and stop'
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            return self.clear()
+        if options['businesses'] < 0 or options['reviews'] < 0 or options['cities'] < 1:
+            raise CommandError('--businesses and --reviews must be >= 0 and --cities >= 1')
+
+        self.rng = random.Random(options['seed'])
+        self.zipf = options['zipf']
+        self.batch_size = options['batch_size']
+        self.owner, _ = User.objects.get_or_create(
+            username=BENCHMARK_OWNER,
+            defaults={'email': 'benchmark@listacrosseu.eu', 'first_name': 'Benchmark', 'last_name': 'Generator'},
+        )
+
+        started = time.monotonic()
+        cities = self.prepare_cities(options['cities'])
+        categories = list(Category.objects.filter(is_active=True).order_by('sort_order', 'name'))
+        if not categories:
+            raise CommandError('No active categories found! Run import_categories first.')
+        # Zipf ranks: the biggest cities first, categories in a fixed random order
+        self.rng.shuffle(categories)
+
+        if options['businesses']:
+            self.generate_businesses(options['businesses'], cities, categories, options['translated'])
+        if options['reviews']:
+            reviewers = options['reviewers'] or min(20000, max(100, options['reviews'] // 20))
+            self.generate_reviews(options['reviews'], reviewers)
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(self.style.SUCCESS(f'🎉 Benchmark data generated in {time.monotonic() - started:.1f}s'))
+        self.stdout.write(f'🏢 Benchmark businesses: {Business.objects.filter(owner=self.owner).count():,}')
+        self.stdout.write(f'⭐ Benchmark reviews: {Review.objects.filter(business__owner=self.owner).count():,}')
+
+    def prepare_cities(self, count):
+        """The ``count`` biggest cities with coordinates, adding synthetic towns if needed"""
+        located = City.objects.filter(latitude__isnull=False, longitude__isnull=False).select_related('country')
+        cities = list(located.order_by('-population', 'pk')[:count])
+        if not cities:
+            raise CommandError('No cities with coordinates found! Run expand_cities first.')
+
+        missing = count - len(cities)
+        if missing > 0:
+            self.stdout.write(f'🏙️  Adding {missing:,} synthetic towns around {len(cities):,} real cities...')
+            anchors = cities
+            weights = zipf_cum_weights(len(anchors), self.zipf)
+            serial = City.objects.count()
+            towns = []
+            for anchor in self.rng.choices(anchors, cum_weights=weights, k=missing):
+                serial += 1
+                latitude, longitude = self.jitter(anchor, city_radius_km(anchor) * 4)
+                name = f'{anchor.name} {self.rng.choice(DISTRICTS)} {serial}'
+                towns.append(City(
+                    name=name,
+                    slug=slugify(name),
+                    country=anchor.country,
+                    latitude=latitude,
+                    longitude=longitude,
+                    population=max(1000, int((anchor.population or 50000) * self.rng.uniform(0.01, 0.2))),
+                ))
+            City.objects.bulk_create(towns, batch_size=1000)
+            slug_registry.invalidate()
+            cities = list(located.order_by('-population', 'pk')[:count])
+
+        self.stdout.write(f'🏙️  Using {len(cities):,} cities')
+        return cities
+
+    def jitter(self, city, radius_km):
+        """A point around the city centre, denser towards the middle"""
+        lat, lng = float(city.latitude), float(city.longitude)
+        distance = abs(self.rng.gauss(0, radius_km / 2))
+        bearing = self.rng.uniform(0, 2 * math.pi)
+        lat += distance * math.cos(bearing) / KM_PER_DEGREE
+        lng += distance * math.sin(bearing) / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.1))
+        return Decimal(f'{lat:.6f}'), Decimal(f'{lng:.6f}')
+
+    def generate_businesses(self, count, cities, categories, translated):
+        city_weights = zipf_cum_weights(len(cities), self.zipf)
+        category_weights = zipf_cum_weights(len(categories), self.zipf)
+        # Serial numbers keep names, emails and phones unique across runs
+        serial = Business.objects.filter(owner=self.owner).count()
+        allocator = SlugAllocator(Business.objects.all())
+        created = 0
+        started = time.monotonic()
+
+        self.stdout.write(f'🏢 Generating {count:,} businesses...')
+        while created < count:
+            size = min(self.batch_size, count - created)
+            batch_cities = self.rng.choices(cities, cum_weights=city_weights, k=size)
+            batch_categories = self.rng.choices(categories, cum_weights=category_weights, k=size)
+            batch = []
+            for city, category in zip(batch_cities, batch_categories):
+                serial += 1
+                batch.append(self.build_business(serial, city, category, translated))
+
+            allocator.preload(business.slug for business in batch)
+            for business in batch:
+                business.slug = allocator.allocate(business.slug)
+            with transaction.atomic():
+                Business.objects.bulk_create(batch, batch_size=self.batch_size)
+
+            created += size
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {created:,}/{count:,} businesses ({created / elapsed:,.0f}/s)')
+
+    def build_business(self, serial, city, category, translated):
+        rng = self.rng
+        base_name = rng.choice(NAME_PATTERNS).format(
+            adjective=rng.choice(ADJECTIVES),
+            surname=rng.choice(SURNAMES),
+            surname2=rng.choice(SURNAMES),
+            category=category.name,
+            city=city.name,
+        )
+        name = f'{base_name} {serial}'
+        slug = slugify(name)[:Business._meta.get_field('slug').max_length]
+        country_code = city.country.code
+        calling_code = COUNTRY_CALLING_CODES.get(country_code, ('44', ''))[0]
+        latitude, longitude = self.jitter(city, city_radius_km(city))
+        views = min(int(rng.paretovariate(1.2) * 20), 1_000_000)
+
+        business = Business(
+            name=name,
+            slug=slug,
+            description=f'{category.name} in {city.name}, {city.country.name}.',
+            short_description=f'{category.name} in {city.name}',
+            email=f'info{serial}@{slugify(base_name)[:30] or "business"}.{country_code.lower()}',
+            phone=f'+{calling_code} {200000000 + serial}',
+            website=f'https://www.{slug}.example.com',
+            address=f'{rng.choice(STREETS)} {rng.randint(1, 400)}, {city.name}',
+            postal_code=f'{rng.randint(1000, 9999)}',
+            city=city,
+            latitude=latitude,
+            longitude=longitude,
+            category=category,
+            owner=self.owner,
+            plan=rng.choices(list(PLAN_WEIGHTS), weights=PLAN_WEIGHTS.values())[0],
+            status='active' if rng.random() < 0.96 else 'pending',
+            featured=rng.random() < 0.05,
+            verified=rng.random() < 0.3,
+            views_count=views,
+            clicks_count=int(views * rng.uniform(0, 0.1)),
+            published_at=timezone.now() - timedelta(days=rng.randint(0, 3 * 365)),
+        )
+        if rng.random() < translated:
+            languages = rng.sample(sorted(TRANSLATION_TEMPLATES), rng.randint(1, 4))
+            business.translations = {
+                language: {
+                    'name': name,
+                    'description': TRANSLATION_TEMPLATES[language].format(category=category.name, city=city.name),
+                }
+                for language in languages
+            }
+        business.update_normalized_keys()
+        return business
+
+    def prepare_reviewers(self, count):
+        existing = User.objects.filter(username__startswith=REVIEWER_PREFIX).count()
+        if existing < count:
+            password = make_password(None)
+            User.objects.bulk_create([
+                User(
+                    username=f'{REVIEWER_PREFIX}{index}',
+                    email=f'{REVIEWER_PREFIX}{index}@example.com',
+                    first_name='Bench',
+                    last_name=f'Reviewer {index}',
+                    password=password,
+                )
+                for index in range(existing, count)
+            ], batch_size=1000)
+            self.stdout.write(f'👥 Added {count - existing:,} reviewer accounts')
+        return list(
+            User.objects.filter(username__startswith=REVIEWER_PREFIX).order_by('pk').values_list('pk', flat=True)[:count]
+        )
+
+    def generate_reviews(self, count, reviewer_count):
+        business_ids = list(Business.objects.filter(owner=self.owner).values_list('pk', flat=True))
+        if not business_ids:
+            raise CommandError('No benchmark businesses to review! Generate some with --businesses first.')
+        reviewers = self.prepare_reviewers(reviewer_count)
+        # One review per reviewer and business: skip the pairs earlier runs reviewed
+        business_positions = {pk: index for index, pk in enumerate(business_ids)}
+        reviewer_positions = {pk: index for index, pk in enumerate(reviewers)}
+        seen = {
+            business_positions[business_id] * len(reviewers) + reviewer_positions[reviewer_id]
+            for business_id, reviewer_id in Review.objects.filter(
+                business__owner=self.owner, reviewer_id__in=reviewers
+            ).values_list('business_id', 'reviewer_id').iterator(chunk_size=self.batch_size)
+        }
+        # Cap at the pairs still free
+        count = min(count, len(business_ids) * len(reviewers) - len(seen))
+
+        popularity = zipf_cum_weights(len(business_ids), self.zipf)
+        written = 0
+        started = time.monotonic()
+        now = timezone.now()
+
+        self.stdout.write(f'⭐ Generating {count:,} reviews over {len(business_ids):,} businesses...')
+        while written < count:
+            size = min(self.batch_size, count - written)
+            batch = []
+            while len(batch) < size:
+                for business_index in self.rng.choices(range(len(business_ids)), cum_weights=popularity, k=size):
+                    reviewer_index = self.rng.randrange(len(reviewers))
+                    pair = business_index * len(reviewers) + reviewer_index
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    rating = self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0]
+                    answered = self.rng.random() < 0.2
+                    batch.append(Review(
+                        business_id=business_ids[business_index],
+                        reviewer_id=reviewers[reviewer_index],
+                        rating=rating,
+                        title=REVIEW_TITLES[5 - rating],
+                        content=f'{REVIEW_TITLES[5 - rating]}. Rated {rating} out of 5.',
+                        is_approved=self.rng.random() < 0.9,
+                        owner_response='Thank you for your review!' if answered else '',
+                        response_date=now - timedelta(days=self.rng.randint(0, 365)) if answered else None,
+                    ))
+                    if len(batch) == size:
+                        break
+
+            with transaction.atomic():
+                # Only a concurrent run can still hit the unique constraint
+                Review.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=True)
+            written += size
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {written:,}/{count:,} reviews ({written / elapsed:,.0f}/s)')
+
+    def clear(self):
+        owner = User.objects.filter(username=BENCHMARK_OWNER).first()
+        ids = list(Business.objects.filter(owner=owner).values_list('pk', flat=True)) if owner else []
+        self.stdout.write(f'🗑️  Deleting {len(ids):,} benchmark businesses...')
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            Business.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+
+        reviewers = User.objects.filter(username__startswith=REVIEWER_PREFIX)
+        self.stdout.write(f'🗑️  Deleting {reviewers.count():,} reviewer accounts...')
+        reviewers.delete()
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark data cleared (synthetic towns are kept for reuse)'))
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from businesses.models import City
+from businesses.slugs import SlugAllocator
+from businesses.slug_registry import slug_registry
 from django.utils.text import slugify
 
 
@@ -7,22 +9,21 @@ class Command(BaseCommand):
     help = 'Generate slugs for all cities'
     
     def handle(self, *args, **options):
-        cities = City.objects.all()
+        cities = City.objects.select_related('country')
+        missing = [city for city in cities if not city.slug]
         
-        for city in cities:
-            if not city.slug:
-                base_slug = slugify(f"{city.name}-{city.country.code}")
-                city.slug = base_slug
-                
-                # Ensure uniqueness
-                counter = 1
-                while City.objects.filter(slug=city.slug).exclude(id=city.id).exists():
-                    city.slug = f"{base_slug}-{counter}"
-                    counter += 1
-                
-                city.save()
-                self.stdout.write(f'Generated slug for {city.name}: {city.slug}')
+        # Ensure uniqueness
+        allocator = SlugAllocator(City.objects.all())
+        allocator.preload(slugify(f"{city.name}-{city.country.code}") for city in missing)
+        
+        for city in missing:
+            city.slug = allocator.allocate(slugify(f"{city.name}-{city.country.code}"), pk=city.pk)
+            self.stdout.write(f'Generated slug for {city.name}: {city.slug}')
+        
+        City.objects.bulk_update(missing, ['slug'], batch_size=500)
+        # bulk_update sends no save signals
+        slug_registry.invalidate()
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully generated slugs for {cities.count()} cities')
-        )
\ No newline at end of file
+        )
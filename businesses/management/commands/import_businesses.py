@@ -4,17 +4,29 @@ Management command to import businesses from CSV file.
 Expected CSV format:
 owner_email,name,slug,description,email,phone,website,address,city_name,country_code,postal_code,category_slug,plan,status,featured,verified
 admin@listacross.eu,Restaurant Le Bernardin,le-bernardin,Fine French dining,contact@lebernardine.com,+33123456789,https://lebernardine.com,123 Rue de la Paix,Paris,FR,75001,restaurants,free,active,false,true
+
+The file is streamed and written in chunks, so memory stays flat no matter
+how large the CSV is. Users, cities and categories are loaded once up front
+instead of being queried per row. Rows are matched to existing businesses on
+name and city and written with Business.objects.bulk_upsert().
 """
 
 import csv
+import time
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.contrib.auth import get_user_model
-from django.utils.text import slugify
-from businesses.models import Business, City, Country, Category
+from businesses.models import Business, City, Category
 
 User = get_user_model()
 
+HOURS_FIELDS = [f'{day}_hours' for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']]
+OPTIONAL_FIELDS = ['short_description', 'meta_title', 'meta_description', 'keywords'] + HOURS_FIELDS
+UPDATE_FIELDS = [
+    'owner', 'description', 'email', 'phone', 'website', 'address',
+    'postal_code', 'category', 'plan', 'status', 'featured', 'verified',
+]
+
 
 class Command(BaseCommand):
     help = 'Import businesses from CSV file'
@@ -32,144 +44,163 @@ class Command(BaseCommand):
             default='admin@listacross.eu',
             help='Default owner email if not specified in CSV',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows written per bulk insert/update (default: 1000)',
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         dry_run = options['dry_run']
         default_owner_email = options['default_owner']
-        
+        chunk_size = options['chunk_size']
+
         if dry_run:
             self.stdout.write(self.style.WARNING('DRY RUN MODE - No data will be saved'))
-        
-        # Get default owner
-        try:
-            default_owner = User.objects.get(email=default_owner_email)
-        except User.DoesNotExist:
+
+        # Preload lookup maps once instead of querying per row
+        self.users = dict(User.objects.values_list('email', 'id'))
+        if default_owner_email not in self.users:
             raise CommandError(f'Default owner "{default_owner_email}" not found. Create this user first.')
-        
+        self.default_owner_id = self.users[default_owner_email]
+        self.cities = {
+            (name, code): city_id
+            for city_id, name, code in City.objects.values_list('id', 'name', 'country__code')
+        }
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+
+        self.counts = {
+            'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0, 'merged': 0, 'errors': 0,
+        }
+        self.started = time.monotonic()
+
         try:
-            with open(csv_file, 'r', encoding='utf-8') as file:
+            with open(csv_file, 'r', encoding='utf-8', newline='') as file:
                 reader = csv.DictReader(file)
-                
-                businesses_to_create = []
-                businesses_to_update = []
-                errors = []
-                
+                # Optional columns only overwrite existing businesses when the CSV has them
+                self.update_fields = UPDATE_FIELDS + [
+                    field for field in OPTIONAL_FIELDS + ['latitude', 'longitude']
+                    if field in (reader.fieldnames or [])
+                ]
+
+                chunk = []
                 for row_num, row in enumerate(reader, start=2):
+                    self.counts['rows'] += 1
                     try:
-                        # Get owner
-                        owner_email = row.get('owner_email', '').strip() or default_owner_email
-                        try:
-                            owner = User.objects.get(email=owner_email)
-                        except User.DoesNotExist:
-                            owner = default_owner
-                            self.stdout.write(f"Row {row_num}: Using default owner for {row['name']}")
-                        
-                        # Get city
-                        city_name = row['city_name'].strip()
-                        country_code = row['country_code'].upper().strip()
-                        try:
-                            city = City.objects.get(name=city_name, country__code=country_code)
-                        except City.DoesNotExist:
-                            errors.append(f"Row {row_num}: City '{city_name}' in '{country_code}' not found")
-                            continue
-                        
-                        # Get category
-                        category_slug = row['category_slug'].strip()
-                        try:
-                            category = Category.objects.get(slug=category_slug)
-                        except Category.DoesNotExist:
-                            errors.append(f"Row {row_num}: Category '{category_slug}' not found")
-                            continue
-                        
-                        # Generate slug if not provided
-                        slug = row.get('slug', '').strip() or slugify(row['name'])
-                        
-                        # Parse data
-                        business_data = {
-                            'owner': owner,
-                            'name': row['name'].strip(),
-                            'slug': slug,
-                            'description': row.get('description', '').strip(),
-                            'email': row.get('email', '').strip(),
-                            'phone': row.get('phone', '').strip(),
-                            'website': row.get('website', '').strip(),
-                            'address': row.get('address', '').strip(),
-                            'city': city,
-                            'postal_code': row.get('postal_code', '').strip(),
-                            'category': category,
-                            'plan': row.get('plan', 'free').strip(),
-                            'status': row.get('status', 'pending').strip(),
-                            'featured': row.get('featured', '').lower() in ['true', '1', 'yes'],
-                            'verified': row.get('verified', '').lower() in ['true', '1', 'yes'],
-                        }
-                        
-                        # Optional fields
-                        if row.get('short_description', '').strip():
-                            business_data['short_description'] = row['short_description'].strip()
-                        if row.get('latitude', '').strip():
-                            business_data['latitude'] = float(row['latitude'])
-                        if row.get('longitude', '').strip():
-                            business_data['longitude'] = float(row['longitude'])
-                        if row.get('meta_title', '').strip():
-                            business_data['meta_title'] = row['meta_title'].strip()
-                        if row.get('meta_description', '').strip():
-                            business_data['meta_description'] = row['meta_description'].strip()
-                        if row.get('keywords', '').strip():
-                            business_data['keywords'] = row['keywords'].strip()
-                        
-                        # Business hours
-                        for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']:
-                            hours_key = f'{day}_hours'
-                            if row.get(hours_key, '').strip():
-                                business_data[hours_key] = row[hours_key].strip()
-                        
-                        # Check if business exists
-                        existing_business = Business.objects.filter(slug=slug).first()
-                        
-                        if existing_business:
-                            # Update existing business
-                            for key, value in business_data.items():
-                                setattr(existing_business, key, value)
-                            businesses_to_update.append(existing_business)
-                        else:
-                            # Create new business
-                            businesses_to_create.append(Business(**business_data))
-                            
+                        business = self.build_business(row, row_num)
                     except (ValueError, KeyError) as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
+                        self.report_error(f"Row {row_num}: {str(e)}")
+                        continue
+                    if business is None:
                         continue
-                
-                # Display results
-                self.stdout.write(f"Businesses to create: {len(businesses_to_create)}")
-                self.stdout.write(f"Businesses to update: {len(businesses_to_update)}")
-                
-                if errors:
-                    self.stdout.write(self.style.ERROR(f"Errors found ({len(errors)}):"))
-                    for error in errors:
-                        self.stdout.write(self.style.ERROR(f"  {error}"))
-                
-                if not dry_run and (businesses_to_create or businesses_to_update):
-                    with transaction.atomic():
-                        # Create new businesses
-                        if businesses_to_create:
-                            Business.objects.bulk_create(businesses_to_create, ignore_conflicts=True)
-                            self.stdout.write(
-                                self.style.SUCCESS(f"Created {len(businesses_to_create)} businesses")
-                            )
-                        
-                        # Update existing businesses
-                        for business in businesses_to_update:
-                            business.save()
-                        if businesses_to_update:
-                            self.stdout.write(
-                                self.style.SUCCESS(f"Updated {len(businesses_to_update)} businesses")
-                            )
-                
-                elif dry_run:
-                    self.stdout.write(self.style.WARNING('Dry run completed - no changes made'))
-                    
+
+                    chunk.append(business)
+                    if len(chunk) >= chunk_size:
+                        self.flush(chunk, dry_run)
+                        chunk = []
+
+                self.flush(chunk, dry_run)
+
         except FileNotFoundError:
             raise CommandError(f'File "{csv_file}" does not exist.')
-        except Exception as e:
-            raise CommandError(f'Error reading CSV file: {str(e)}')
\ No newline at end of file
+        except UnicodeDecodeError as e:
+            raise CommandError(f'Error reading CSV file: {str(e)}')
+
+        # Display results
+        elapsed = time.monotonic() - self.started
+        verb = 'to ' if dry_run else ''
+        self.stdout.write(f"Businesses {verb}create: {self.counts['created']}")
+        self.stdout.write(f"Businesses {verb}update: {self.counts['updated']}")
+        self.stdout.write(f"Businesses unchanged: {self.counts['unchanged']}")
+        if self.counts['duplicates']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {self.counts['duplicates']} rows whose phone or email belongs to another business in the city"
+            ))
+        if self.counts['invalid']:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {self.counts['invalid']} rows without a name or a valid email"
+            ))
+        if self.counts['merged']:
+            self.stdout.write(self.style.WARNING(
+                f"Merged {self.counts['merged']} rows repeating the name and city of an earlier row"
+            ))
+        if self.counts['errors']:
+            self.stdout.write(self.style.ERROR(f"Errors found: {self.counts['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {self.counts['rows']} rows in {elapsed:.1f}s "
+            f"({self.counts['rows'] / elapsed if elapsed else 0:.0f} rows/sec)"
+        ))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry run completed - no changes made'))
+
+    def build_business(self, row, row_num):
+        """Turn a CSV row into an unsaved Business"""
+        # Get owner
+        owner_email = row.get('owner_email', '').strip()
+        owner_id = self.users.get(owner_email or None, self.default_owner_id)
+
+        # Get city
+        city_name = row['city_name'].strip()
+        country_code = row['country_code'].upper().strip()
+        city_id = self.cities.get((city_name, country_code))
+        if city_id is None:
+            self.report_error(f"Row {row_num}: City '{city_name}' in '{country_code}' not found")
+            return None
+
+        # Get category
+        category_slug = row['category_slug'].strip()
+        category_id = self.categories.get(category_slug)
+        if category_id is None:
+            self.report_error(f"Row {row_num}: Category '{category_slug}' not found")
+            return None
+
+        # Parse data
+        business_data = {
+            'owner_id': owner_id,
+            'name': row['name'].strip(),
+            'slug': row.get('slug', '').strip(),  # generated by the upsert if empty
+            'description': row.get('description', '').strip(),
+            'email': row.get('email', '').strip(),
+            'phone': row.get('phone', '').strip(),
+            'website': row.get('website', '').strip(),
+            'address': row.get('address', '').strip(),
+            'city_id': city_id,
+            'postal_code': row.get('postal_code', '').strip(),
+            'category_id': category_id,
+            'plan': row.get('plan', 'free').strip(),
+            'status': row.get('status', 'pending').strip(),
+            'featured': row.get('featured', '').lower() in ['true', '1', 'yes'],
+            'verified': row.get('verified', '').lower() in ['true', '1', 'yes'],
+            'latitude': float(row['latitude']) if row.get('latitude', '').strip() else None,
+            'longitude': float(row['longitude']) if row.get('longitude', '').strip() else None,
+        }
+        for field in OPTIONAL_FIELDS:
+            business_data[field] = row.get(field, '').strip()
+
+        return Business(**business_data)
+
+    def flush(self, chunk, dry_run):
+        """Upsert one chunk and report throughput; dry runs are rolled back"""
+        if not chunk:
+            return
+
+        with transaction.atomic():
+            counts = Business.objects.bulk_upsert(chunk, update_fields=self.update_fields)
+            if dry_run:
+                transaction.set_rollback(True)
+
+        for key, value in counts.items():
+            self.counts[key] += value
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f"  {self.counts['rows']} rows processed "
+            f"({self.counts['rows'] / elapsed if elapsed else 0:.0f} rows/sec)"
+        )
+
+    def report_error(self, message):
+        """Errors are written immediately instead of being collected in memory"""
+        self.counts['errors'] += 1
+        self.stdout.write(self.style.ERROR(f"  {message}"))
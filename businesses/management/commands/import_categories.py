@@ -14,6 +14,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils.text import slugify
 from businesses.models import Category
+from businesses.slug_registry import slug_registry
 
 
 class Command(BaseCommand):
@@ -137,6 +138,7 @@ class Command(BaseCommand):
                         # Create new categories
                         if categories_to_create:
                             Category.objects.bulk_create(categories_to_create, ignore_conflicts=True)
+                            slug_registry.invalidate()
                             self.stdout.write(
                                 self.style.SUCCESS(f"Created {len(categories_to_create)} categories")
                             )
@@ -12,6 +12,7 @@ import csv
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from businesses.models import City, Country
+from businesses.slug_registry import slug_registry
 
 
 class Command(BaseCommand):
@@ -93,6 +94,7 @@ class Command(BaseCommand):
                         # Create new cities
                         if cities_to_create:
                             City.objects.bulk_create(cities_to_create, ignore_conflicts=True)
+                            slug_registry.invalidate()
                             self.stdout.write(
                                 self.style.SUCCESS(f"Created {len(cities_to_create)} cities")
                             )
@@ -0,0 +1,189 @@
+"""
+Import businesses through the staged ingestion pipeline.
+
+    fetch → parse → normalize → geo-assign → dedupe → load
+
+Replaces the one-off root import scripts: pick a source adapter, the
+countries to load and the pipeline does the rest, then prints the time and
+counters of every stage so the slowest one can be tuned.
+
+    python manage.py ingest google --countries NL --cities 10 --searches 5
+    python manage.py ingest google --countries PT --query "restaurant Vila Nova de Gaia, Portugal" --per-query 3
+    python manage.py ingest osm --countries PT --cities 20
+    python manage.py ingest extract --file portugal-latest.osm.pbf --countries PT --complete
+"""
+
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from businesses.models import City
+from businesses.pipeline import PIPELINE_BATCH_SIZE, PIPELINE_QUEUE_SIZE, Pipeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import businesses through the staged ingestion pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', choices=['google', 'osm', 'extract'], help='Source adapter')
+        parser.add_argument(
+            '--countries',
+            nargs='+',
+            required=True,
+            help='Country codes to import; businesses are only assigned to their cities'
+        )
+        parser.add_argument(
+            '--cities',
+            type=int,
+            default=10,
+            help='google/osm: the N most populated cities per run (default: 10)'
+        )
+        parser.add_argument(
+            '--searches',
+            type=int,
+            default=5,
+            help='google: search categories per city (default: 5)'
+        )
+        parser.add_argument(
+            '--query',
+            action='append',
+            help='google: explicit text search (repeatable), instead of categories x cities'
+        )
+        parser.add_argument(
+            '--per-query',
+            type=int,
+            help='google: keep at most N places per search'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=60,
+            help='osm: maximum businesses per city (default: 60)'
+        )
+        parser.add_argument('--file', help='extract: path to the .osm.pbf / .osm.xml file')
+        parser.add_argument(
+            '--complete',
+            action='store_true',
+            help='extract: the file covers the whole countries, so anything it lacks there is stale '
+                 '(default: only inside the bounding box of its nodes)'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='osm: only replay cached Overpass responses'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='google/osm: fetch again instead of replaying cached API responses'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PIPELINE_BATCH_SIZE,
+            help=f'Rows written per transaction (default: {PIPELINE_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--queue-size',
+            type=int,
+            default=PIPELINE_QUEUE_SIZE,
+            help=f'Fetched pages buffered ahead of parsing (default: {PIPELINE_QUEUE_SIZE})'
+        )
+        parser.add_argument(
+            '--max-distance',
+            type=float,
+            default=15,
+            help='Maximum distance in km to the nearest city (default: 15)'
+        )
+        parser.add_argument(
+            '--owner',
+            default='admin',
+            help='Username that owns the imported businesses (default: admin)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Run every stage but roll back the writes'
+        )
+
+    def handle(self, *args, **options):
+        owner = User.objects.filter(username=options['owner']).first()
+        if not owner:
+            raise CommandError(f'Owner "{options["owner"]}" not found. Create this user first.')
+
+        adapter = self.build_adapter(options)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No data will be saved'))
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Ingesting from {adapter.name} into {", ".join(adapter.countries)}'
+        ))
+
+        pipeline = Pipeline(
+            adapter, owner,
+            batch_size=options['batch_size'],
+            queue_size=options['queue_size'],
+            max_distance=options['max_distance'],
+            dry_run=options['dry_run'],
+            on_batch=lambda load: self.stdout.write(
+                f'  {load.stats.counters["created"]:,} created, {load.stats.counters["updated"]:,} updated, '
+                f'{load.stats.counters["unchanged"]:,} unchanged so far'
+            ),
+        )
+        try:
+            pipeline.run()
+        except ImportError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(self.style.SUCCESS(f'🎉 Ingestion complete in {pipeline.seconds:.1f}s'))
+        self.stdout.write(f'{"stage":<12}{"in":>10}{"out":>10}{"seconds":>10}{"share":>8}{"per sec":>10}  counters')
+        for row in pipeline.report():
+            counters = ', '.join(f'{key}: {value:,}' for key, value in sorted(row['counters'].items()))
+            self.stdout.write(
+                f'{row["stage"]:<12}{row["received"]:>10,}{row["emitted"]:>10,}{row["seconds"]:>10.2f}'
+                f'{row["share"]:>8.0%}{row["rate"]:>10,.0f}  {counters}'
+            )
+        slowest = max(pipeline.report(), key=lambda row: row['seconds'])
+        self.stdout.write(f'🐢 Slowest stage: {slowest["stage"]} ({slowest["share"]:.0%} of stage time)')
+        if pipeline.stale:
+            self.stdout.write(self.style.WARNING(f'🗑️  No longer in the source (marked stale): {pipeline.stale:,}'))
+
+    def build_adapter(self, options):
+        from businesses import pipeline_sources
+
+        countries = [code.upper() for code in options['countries']]
+        source = options['source']
+
+        if source == 'extract':
+            if not options['file'] or not os.path.exists(options['file']):
+                raise CommandError('extract needs --file pointing to an existing extract')
+            return pipeline_sources.OSMExtractAdapter(options['file'], countries, complete=options['complete'])
+
+        cities = list(
+            City.objects.filter(country__code__in=countries).select_related('country')
+            .order_by('-population')[:options['cities']]
+        )
+
+        if source == 'osm':
+            cities = [city for city in cities if city.latitude is not None and city.longitude is not None]
+            if not cities:
+                raise CommandError('No cities with coordinates found!')
+            return pipeline_sources.OverpassAdapter(
+                cities, limit=options['limit'], countries=countries, offline=options['offline'],
+                refresh=options['refresh'],
+            )
+
+        from businesses.google_places_config import SEARCH_CATEGORIES
+        queries = options['query'] or [
+            f'{category} in {city.name}, {city.country.name}'
+            for city in cities for category in SEARCH_CATEGORIES[:options['searches']]
+        ]
+        if not queries:
+            raise CommandError('No cities found to search in')
+        try:
+            return pipeline_sources.GooglePlacesAdapter(
+                queries, countries=countries, per_query=options['per_query'], refresh=options['refresh']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
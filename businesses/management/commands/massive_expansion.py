@@ -1,13 +1,25 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
 from businesses.models import Business, City, Category
 from django.db.models import Count
-import time
 
 
 class Command(BaseCommand):
     help = 'Execute massive EU business directory expansion (820+ cities, 49,200+ businesses)'
     
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Worker processes for the business collection (default: 4)'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue an interrupted business collection from its checkpoints'
+        )
+    
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.SUCCESS('🚀 MASSIVE EU BUSINESS DIRECTORY EXPANSION')
@@ -60,34 +72,20 @@ class Command(BaseCommand):
             
             self.stdout.write(f'📊 Strategy: {cities_to_process} cities × {businesses_per_city} businesses = {cities_to_process * businesses_per_city:,} businesses')
             
-            # Run business collection in batches to avoid timeouts
-            batch_size = 25
-            for batch_start in range(0, cities_to_process, batch_size):
-                batch_cities = min(batch_size, cities_to_process - batch_start)
-                
-                self.stdout.write(f'\n🔄 Processing cities {batch_start + 1}-{batch_start + batch_cities}...')
-                
-                try:
-                    call_command('collect_businesses', 
-                               cities=batch_cities,
-                               businesses_per_city=businesses_per_city)
-                    
-                    # Check progress after each batch
-                    current = Business.objects.count()
-                    self.stdout.write(f'✅ Batch complete. Total businesses: {current:,}')
-                    
-                    if current >= target_businesses:
-                        self.stdout.write('🎯 Target achieved!')
-                        break
-                        
-                    # Small delay between batches
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'❌ Batch error: {str(e)}. Continuing...')
-                    )
-                    continue
+            # Partitioned, resumable collection: a crashed run continues where it stopped
+            try:
+                call_command('run_import', 'osm',
+                           cities=cities_to_process,
+                           limit=businesses_per_city,
+                           workers=options['workers'],
+                           resume=options['resume'])
+            except CommandError as e:
+                self.stdout.write(
+                    self.style.ERROR(f'❌ {str(e)}')
+                )
+            
+            current = Business.objects.count()
+            self.stdout.write(f'✅ Collection complete. Total businesses: {current:,}')
         
         # Final statistics
         self.stdout.write('\n' + '='*80)
@@ -0,0 +1,75 @@
+"""
+Duplicate Merge Management Command
+Merges exact duplicate groups from the stored duplicate report into their oldest business
+"""
+
+from django.core.management.base import BaseCommand
+from businesses.duplicates import run_duplicate_scan
+from businesses.merge import MERGE_BATCH_SIZE, merge_businesses, resolve_merge_groups
+from businesses.models import DuplicateScan, DuplicateGroup
+
+
+class Command(BaseCommand):
+    help = 'Merge exact duplicate businesses, keeping the oldest and moving reviews, images, claims and features to it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be merged without changing anything'
+        )
+        parser.add_argument(
+            '--rescan',
+            action='store_true',
+            help='Run a fresh duplicate scan first instead of using the last stored one'
+        )
+        parser.add_argument(
+            '--country',
+            type=str,
+            help='Only merge groups in this country code (e.g., PT, DE)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=MERGE_BATCH_SIZE,
+            help=f'Groups merged per transaction (default: {MERGE_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write(self.style.SUCCESS(
+            f'🔀 DUPLICATE MERGE{" (DRY RUN)" if dry_run else ""}'
+        ))
+        self.stdout.write('=' * 60)
+
+        scan = None if options['rescan'] else DuplicateScan.latest_completed()
+        if scan is None:
+            self.stdout.write('Running duplicate scan...')
+            scan = run_duplicate_scan()
+            if scan.status != 'completed':
+                self.stdout.write(self.style.ERROR(f'❌ Scan failed: {scan.error}'))
+                return
+        self.stdout.write(f'Using duplicate scan #{scan.pk} from {scan.finished_at:%Y-%m-%d %H:%M}')
+
+        groups = DuplicateGroup.objects.filter(scan=scan, group_type='exact')
+        if options['country']:
+            groups = groups.filter(country_code__iexact=options['country'])
+
+        merge_groups = resolve_merge_groups(groups.values_list('business_ids', flat=True).iterator())
+        if not merge_groups:
+            self.stdout.write(self.style.SUCCESS('✅ No exact duplicates to merge'))
+            return
+
+        stats = merge_businesses(merge_groups, dry_run=dry_run, batch_size=options['batch_size'])
+
+        verb = 'Would merge' if dry_run else 'Merged'
+        self.stdout.write(f"\n📊 {verb} {stats['groups']} groups, removing {stats['deleted']} duplicates")
+        for label, moved in stats['moved'].items():
+            dropped = stats['dropped'][label]
+            if moved or dropped:
+                self.stdout.write(f'   {label}: {moved} moved, {dropped} dropped as conflicting')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('\n💡 Dry run - nothing was changed. Run without --dry-run to merge.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ Merge complete. Run scan_duplicates to refresh the report.'))
@@ -0,0 +1,51 @@
+"""
+Page Cache Management Command
+Shows the hit rate of the full-page cache per view, and resets the counters
+or empties the cache
+
+Usage:
+    python manage.py page_cache
+    python manage.py page_cache --reset-stats
+    python manage.py page_cache --clear
+"""
+
+from django.core.management.base import BaseCommand
+
+# Imported for the @cached_page views they register
+from businesses import views_country_city, views_seo  # noqa: F401
+from businesses.page_cache import PAGE_VIEWS, page_cache, page_stats
+
+
+class Command(BaseCommand):
+    help = 'Show full-page cache hit rates, reset them or empty the page cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset-stats', action='store_true', help='Zero the hit/miss counters')
+        parser.add_argument('--clear', action='store_true', help='Drop every cached page (and the counters)')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            page_cache().clear()
+            self.stdout.write(self.style.SUCCESS('🧹 Page cache emptied'))
+            return
+        if options['reset_stats']:
+            page_stats.reset()
+            self.stdout.write(self.style.SUCCESS('🔄 Page cache counters reset'))
+            return
+
+        # Counts of the running workers are added in batches, so the last few requests may be missing
+        totals = page_stats.totals()
+        self.stdout.write('📊 Page cache hit rates')
+        self.stdout.write(f'{"view":<36} {"hits":>9} {"misses":>9} {"stale":>9} {"hit rate":>9}')
+        overall = dict.fromkeys(('hits', 'misses', 'stale'), 0)
+        for name in PAGE_VIEWS:
+            counts = totals[name]
+            for outcome, amount in counts.items():
+                overall[outcome] += amount
+            self.stdout.write(self._row(name, counts))
+        self.stdout.write(self.style.SUCCESS(self._row('total', overall)))
+
+    def _row(self, name, counts):
+        requests = sum(counts.values())
+        rate = f'{counts["hits"] / requests:.1%}' if requests else '-'
+        return f'{name:<36} {counts["hits"]:>9} {counts["misses"]:>9} {counts["stale"]:>9} {rate:>9}'
@@ -2,12 +2,21 @@
 from django.core.management.base import BaseCommand
 from businesses.models import Country, City, Category, Business
 from accounts.models import CustomUser
+from businesses.import_runner import plan_partitions, run_partitions
+from businesses.import_sources import MAIN_CATEGORIES
 from django.utils.text import slugify
-import random
 
 class Command(BaseCommand):
     help = 'Populate all EU countries with cities and businesses'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Worker processes for generating businesses (default: 4)'
+        )
+
     def handle(self, *args, **options):
         # Get admin user as default owner
         try:
@@ -46,40 +55,16 @@ class Command(BaseCommand):
             'Sweden': ['Stockholm', 'Gothenburg', 'Malmö', 'Uppsala', 'Västerås', 'Örebro']
         }
 
-        # Business categories
-        main_categories = [
-            'Restaurant', 'Technology', 'Tourism', 'Retail', 'Health', 'Education',
-            'Finance', 'Real Estate', 'Services', 'Manufacturing', 'Construction', 'Transportation'
-        ]
-
         # Create categories if they don't exist
-        created_categories = []
-        for cat_name in main_categories:
-            category, created = Category.objects.get_or_create(
+        for cat_name in MAIN_CATEGORIES:
+            Category.objects.get_or_create(
                 name=cat_name,
                 defaults={'description': f'{cat_name} services and businesses', 'slug': slugify(cat_name)}
             )
-            created_categories.append(category)
-
-        # Business name templates by category (language-neutral)
-        business_templates = {
-            'Restaurant': ['{} Restaurant', '{} Bistro', '{} Café', '{} Grill', '{} Kitchen'],
-            'Technology': ['{} Tech', '{} Digital', '{} Software', '{} Solutions', '{} Systems'],
-            'Tourism': ['Hotel {}', '{} Hotel', '{} Tours', '{} Travel', '{} Hospitality'],
-            'Retail': ['{} Store', '{} Shop', '{} Market', '{} Trading', '{} Commerce'],
-            'Health': ['{} Medical', '{} Health', '{} Clinic', '{} Care', '{} Wellness'],
-            'Education': ['{} Academy', '{} Institute', '{} School', '{} Education', '{} Learning'],
-            'Finance': ['{} Bank', '{} Finance', '{} Capital', '{} Investment', '{} Financial'],
-            'Real Estate': ['{} Properties', '{} Realty', '{} Estates', '{} Housing', '{} Development'],
-            'Services': ['{} Services', '{} Consulting', '{} Solutions', '{} Support', '{} Professional'],
-            'Manufacturing': ['{} Industries', '{} Manufacturing', '{} Production', '{} Factory', '{} Works'],
-            'Construction': ['{} Construction', '{} Building', '{} Engineering', '{} Projects', '{} Development'],
-            'Transportation': ['{} Transport', '{} Logistics', '{} Shipping', '{} Moving', '{} Delivery'],
-        }
 
         total_countries_added = 0
         total_cities_added = 0
-        total_businesses_added = 0
+        cities_to_fill = []
 
         for country_name, cities in eu_countries_cities.items():
             try:
@@ -87,7 +72,6 @@ class Command(BaseCommand):
                 self.stdout.write(f'Processing {country_name}...')
                 
                 cities_added = 0
-                businesses_added = 0
 
                 for city_name in cities:
                     # Create city if it doesn't exist
@@ -108,53 +92,13 @@ class Command(BaseCommand):
 
                     # Add businesses if city is new or has no businesses
                     if created or existing_businesses == 0:
-                        # Add 8-15 businesses per city
-                        num_businesses = random.randint(8, 15)
-                        
-                        # Ensure we have businesses in multiple categories
-                        selected_categories = random.sample(created_categories, min(8, len(created_categories)))
-                        
-                        for i in range(num_businesses):
-                            category = random.choice(selected_categories)
-                            templates = business_templates.get(category.name, ['{} Business'])
-                            template = random.choice(templates)
-                            
-                            # Generate business name
-                            business_name = template.format(city_name)
-                            
-                            # Add some variation to avoid duplicates
-                            suffixes = ['Central', 'Premium', 'Elite', 'Pro', 'Plus', 'Group', 'Company', 'Ltd']
-                            if random.choice([True, False]):
-                                business_name += f' {random.choice(suffixes)}'
-                            
-                            # Create business
-                            business, created = Business.objects.get_or_create(
-                                name=business_name,
-                                city=city,
-                                defaults={
-                                    'owner': admin_user,
-                                    'category': category,
-                                    'slug': slugify(business_name),
-                                    'verified': True,
-                                    'status': 'active',
-                                    'description': f'Quality {category.name.lower()} services in {city_name}, {country_name}.',
-                                    'phone': f'+{random.randint(30, 99)} {random.randint(200000000, 999999999)}',
-                                    'email': f'info@{slugify(business_name)[:20]}.com',
-                                    'address': f'{random.choice(["Main Street", "Central Avenue", "Market Square", "Business District"])} {random.randint(1, 200)}',
-                                }
-                            )
-                            
-                            if created:
-                                businesses_added += 1
+                        cities_to_fill.append(city.pk)
 
                 total_cities_added += cities_added
-                total_businesses_added += businesses_added
                 total_countries_added += 1
 
                 self.stdout.write(
-                    self.style.SUCCESS(
-                        f'✓ {country_name}: {cities_added} cities, {businesses_added} businesses'
-                    )
+                    self.style.SUCCESS(f'✓ {country_name}: {cities_added} cities')
                 )
 
             except Country.DoesNotExist:
@@ -163,6 +107,16 @@ class Command(BaseCommand):
                 )
                 continue
 
+        # Generate 8-15 businesses per new or empty city in parallel partitions
+        total_businesses_added = 0
+        if cities_to_fill:
+            self.stdout.write(f'Adding businesses to {len(cities_to_fill)} cities...')
+            checkpoint_ids = plan_partitions('sample', City.objects.filter(pk__in=cities_to_fill))
+            for result in run_partitions('sample', checkpoint_ids, workers=options['workers']):
+                if result['error']:
+                    self.stdout.write(self.style.ERROR(f'  {result["partition"]}: {result["error"]}'))
+                total_businesses_added += result['created']
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n🎉 COMPLETED! Added to {total_countries_added} countries:'
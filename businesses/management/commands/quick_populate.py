@@ -2,6 +2,7 @@ import random
 from django.core.management.base import BaseCommand
 from django.db import transaction, models
 from businesses.models import Country, City, Category, Business
+from accounts.models import CustomUser
 from django.utils.text import slugify
 
 class Command(BaseCommand):
@@ -25,6 +26,17 @@ class Command(BaseCommand):
         priority_count = options['priority_categories']
         top_cities_count = options['top_cities']
 
+        # Get or create a default system user for generated businesses
+        self.system_user, created = CustomUser.objects.get_or_create(
+            username='system_generator',
+            defaults={
+                'email': 'system@listacrosseu.eu',
+                'first_name': 'System',
+                'last_name': 'Generator',
+                'is_staff': True
+            }
+        )
+
         # Priority categories that should have businesses everywhere
         priority_category_names = [
             'Pharmacies', 'Restaurants', 'Hotels', 'Gas Stations', 'Supermarkets',
@@ -60,15 +72,18 @@ class Command(BaseCommand):
                 
                 self.stdout.write(f'\\nPopulating: {category.name}')
                 
+                rows = []
                 for city in top_cities:
                     # Create 1-3 businesses per category per city
                     num_businesses = random.randint(1, 3)
                     
                     for i in range(num_businesses):
-                        business = self.create_realistic_business(category, city, i + 1)
-                        if business:
-                            category_created += 1
-                            total_created += 1
+                        rows.append(self.create_realistic_business(category, city, i + 1))
+
+                # Generated businesses never overwrite existing ones
+                counts = Business.objects.bulk_upsert(rows, update_fields=[])
+                category_created += counts['created']
+                total_created += counts['created']
 
                 self.stdout.write(
                     self.style.SUCCESS(f'  ✓ Created {category_created} businesses')
@@ -79,7 +94,7 @@ class Command(BaseCommand):
         )
 
     def create_realistic_business(self, category, city, number):
-        """Create a realistic business name and details"""
+        """Build an unsaved business with a realistic name and details"""
         
         # Business name patterns by category
         name_patterns = {
@@ -122,13 +137,8 @@ class Command(BaseCommand):
             brand=random.choice(brands)
         )
 
-        # Create unique slug (must be unique globally, not just per city)
+        # The upsert makes the slug unique globally, not just per city
         base_slug = slugify(business_name)
-        slug = base_slug
-        counter = 1
-        while Business.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
 
         # Generate contact info
         country_phones = {
@@ -155,39 +165,17 @@ class Command(BaseCommand):
             f"Trusted {category.name.lower()} in the heart of {city.name}."
         ]
 
-        try:
-            # Need to create with owner
-            from accounts.models import CustomUser
-            
-            # Get or create a default system user for generated businesses
-            system_user, created = CustomUser.objects.get_or_create(
-                username='system_generator',
-                defaults={
-                    'email': 'system@listacrosseu.eu',
-                    'first_name': 'System',
-                    'last_name': 'Generator',
-                    'is_staff': True
-                }
-            )
-            
-            business = Business.objects.create(
-                name=business_name,
-                slug=slug,
-                category=category,
-                city=city,
-                owner=system_user,
-                address=address,
-                phone=phone,
-                email=email,
-                website=website,
-                description=random.choice(descriptions),
-                status='active',
-                verified=True,
-                featured=random.random() < 0.15  # 15% chance of being featured
-            )
-            
-            return business
-            
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error creating {business_name}: {str(e)}'))
-            return None
\ No newline at end of file
+        return Business(
+            name=business_name,
+            category=category,
+            city=city,
+            owner=self.system_user,
+            address=address,
+            phone=phone,
+            email=email,
+            website=website,
+            description=random.choice(descriptions),
+            status='active',
+            verified=True,
+            featured=random.random() < 0.15  # 15% chance of being featured
+        )
@@ -3,33 +3,43 @@
 from django.core.management.base import BaseCommand
 from django.utils.text import slugify
 from businesses.models import City
+from businesses.slugs import SlugAllocator
+from businesses.slug_registry import slug_registry
+
+# Changed slugs written per bulk update
+BATCH_SIZE = 500
 
 
 class Command(BaseCommand):
     help = 'Regenerate clean city slugs without country codes'
 
     def handle(self, *args, **options):
-        cities = City.objects.all()
+        cities = City.objects.select_related('country').order_by('country_id', 'pk')
         updated_count = 0
+        changed = []
+        # Slugs are unique per country: one allocator (and one query) per country
+        allocators = {}
         
         self.stdout.write(f'Regenerating slugs for {cities.count()} cities...')
         
-        for city in cities:
+        for city in cities.iterator(chunk_size=2000):
             old_slug = city.slug
             
-            # Generate clean slug from city name only
-            base_slug = slugify(city.name.lower())
-            new_slug = base_slug
+            allocator = allocators.get(city.country_id)
+            if allocator is None:
+                allocator = allocators[city.country_id] = SlugAllocator(City.objects.filter(country_id=city.country_id))
+                allocator.load_all()
             
-            # Ensure uniqueness within the same country
-            counter = 1
-            while City.objects.filter(slug=new_slug, country=city.country).exclude(pk=city.pk).exists():
-                new_slug = f"{base_slug}-{counter}"
-                counter += 1
+            # Generate clean slug from city name only, unique within the same country
+            new_slug = allocator.allocate(slugify(city.name.lower()), pk=city.pk)
             
             if old_slug != new_slug:
+                allocator.release(old_slug, city.pk)
                 city.slug = new_slug
-                city.save(update_fields=['slug'])
+                changed.append(city)
+                if len(changed) >= BATCH_SIZE:
+                    City.objects.bulk_update(changed, ['slug'])
+                    changed = []
                 self.stdout.write(
                     self.style.SUCCESS(f'Updated {city.name}, {city.country.name}: {old_slug} → {new_slug}')
                 )
@@ -37,6 +47,11 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(f'No change for {city.name}, {city.country.name}: {city.slug}')
         
+        if changed:
+            City.objects.bulk_update(changed, ['slug'])
+        # bulk_update sends no save signals
+        slug_registry.invalidate()
+        
         self.stdout.write(
             self.style.SUCCESS(f'Successfully updated {updated_count} city slugs')
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,137 @@
+"""
+Run a partitioned business import.
+
+Cities are split into partitions (one per city, grouped by country) and run
+in a process pool. Progress is checkpointed per chunk, so an interrupted
+run continues with --resume instead of starting from zero.
+
+    python manage.py run_import osm --countries PT ES --workers 4
+    python manage.py run_import osm --countries PT ES --workers 4 --resume
+    python manage.py run_import osm --countries PT ES --workers 4 --refresh   # nightly re-sync
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from businesses.import_runner import IMPORT_CHUNK_SIZE, plan_partitions, run_partitions
+from businesses.import_sources import SOURCES
+from businesses.models import City
+
+
+class Command(BaseCommand):
+    help = 'Import businesses per city partition in parallel with resumable checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', choices=sorted(SOURCES), help='Where the businesses come from')
+        parser.add_argument(
+            '--countries',
+            nargs='+',
+            help='Country codes to import (default: all active countries)'
+        )
+        parser.add_argument(
+            '--cities',
+            type=int,
+            help='Only the N most populated cities'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum businesses per city (default: the source default)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help='Worker processes (default: up to 4)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f'Rows committed per transaction (default: {IMPORT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip completed partitions and continue the others from their checkpoint'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Fetch every city again instead of replaying cached API responses'
+        )
+
+    def handle(self, *args, **options):
+        source = options['source']
+        workers = options['workers']
+
+        cities = City.objects.filter(country__is_active=True)
+        if options['countries']:
+            cities = cities.filter(country__code__in=[code.upper() for code in options['countries']])
+        if options['cities']:
+            top_ids = list(cities.order_by('-population').values_list('id', flat=True)[:options['cities']])
+            cities = City.objects.filter(id__in=top_ids)
+
+        checkpoint_ids = plan_partitions(source, cities, resume=options['resume'])
+        if not checkpoint_ids:
+            self.stdout.write(self.style.WARNING('Nothing to import: no pending partitions'))
+            return
+
+        if connection.vendor == 'sqlite' and workers > 1:
+            self.stdout.write(self.style.WARNING(
+                '⚠️  SQLite allows one writer at a time; workers will wait on each other\'s commits'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Importing {len(checkpoint_ids)} partitions from {source} with {workers} workers'
+            f'{" (resumed)" if options["resume"] else ""}'
+        ))
+
+        started = time.monotonic()
+        totals = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'failed': 0}
+        per_worker = {}
+
+        results = run_partitions(
+            source, checkpoint_ids, workers=workers,
+            chunk_size=options['chunk_size'], limit=options['limit'], refresh=options['refresh'],
+        )
+        for done, result in enumerate(results, start=1):
+            for key in ('rows', 'created', 'updated', 'unchanged', 'duplicates'):
+                totals[key] += result[key]
+            worker = per_worker.setdefault(result['worker'], {'rows': 0, 'elapsed': 0, 'partitions': 0})
+            worker['rows'] += result['rows']
+            worker['elapsed'] += result['elapsed']
+            worker['partitions'] += 1
+
+            rate = result['rows'] / result['elapsed'] if result['elapsed'] else 0
+            progress = f'[{done}/{len(checkpoint_ids)}] {result["partition"]}'
+            if result['error']:
+                totals['failed'] += 1
+                self.stdout.write(self.style.ERROR(f'❌ {progress}: {result["error"]}'))
+            else:
+                self.stdout.write(
+                    f'✅ {progress}: {result["created"]} created, {result["updated"]} updated, '
+                    f'{result["unchanged"]} unchanged ({result["worker"]}, {rate:.0f} rows/sec)'
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write('👷 Throughput per worker:')
+        for name, worker in sorted(per_worker.items()):
+            rate = worker['rows'] / worker['elapsed'] if worker['elapsed'] else 0
+            self.stdout.write(
+                f'   {name}: {worker["partitions"]} partitions, {worker["rows"]} rows, {rate:.0f} rows/sec'
+            )
+
+        self.stdout.write(f'📊 Rows: {totals["rows"]} in {elapsed:.1f}s ({totals["rows"] / elapsed if elapsed else 0:.0f} rows/sec)')
+        self.stdout.write(f'✅ Created: {totals["created"]}')
+        self.stdout.write(f'🔄 Updated: {totals["updated"]}')
+        self.stdout.write(f'⏭️  Unchanged: {totals["unchanged"]}')
+        if totals['duplicates']:
+            self.stdout.write(self.style.WARNING(f'⚠️  Duplicates skipped: {totals["duplicates"]}'))
+        if totals['failed']:
+            raise CommandError(
+                f'{totals["failed"]} partitions failed; run again with --resume to continue them'
+            )
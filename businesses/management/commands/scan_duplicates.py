@@ -0,0 +1,28 @@
+"""
+Duplicate Scan Management Command
+Recomputes the stored duplicate report shown in the admin duplicate views
+"""
+
+from django.core.management.base import BaseCommand
+from businesses.duplicates import run_duplicate_scan
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored duplicate report (run from cron for periodic refreshes)'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔍 Running duplicate scan...')
+
+        scan = run_duplicate_scan()
+
+        if scan.status != 'completed':
+            self.stdout.write(self.style.ERROR(f'❌ Scan #{scan.pk} failed: {scan.error}'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Scan #{scan.pk} completed in {scan.duration.total_seconds():.1f}s'
+        ))
+        self.stdout.write(f'   Businesses scanned: {scan.businesses_scanned}')
+        self.stdout.write(f'   Exact duplicate groups: {scan.exact_groups}')
+        self.stdout.write(f'   Name duplicate groups: {scan.name_groups}')
+        self.stdout.write(f'   Address duplicate groups: {scan.address_groups}')
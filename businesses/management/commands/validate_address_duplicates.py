@@ -28,13 +28,11 @@ class Command(BaseCommand):
         min_businesses = options['min_businesses']
         fix_mode = options['fix']
         
-        # Find addresses with multiple businesses
+        # Find addresses with multiple businesses (compared on the normalized key)
         address_groups = Business.objects.exclude(
-            address__isnull=True
-        ).exclude(
-            address=''
+            address_key=''
         ).values(
-            'address', 'city'
+            'address_key', 'city'
         ).annotate(
             count=Count('id')
         ).filter(
@@ -50,9 +48,9 @@ class Command(BaseCommand):
         
         for group in address_groups:
             businesses = Business.objects.filter(
-                address=group['address'],
+                address_key=group['address_key'],
                 city_id=group['city']
-            ).order_by('name')
+            ).select_related('category', 'owner').order_by('name')
             
             # Analyze if this looks like a legitimate multi-tenant location
             business_names = [b.name for b in businesses]
@@ -76,7 +74,7 @@ class Command(BaseCommand):
             if is_legitimate:
                 legitimate_locations += 1
                 self.stdout.write(
-                    self.style.SUCCESS(f"✅ LEGITIMATE: {group['address'][:60]}...")
+                    self.style.SUCCESS(f"✅ LEGITIMATE: {group['address_key'][:60]}...")
                 )
                 self.stdout.write(f"   📊 {len(business_names)} businesses, {category_diversity} categories")
                 self.stdout.write(f"   🏪 Businesses: {', '.join(business_names[:5])}")
@@ -92,7 +90,7 @@ class Command(BaseCommand):
             else:
                 suspicious_groups += 1
                 self.stdout.write(
-                    self.style.WARNING(f"⚠️  SUSPICIOUS: {group['address'][:60]}...")
+                    self.style.WARNING(f"⚠️  SUSPICIOUS: {group['address_key'][:60]}...")
                 )
                 self.stdout.write(f"   📊 {len(business_names)} businesses, similarity: {similarity_score:.2f}")
                 self.stdout.write(f"   🔍 Names: {', '.join(business_names)}")
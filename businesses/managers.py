@@ -0,0 +1,218 @@
+"""
+Bulk write helpers for Business.
+
+Importers used to "create or update" one row at a time with a lookup plus
+save(). ``Business.objects.bulk_upsert()`` writes a whole batch with a
+single ``INSERT ... ON CONFLICT DO UPDATE`` (SQLite and PostgreSQL) and
+reports what actually changed.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator, validate_email
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .normalization import normalize_phone, normalize_email, normalize_address
+from .slugs import SlugAllocator
+
+UPSERT_BATCH_SIZE = 1000
+KEY_FIELDS = ['phone_key', 'email_key', 'address_key']
+HOURS_FIELDS = [f'{day}_hours' for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']]
+
+# Data an importer provides. Plan, status, owner, media, counters and
+# translations are managed on the site and are never overwritten by default.
+DEFAULT_UPDATE_FIELDS = [
+    'description', 'short_description', 'email', 'phone', 'website', 'address',
+    'postal_code', 'latitude', 'longitude', 'category',
+] + HOURS_FIELDS
+
+
+class BusinessQuerySet(models.QuerySet):
+
+    def bulk_upsert(self, rows, conflict=('name', 'city'), update_fields=None, batch_size=UPSERT_BATCH_SIZE,
+                    skipped=None):
+        """Insert new businesses and update existing ones matched on ``conflict``.
+
+        ``rows`` are Business instances or dicts of field values. Only
+        ``update_fields`` (default ``DEFAULT_UPDATE_FIELDS``) are written to
+        existing businesses (none with ``update_fields=[]``), and rows whose
+        update fields already match the stored values are not written at
+        all. Rows whose phone or email key belongs to another business in the
+        same city would break the duplicate constraints and are skipped, as
+        are rows renamed to another business's name when ``name`` is updated
+        on a match by another key.
+
+        Canonical keys, slugs and ``published_at`` are filled in here because
+        bulk writes bypass ``Business.save()``. Names are normalized as
+        ``Business.clean()`` does before rows are matched, an invalid website
+        is dropped and rows without a name or a valid email are skipped.
+        Matched rows get the primary key of the stored business.
+
+        Pass a list as ``skipped`` to get ``(row, survivor pk)`` for every row
+        that was not written: the business a row repeating a natural key of
+        the batch was merged into, the business holding a duplicate phone or
+        email key, or None for invalid rows.
+
+        Returns a dict with ``created``, ``updated``, ``unchanged``,
+        ``duplicates``, ``invalid`` and ``merged`` (rows repeating a natural
+        key of the batch) counts.
+        """
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0, 'merged': 0}
+        batch = []
+        for row in rows:
+            batch.append(row if isinstance(row, self.model) else self.model(**row))
+            if len(batch) >= batch_size:
+                self._upsert_batch(batch, conflict, update_fields, counts, skipped)
+                batch = []
+        if batch:
+            self._upsert_batch(batch, conflict, update_fields, counts, skipped)
+        return counts
+
+    def _upsert_batch(self, businesses, conflict, update_fields, counts, skipped=None):
+        opts = self.model._meta
+        conflict_attnames = [opts.get_field(name).attname for name in conflict]
+        insert_only = update_fields is not None and not update_fields
+        if update_fields is None:
+            update_fields = DEFAULT_UPDATE_FIELDS
+        update_fields = list(dict.fromkeys([*update_fields, *KEY_FIELDS, 'updated_at']))
+        compare_fields = [opts.get_field(name) for name in update_fields if name != 'updated_at']
+
+        def conflict_key(obj):
+            return tuple(getattr(obj, attname) for attname in conflict_attnames)
+
+        if skipped is None:
+            skipped = []
+        businesses = self._clean_rows(businesses, counts, skipped)
+        # The last row wins when a batch repeats a natural key
+        winners = {conflict_key(obj): obj for obj in businesses}
+        merged = [(obj, winners[conflict_key(obj)]) for obj in businesses if winners[conflict_key(obj)] is not obj]
+        businesses = list(winners.values())
+        self._fill_keys(businesses)
+
+        lookup = {f'{attname}__in': {key[i] for key in map(conflict_key, businesses)}
+                  for i, attname in enumerate(conflict_attnames)}
+        existing = {
+            tuple(row[attname] for attname in conflict_attnames): row
+            for row in self.filter(**lookup).values('pk', 'slug', *conflict_attnames, *[f.attname for f in compare_fields])
+        }
+
+        to_write = []
+        # Listings the updated rows leave, for the page cache
+        previous = []
+        for obj in businesses:
+            current = existing.get(conflict_key(obj))
+            if current is None:
+                to_write.append(obj)
+                continue
+            obj.pk, obj.slug = current['pk'], current['slug']
+            if insert_only or all(field.to_python(getattr(obj, field.attname)) == current[field.attname] for field in compare_fields):
+                counts['unchanged'] += 1
+            else:
+                to_write.append(obj)
+                if current.get('category_id', obj.category_id) != obj.category_id:
+                    previous.append((obj.pk, obj.city_id, current['category_id']))
+
+        # Matched on something else than the name, a renamed row may take another business's name
+        check_names = 'name' in update_fields and 'name' not in conflict
+        to_write = self._drop_key_conflicts(to_write, counts, skipped, check_names)
+        created = [obj for obj in to_write if conflict_key(obj) not in existing]
+        self._fill_slugs(created)
+        now = timezone.now()
+        for obj in created:
+            if obj.status == 'active' and not obj.published_at:
+                obj.published_at = now
+
+        if to_write:
+            with transaction.atomic(using=self.db):
+                self.bulk_create(
+                    to_write,
+                    update_conflicts=True,
+                    unique_fields=list(conflict),
+                    update_fields=update_fields,
+                )
+                from .page_cache import invalidate_businesses
+                invalidate_businesses([(obj.pk, obj.city_id, obj.category_id) for obj in to_write] + previous)
+        # Winners have their final primary key by now
+        skipped.extend((obj, winner.pk) for obj, winner in merged)
+        counts['merged'] += len(merged)
+        counts['created'] += len(created)
+        counts['updated'] += len(to_write) - len(created)
+
+    def _clean_rows(self, businesses, counts, skipped):
+        """Normalize names and check contact fields the way save() (clean, full_clean) would"""
+        validate_url = URLValidator()
+        kept = []
+        for obj in businesses:
+            obj.name = obj.normalize_business_name(obj.name)
+            if obj.website:
+                try:
+                    validate_url(obj.website)
+                except ValidationError:
+                    # Optional: keep the business without it
+                    obj.website = ''
+            try:
+                if not obj.name:
+                    raise ValidationError('A business needs a name')
+                validate_email(obj.email)
+            except ValidationError:
+                counts['invalid'] += 1
+                skipped.append((obj, None))
+                continue
+            kept.append(obj)
+        return kept
+
+    def _fill_keys(self, businesses):
+        """Compute the canonical duplicate keys save() would have set"""
+        city_model = self.model._meta.get_field('city').related_model
+        city_ids = {obj.city_id for obj in businesses}
+        country_codes = dict(city_model.objects.filter(pk__in=city_ids).values_list('pk', 'country__code'))
+        for obj in businesses:
+            country_code = country_codes.get(obj.city_id)
+            obj.phone_key = normalize_phone(obj.phone, country_code)
+            obj.email_key = normalize_email(obj.email)
+            obj.address_key = normalize_address(obj.address)
+
+    def _drop_key_conflicts(self, businesses, counts, skipped, check_names=False):
+        """Skip rows whose phone/email key (or name, with ``check_names``) is taken by another business in the city"""
+        def row_keys(name, phone_key, email_key):
+            keys = [key for key in (phone_key, email_key) if key]
+            return keys + [('name', name)] if check_names else keys
+
+        city_ids = {obj.city_id for obj in businesses}
+        taken_filter = (
+            models.Q(phone_key__in={obj.phone_key for obj in businesses if obj.phone_key}) |
+            models.Q(email_key__in={obj.email_key for obj in businesses if obj.email_key})
+        )
+        if check_names:
+            taken_filter |= models.Q(name__in={obj.name for obj in businesses})
+        taken = {}
+        for pk, city_id, name, phone_key, email_key in self.filter(city_id__in=city_ids).filter(
+            taken_filter
+        ).values_list('pk', 'city_id', 'name', 'phone_key', 'email_key'):
+            for key in row_keys(name, phone_key, email_key):
+                taken[(city_id, key)] = pk
+
+        kept = []
+        for obj in businesses:
+            keys = [(obj.city_id, key) for key in row_keys(obj.name, obj.phone_key, obj.email_key)]
+            owners = [taken[key] for key in keys if taken.get(key, obj.pk) != obj.pk]
+            if owners:
+                counts['duplicates'] += 1
+                skipped.append((obj, owners[0]))
+                continue
+            for key in keys:
+                taken[key] = obj.pk
+            kept.append(obj)
+        return kept
+
+    def _fill_slugs(self, businesses):
+        """Give new businesses a unique slug, suffixing taken ones like save() does"""
+        bases = [obj.slug or slugify(obj.name) for obj in businesses]
+        allocator = SlugAllocator(self.model._default_manager.all())
+        allocator.preload(bases)
+        for obj, base_slug in zip(businesses, bases):
+            obj.slug = allocator.allocate(base_slug)
+
+
+BusinessManager = models.Manager.from_queryset(BusinessQuerySet)
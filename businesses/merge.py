@@ -0,0 +1,160 @@
+"""
+Duplicate merge pipeline.
+
+Merging moves everything attached to a duplicate ("loser") onto the
+business that is kept ("survivor") before the loser is deleted, so reviews,
+images, claims, article features and external source references are not
+lost with it. Every step is a
+set-based UPDATE/DELETE per chunk of groups instead of per-row saves.
+"""
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from travel.models import ArticleBusinessFeature, ItineraryStop
+from .models import Business, BusinessImage, Review, BusinessClaim, ExternalReference
+from .timeseries import merge_daily_stats
+
+MERGE_BATCH_SIZE = 500
+
+# (model, field that must stay unique together with the business)
+RELATED_MODELS = [
+    (Review, 'reviewer_id'),
+    (BusinessImage, None),
+    (BusinessClaim, None),
+    (ArticleBusinessFeature, 'article_id'),
+    (ItineraryStop, None),
+    (Business.subcategories.through, 'category_id'),
+    # Unique on (source, external_id) alone, so a survivor can hold the references of all its losers
+    (ExternalReference, None),
+]
+
+
+def resolve_merge_groups(member_lists, remove_ids=None):
+    """Turn ordered member lists (oldest first) into (survivor, losers) pairs.
+
+    Businesses that no longer exist are skipped. Without ``remove_ids`` the
+    oldest member survives and all others are merged into it. With
+    ``remove_ids`` only those members are merged, into the oldest member
+    that is not being removed.
+    """
+    member_lists = [[str(business_id) for business_id in members] for members in member_lists]
+    all_ids = {business_id for members in member_lists for business_id in members}
+    existing = {str(pk) for pk in Business.objects.filter(pk__in=all_ids).values_list('pk', flat=True)}
+    remove_ids = {str(business_id) for business_id in remove_ids} if remove_ids is not None else None
+
+    merge_groups = []
+    claimed = set()
+    for members in member_lists:
+        members = [business_id for business_id in members if business_id in existing and business_id not in claimed]
+        if remove_ids is None:
+            survivor, losers = (members[0], members[1:]) if members else (None, [])
+        else:
+            keep = [business_id for business_id in members if business_id not in remove_ids]
+            survivor = keep[0] if keep else None
+            losers = [business_id for business_id in members if business_id in remove_ids]
+        if survivor and losers:
+            merge_groups.append((survivor, losers))
+            claimed.update(losers)
+            claimed.add(survivor)
+    return merge_groups
+
+
+def merge_businesses(merge_groups, dry_run=False, batch_size=MERGE_BATCH_SIZE):
+    """Merge each (survivor_id, loser_ids) group and delete the losers.
+
+    Related rows are repointed to the survivor, view/click counters are
+    summed into it and the losers are deleted in chunks. Each chunk commits
+    in its own transaction (a savepoint when the caller holds one), so locks
+    are held one chunk at a time and a failure keeps the chunks merged
+    before it. With ``dry_run`` every chunk is rolled back and only the
+    statistics are returned.
+    """
+    stats = {'groups': 0, 'deleted': 0, 'moved': {}, 'dropped': {}}
+
+    for start in range(0, len(merge_groups), batch_size):
+        chunk = merge_groups[start:start + batch_size]
+        with transaction.atomic():
+            _merge_chunk(chunk, stats)
+            if dry_run:
+                transaction.set_rollback(True)
+
+    return stats
+
+
+def _merge_chunk(chunk, stats):
+    mapping = {loser: survivor for survivor, losers in chunk for loser in losers}
+    if not mapping:
+        return
+
+    for model, unique_with in RELATED_MODELS:
+        moved, dropped = _repoint(model, mapping, unique_with)
+        label = 'subcategory links' if model._meta.auto_created else str(model._meta.verbose_name_plural)
+        stats['moved'][label] = stats['moved'].get(label, 0) + moved
+        stats['dropped'][label] = stats['dropped'].get(label, 0) + dropped
+
+    # Sum the counters of each group into its survivor
+    totals = Business.objects.filter(pk__in=mapping).values_list('pk', 'views_count', 'clicks_count')
+    views, clicks = {}, {}
+    for loser, views_count, clicks_count in totals:
+        survivor = mapping[str(loser)]
+        views[survivor] = views.get(survivor, 0) + views_count
+        clicks[survivor] = clicks.get(survivor, 0) + clicks_count
+    if views:
+        Business.objects.filter(pk__in=views).update(
+            views_count=F('views_count') + _per_business(views),
+            clicks_count=F('clicks_count') + _per_business(clicks),
+            updated_at=timezone.now(),
+        )
+    merge_daily_stats(mapping)
+
+    Business.objects.filter(pk__in=mapping).delete()
+    stats['groups'] += len(chunk)
+    stats['deleted'] += len(mapping)
+
+
+def _repoint(model, mapping, unique_with=None):
+    """Move rows of ``model`` from losers to their survivors.
+
+    Returns ``(moved, dropped)``. When ``unique_with`` is set, a loser row
+    that would collide with a row the survivor already has (or with another
+    loser's row) is dropped; the survivor's own row always wins.
+    """
+    losers = list(mapping)
+    dropped_ids = []
+
+    if unique_with:
+        survivors = set(mapping.values())
+        rows = model.objects.filter(
+            business_id__in=losers + list(survivors)
+        ).values_list('pk', 'business_id', unique_with)
+        rows = sorted(rows, key=lambda row: str(row[1]) in mapping)  # survivors' own rows first
+        taken = set()
+        for pk, business_id, partner in rows:
+            target = mapping.get(str(business_id), str(business_id))
+            if (target, partner) in taken:
+                dropped_ids.append(pk)
+            else:
+                taken.add((target, partner))
+        if dropped_ids:
+            model.objects.filter(pk__in=dropped_ids).delete()
+
+    moved = model.objects.filter(business_id__in=losers).update(
+        business_id=Case(
+            *[
+                When(business_id=loser, then=Value(survivor, output_field=models.UUIDField()))
+                for loser, survivor in mapping.items()
+            ],
+            output_field=models.UUIDField(),
+        )
+    )
+    return moved, len(dropped_ids)
+
+
+def _per_business(values):
+    return Case(
+        *[When(pk=business_id, then=Value(value)) for business_id, value in values.items()],
+        default=Value(0),
+        output_field=models.PositiveIntegerField(),
+    )
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0009_business_translations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20, verbose_name='status')),
+                ('businesses_scanned', models.PositiveIntegerField(default=0, verbose_name='businesses scanned')),
+                ('exact_groups', models.PositiveIntegerField(default=0, verbose_name='exact groups')),
+                ('name_groups', models.PositiveIntegerField(default=0, verbose_name='name groups')),
+                ('address_groups', models.PositiveIntegerField(default=0, verbose_name='address groups')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Duplicate Scan',
+                'verbose_name_plural': 'Duplicate Scans',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_type', models.CharField(choices=[('exact', 'Exact Match'), ('name', 'Same Name'), ('address', 'Same Address')], max_length=10, verbose_name='type')),
+                ('city_name', models.CharField(blank=True, max_length=100, verbose_name='city name')),
+                ('country_code', models.CharField(blank=True, max_length=2, verbose_name='country code')),
+                ('name', models.CharField(blank=True, max_length=200, verbose_name='business name')),
+                ('address', models.TextField(blank=True, verbose_name='address')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+                ('business_ids', models.JSONField(default=list, verbose_name='business IDs')),
+                ('suspicious_pairs', models.JSONField(blank=True, default=list, verbose_name='suspicious pairs')),
+                ('distinct_values', models.JSONField(blank=True, default=list, verbose_name='distinct values')),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='businesses.city')),
+                ('scan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='groups', to='businesses.duplicatescan')),
+            ],
+            options={
+                'verbose_name': 'Duplicate Group',
+                'verbose_name_plural': 'Duplicate Groups',
+                'ordering': ['-count', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='duplicatescan',
+            index=models.Index(fields=['status', '-created_at'], name='businesses__status_80410c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicategroup',
+            index=models.Index(fields=['scan', 'group_type', '-count'], name='businesses__scan_id_8e38b2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicategroup',
+            index=models.Index(fields=['scan', 'country_code'], name='businesses__scan_id_1a0796_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0010_duplicate_scan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='business',
+            name='unique_business_email_city',
+        ),
+        migrations.RemoveConstraint(
+            model_name='business',
+            name='unique_business_phone_city',
+        ),
+        migrations.RemoveIndex(
+            model_name='business',
+            name='businesses__email_486f02_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='business',
+            name='businesses__phone_e1f5e7_idx',
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='address_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='normalized address'),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, max_length=254, verbose_name='normalized email'),
+        ),
+        migrations.AddField(
+            model_name='business',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='normalized phone'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['city', 'email_key'], name='businesses__city_id_17e1a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['city', 'phone_key'], name='businesses__city_id_226b48_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['city', 'address_key'], name='businesses__city_id_622f3a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='business',
+            constraint=models.UniqueConstraint(condition=models.Q(('email_key', ''), _negated=True), fields=('email_key', 'city'), name='unique_business_email_key_city'),
+        ),
+        migrations.AddConstraint(
+            model_name='business',
+            constraint=models.UniqueConstraint(condition=models.Q(('phone_key', ''), _negated=True), fields=('phone_key', 'city'), name='unique_business_phone_key_city'),
+        ),
+    ]
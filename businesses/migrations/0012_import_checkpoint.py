@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0011_business_normalized_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, verbose_name='source')),
+                ('partition', models.CharField(max_length=200, verbose_name='partition')),
+                ('country_code', models.CharField(blank=True, max_length=2, verbose_name='country code')),
+                ('offset', models.PositiveIntegerField(default=0, verbose_name='offset')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='status')),
+                ('rows_created', models.PositiveIntegerField(default=0, verbose_name='rows created')),
+                ('rows_updated', models.PositiveIntegerField(default=0, verbose_name='rows updated')),
+                ('rows_unchanged', models.PositiveIntegerField(default=0, verbose_name='rows unchanged')),
+                ('rows_duplicates', models.PositiveIntegerField(default=0, verbose_name='rows duplicates')),
+                ('worker', models.CharField(blank=True, max_length=50, verbose_name='worker')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='businesses.city')),
+            ],
+            options={
+                'verbose_name': 'Import Checkpoint',
+                'verbose_name_plural': 'Import Checkpoints',
+                'ordering': ['source', 'partition'],
+                'indexes': [models.Index(fields=['source', 'status'], name='businesses__source_44f474_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'partition'), name='unique_import_checkpoint_partition')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0012_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, verbose_name='source')),
+                ('external_id', models.CharField(max_length=255, verbose_name='external ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='content hash')),
+                ('stale', models.BooleanField(default=False, verbose_name='stale')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='first seen')),
+                ('last_seen', models.DateTimeField(verbose_name='last seen')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='external_refs', to='businesses.business')),
+            ],
+            options={
+                'verbose_name': 'External Reference',
+                'verbose_name_plural': 'External References',
+                'ordering': ['source', 'external_id'],
+                'indexes': [models.Index(fields=['source', 'last_seen'], name='businesses__source_ed1c1f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'external_id'), name='unique_external_reference')],
+            },
+        ),
+    ]
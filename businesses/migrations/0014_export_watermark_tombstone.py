@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0013_external_reference'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feed', models.CharField(max_length=50, unique=True, verbose_name='feed')),
+                ('exported_until', models.DateTimeField(verbose_name='exported until')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='rows')),
+                ('tombstones', models.PositiveIntegerField(default=0, verbose_name='tombstones')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'Export Watermark',
+                'verbose_name_plural': 'Export Watermarks',
+                'ordering': ['feed'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='model')),
+                ('object_id', models.CharField(max_length=64, verbose_name='object ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='deleted at')),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['updated_at', 'id'], name='businesses__updated_53bbbd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='businesses__deleted_ef288a_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0014_export_watermark_tombstone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_type', models.CharField(max_length=50, verbose_name='export type')),
+                ('compressed', models.BooleanField(default=False, verbose_name='gzip compressed')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20, verbose_name='status')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='rows written')),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True, verbose_name='total rows')),
+                ('file_name', models.CharField(blank=True, max_length=255, verbose_name='file name')),
+                ('bytes', models.PositiveBigIntegerField(default=0, verbose_name='size in bytes')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Admin Export',
+                'verbose_name_plural': 'Admin Exports',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0015_admin_export'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('clicks', models.PositiveIntegerField(default=0, verbose_name='clicks')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='businesses.business')),
+            ],
+            options={
+                'verbose_name': 'Business Daily Stats',
+                'verbose_name_plural': 'Business Daily Stats',
+                'ordering': ['business', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('business', 'date'), name='unique_business_daily_stats')],
+            },
+        ),
+    ]
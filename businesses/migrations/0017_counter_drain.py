@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0016_business_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterDrain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('drain_id', models.CharField(max_length=32, unique=True, verbose_name='drain ID')),
+                ('applied_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='applied at')),
+            ],
+            options={
+                'verbose_name': 'Counter Drain',
+                'verbose_name_plural': 'Counter Drains',
+                'ordering': ['-applied_at'],
+            },
+        ),
+    ]
@@ -8,6 +8,10 @@ from django.utils.text import slugify
 import uuid
 import re
 
+from .normalization import normalize_phone, normalize_email, normalize_address
+from .managers import BusinessManager
+from .slugs import unique_slug
+
 User = get_user_model()
 
 
@@ -97,14 +101,8 @@ class City(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             from django.utils.text import slugify
-            base_slug = slugify(self.name.lower())
-            self.slug = base_slug
-            
             # Ensure uniqueness within the same country
-            counter = 1
-            while City.objects.filter(slug=self.slug, country=self.country).exclude(pk=self.pk).exists():
-                self.slug = f"{base_slug}-{counter}"
-                counter += 1
+            self.slug = unique_slug(City.objects.filter(country=self.country), slugify(self.name.lower()), pk=self.pk)
         
         super().save(*args, **kwargs)
 
@@ -148,6 +146,11 @@ class Business(models.Model):
     latitude = models.DecimalField(_('latitude'), max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(_('longitude'), max_digits=9, decimal_places=6, null=True, blank=True)
     
+    # Canonical keys for duplicate detection (computed on save)
+    phone_key = models.CharField(_('normalized phone'), max_length=20, blank=True, editable=False)
+    email_key = models.CharField(_('normalized email'), max_length=254, blank=True, editable=False)
+    address_key = models.CharField(_('normalized address'), max_length=255, blank=True, editable=False)
+    
     # Business Classification
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='businesses')
     subcategories = models.ManyToManyField(
@@ -194,6 +197,8 @@ class Business(models.Model):
     published_at = models.DateTimeField(_('published at'), null=True, blank=True)
     expires_at = models.DateTimeField(_('expires at'), null=True, blank=True)
     
+    objects = BusinessManager()
+    
     class Meta:
         verbose_name = _('Business')
         verbose_name_plural = _('Businesses')
@@ -206,15 +211,15 @@ class Business(models.Model):
             ),
             # Prevent same email in same city (common duplicate pattern)
             models.UniqueConstraint(
-                fields=['email', 'city'],
-                name='unique_business_email_city',
-                condition=models.Q(email__isnull=False) & ~models.Q(email='')
+                fields=['email_key', 'city'],
+                name='unique_business_email_key_city',
+                condition=~models.Q(email_key='')
             ),
             # Prevent same phone in same city
             models.UniqueConstraint(
-                fields=['phone', 'city'],
-                name='unique_business_phone_city', 
-                condition=models.Q(phone__isnull=False) & ~models.Q(phone='')
+                fields=['phone_key', 'city'],
+                name='unique_business_phone_key_city',
+                condition=~models.Q(phone_key='')
             ),
         ]
         indexes = [
@@ -222,8 +227,10 @@ class Business(models.Model):
             models.Index(fields=['city', 'category']),
             models.Index(fields=['featured', 'verified']),
             models.Index(fields=['name', 'city']),  # For duplicate checking
-            models.Index(fields=['email', 'city']),  # For duplicate checking
-            models.Index(fields=['phone', 'city']),  # For duplicate checking
+            models.Index(fields=['city', 'email_key']),  # For duplicate checking
+            models.Index(fields=['city', 'phone_key']),  # For duplicate checking
+            models.Index(fields=['city', 'address_key']),  # For duplicate checking
+            models.Index(fields=['updated_at', 'id']),  # For incremental exports
         ]
     
     def __str__(self):
@@ -254,6 +261,9 @@ class Business(models.Model):
         if self.name:
             self.name = self.normalize_business_name(self.name)
             
+        # Refresh canonical contact keys
+        self.update_normalized_keys()
+            
         # Check for potential duplicates
         self.check_for_duplicates()
     
@@ -281,6 +291,13 @@ class Business(models.Model):
                 
         return name.strip()
     
+    def update_normalized_keys(self):
+        """Compute the canonical phone, email and address keys"""
+        country_code = self.city.country.code if self.city_id else None
+        self.phone_key = normalize_phone(self.phone, country_code)
+        self.email_key = normalize_email(self.email)
+        self.address_key = normalize_address(self.address)
+    
     def check_for_duplicates(self):
         """Check for potential duplicates and raise validation error"""
         if not self.name or not self.city:
@@ -306,29 +323,35 @@ class Business(models.Model):
             })
             
         # Check for same email
-        if self.email and existing_qs.filter(email__iexact=self.email).exists():
+        if self.email_key and existing_qs.filter(email_key=self.email_key).exists():
             raise ValidationError({
                 'email': 'A business with this email already exists in this city.'
             })
             
         # Check for same phone
-        if self.phone and existing_qs.filter(phone=self.phone).exists():
+        if self.phone_key and existing_qs.filter(phone_key=self.phone_key).exists():
             raise ValidationError({
                 'phone': 'A business with this phone number already exists in this city.'
             })
     
     def find_similar_names(self, queryset):
         """Find businesses with similar names using fuzzy matching"""
+        candidates = (self.name_signature(name) for name in queryset.values_list('name', flat=True))
+        return self.match_similar_names(self.name, candidates)
+    
+    @staticmethod
+    def name_signature(name):
+        """Return (name, lowercased name, word set) used for fuzzy matching"""
+        lowered = name.lower().strip()
+        return name, lowered, set(re.findall(r'\b\w+\b', lowered))
+    
+    @staticmethod
+    def match_similar_names(name, candidates):
+        """Match a name against (name, lowered, words) signatures, at most 3 results"""
         similar_names = []
-        current_name = self.name.lower().strip()
-        
-        # Split into words for comparison
-        current_words = set(re.findall(r'\b\w+\b', current_name))
+        _, current_name, current_words = Business.name_signature(name)
         
-        for business in queryset.only('name'):
-            existing_name = business.name.lower().strip()
-            existing_words = set(re.findall(r'\b\w+\b', existing_name))
-            
+        for existing, existing_name, existing_words in candidates:
             # Calculate similarity
             if current_words and existing_words:
                 intersection = current_words.intersection(existing_words)
@@ -338,12 +361,15 @@ class Business(models.Model):
                 # If similarity > 80% and names share significant words
                 if (similarity > 0.8 and len(intersection) >= 2) or \
                    (similarity > 0.9 and len(intersection) >= 1):
-                    similar_names.append(business.name)
+                    similar_names.append(existing)
                     
                 # Also check if one name is contained in another
                 if (current_name in existing_name or existing_name in current_name) and \
                    abs(len(current_name) - len(existing_name)) <= 5:
-                    similar_names.append(business.name)
+                    similar_names.append(existing)
+                    
+            if len(similar_names) >= 3:
+                break
                     
         return similar_names[:3]  # Limit to 3 examples
     
@@ -371,25 +397,107 @@ class Business(models.Model):
                     issues.append(f'Similar names found: {", ".join(similar)}')
                     
         # Check email duplicates
-        if email and qs.filter(email__iexact=email).exists():
+        email_key = normalize_email(email)
+        if email_key and qs.filter(email_key=email_key).exists():
             issues.append('Email already exists in this city')
             
         # Check phone duplicates  
-        if phone and qs.filter(phone=phone).exists():
+        phone_key = normalize_phone(phone, city.country.code)
+        if phone_key and qs.filter(phone_key=phone_key).exists():
             issues.append('Phone number already exists in this city')
             
         return issues
     
+    @classmethod
+    def check_potential_duplicates(cls, candidates):
+        """Batch variant of check_potential_duplicate for importers.
+        
+        ``candidates`` is a list of dicts with ``name`` and ``city`` (a City or
+        its id) and optional ``email``, ``phone`` and ``exclude_id``. Existing
+        businesses of every referenced city are loaded in a single query and
+        each row is also checked against the earlier rows of the batch.
+        Similar names are only compared among the candidates of a
+        SimilarNameIndex, not with every name of the city.
+        Returns a list of issue lists in the same order as ``candidates``.
+        """
+        city_ids = {getattr(row.get('city'), 'pk', row.get('city')) for row in candidates}
+        country_codes = dict(City.objects.filter(id__in=city_ids - {None}).values_list('id', 'country__code'))
+        
+        # Per city: key -> set of markers (business pk, or batch row index)
+        index = {
+            city_id: {'names': {}, 'emails': {}, 'phones': {}, 'similar': SimilarNameIndex()}
+            for city_id in country_codes
+        }
+        existing = cls.objects.filter(city_id__in=country_codes).values_list(
+            'id', 'city_id', 'name', 'email_key', 'phone_key'
+        )
+        for pk, city_id, name, email_key, phone_key in existing.iterator(chunk_size=2000):
+            cls._index_duplicate_keys(index[city_id], pk, name, email_key, phone_key)
+        
+        normalizer = cls()
+        results = []
+        for row_number, row in enumerate(candidates):
+            city_id = getattr(row.get('city'), 'pk', row.get('city'))
+            if city_id not in index:
+                results.append(['City not found'])
+                continue
+            
+            city_index = index[city_id]
+            exclude = {row.get('exclude_id'), str(row.get('exclude_id'))} if row.get('exclude_id') else set()
+            name = normalizer.normalize_business_name(row.get('name') or '')
+            email_key = normalize_email(row.get('email'))
+            phone_key = normalize_phone(row.get('phone'), country_codes[city_id])
+            issues = []
+            
+            # Check name duplicates
+            if name:
+                matches = city_index['names'].get(name.lower(), set()) - exclude
+                if matches:
+                    issues.append(cls._duplicate_issue(matches, 'Exact name match found', 'Name'))
+                else:
+                    similar = cls.match_similar_names(name, city_index['similar'].candidates(name, exclude))
+                    if similar:
+                        issues.append(f'Similar names found: {", ".join(similar)}')
+            
+            # Check email and phone duplicates
+            if email_key:
+                matches = city_index['emails'].get(email_key, set()) - exclude
+                if matches:
+                    issues.append(cls._duplicate_issue(matches, 'Email already exists in this city', 'Email'))
+            if phone_key:
+                matches = city_index['phones'].get(phone_key, set()) - exclude
+                if matches:
+                    issues.append(cls._duplicate_issue(matches, 'Phone number already exists in this city', 'Phone number'))
+            
+            results.append(issues)
+            cls._index_duplicate_keys(city_index, row_number, name, email_key, phone_key)
+        
+        return results
+    
+    @classmethod
+    def _index_duplicate_keys(cls, city_index, marker, name, email_key, phone_key):
+        if name:
+            city_index['names'].setdefault(name.lower(), set()).add(marker)
+            city_index['similar'].add(marker, name)
+        if email_key:
+            city_index['emails'].setdefault(email_key, set()).add(marker)
+        if phone_key:
+            city_index['phones'].setdefault(phone_key, set()).add(marker)
+    
+    @staticmethod
+    def _duplicate_issue(markers, message, label):
+        """Report existing businesses first, otherwise the earlier batch row"""
+        batch_rows = sorted(marker for marker in markers if isinstance(marker, int))
+        if len(batch_rows) < len(markers):
+            return message
+        return f'{label} duplicates row {batch_rows[0] + 1} of this batch'
+    
     def save(self, *args, **kwargs):
         # Generate slug if not provided
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Business.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = unique_slug(Business.objects.all(), slugify(self.name), pk=self.pk)
+            
+        self.update_normalized_keys()
             
         # Run full validation before saving
         self.full_clean()
@@ -401,6 +509,75 @@ class Business(models.Model):
         super().save(*args, **kwargs)
 
 
+class SimilarNameIndex:
+    """Name signatures of one city, indexed for Business.match_similar_names().
+
+    A name can only match names that hold one of its rarest ceil(n/5) words
+    (more than 80% word overlap leaves fewer than n/5 of its n words out),
+    shorter names it contains (found by exact lookup of its substrings at
+    most CONTAINMENT_SLACK characters shorter) or longer names containing it
+    (all of which hold its rarest trigram). candidates() returns only those,
+    in insertion order, so the matches are the same as scanning every name.
+    """
+
+    CONTAINMENT_SLACK = 5
+
+    def __init__(self):
+        # (marker, signature) in insertion order; the postings hold positions in it
+        self.signatures = []
+        self.words = {}
+        self.names = {}
+        self.trigrams = {}
+        # Names short enough to contain a name without trigrams
+        self.short = []
+
+    @staticmethod
+    def name_trigrams(lowered):
+        return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+    def add(self, marker, name):
+        signature = Business.name_signature(name)
+        _, lowered, words = signature
+        position = len(self.signatures)
+        self.signatures.append((marker, signature))
+        for word in words:
+            self.words.setdefault(word, []).append(position)
+        self.names.setdefault(lowered, []).append(position)
+        for trigram in self.name_trigrams(lowered):
+            self.trigrams.setdefault(trigram, []).append(position)
+        if len(lowered) < 3 + self.CONTAINMENT_SLACK:
+            self.short.append(position)
+
+    def candidates(self, name, exclude=()):
+        """Signatures that may be similar to ``name``, skipping the markers in ``exclude``"""
+        _, lowered, words = Business.name_signature(name)
+        if not words:
+            return []
+        slack = self.CONTAINMENT_SLACK
+        positions = set()
+
+        rarest = sorted(words, key=lambda word: len(self.words.get(word, ())))
+        for word in rarest[:(len(words) + 4) // 5]:
+            positions.update(self.words.get(word, ()))
+
+        length = len(lowered)
+        for size in range(max(1, length - slack), length + 1):
+            for start in range(length - size + 1):
+                positions.update(self.names.get(lowered[start:start + size], ()))
+
+        trigrams = self.name_trigrams(lowered)
+        longer = min((self.trigrams.get(trigram, ()) for trigram in trigrams), key=len) if trigrams else self.short
+        positions.update(
+            position for position in longer
+            if 0 <= len(self.signatures[position][1][1]) - length <= slack
+        )
+
+        return [
+            signature for marker, signature in (self.signatures[position] for position in sorted(positions))
+            if marker not in exclude
+        ]
+
+
 class BusinessImage(models.Model):
     """Additional images for businesses"""
     
@@ -455,4 +632,16 @@ class Review(models.Model):
 
 
 # Import registration models
-from .models_registration import BusinessRegistration, BusinessPhoto, BusinessClaim
\ No newline at end of file
+from .models_registration import BusinessRegistration, BusinessPhoto, BusinessClaim
+
+# Import duplicate analysis models
+from .models_duplicates import DuplicateScan, DuplicateGroup
+
+# Import checkpoint models
+from .models_imports import ImportCheckpoint, ExternalReference
+
+# Import export bookkeeping models
+from .models_exports import ExportWatermark, Tombstone, AdminExport
+
+# Import owner analytics models
+from .models_analytics import BusinessDailyStats, CounterDrain
@@ -0,0 +1,48 @@
+"""
+Per-business analytics for owners.
+Daily stats: one row per business and day with activity, holding that
+day's views and clicks, fed by the buffered counters (businesses.counters)
+and read by the owner analytics API as one (business, date) range scan.
+Counter drains: the shared Redis increments applied so far, so a drain
+interrupted after its database commit is never applied twice.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from businesses.models import Business
+
+
+class BusinessDailyStats(models.Model):
+    """Views and clicks of one business on one day"""
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField(_('date'))
+    views = models.PositiveIntegerField(_('views'), default=0)
+    clicks = models.PositiveIntegerField(_('clicks'), default=0)
+
+    class Meta:
+        verbose_name = _('Business Daily Stats')
+        verbose_name_plural = _('Business Daily Stats')
+        ordering = ['business', 'date']
+        constraints = [
+            # Also the index behind the per-business date range reads
+            models.UniqueConstraint(fields=['business', 'date'], name='unique_business_daily_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} on {self.date}: {self.views} views, {self.clicks} clicks"
+
+
+class CounterDrain(models.Model):
+    """One batch of shared counter increments applied to the database"""
+
+    drain_id = models.CharField(_('drain ID'), max_length=32, unique=True)
+    applied_at = models.DateTimeField(_('applied at'), auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('Counter Drain')
+        verbose_name_plural = _('Counter Drains')
+        ordering = ['-applied_at']
+
+    def __str__(self):
+        return f"Counter drain {self.drain_id} at {self.applied_at}"
@@ -0,0 +1,100 @@
+"""
+Stored duplicate analysis for the admin duplicate views.
+Scans run in the background and the admin pages only read the stored groups.
+"""
+
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from businesses.models import City
+
+User = get_user_model()
+
+
+class DuplicateScan(models.Model):
+    """One run of the duplicate analysis"""
+
+    STATUS_CHOICES = [
+        ('queued', _('Queued')),
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+        ('failed', _('Failed')),
+    ]
+
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='queued')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Results summary
+    businesses_scanned = models.PositiveIntegerField(_('businesses scanned'), default=0)
+    exact_groups = models.PositiveIntegerField(_('exact groups'), default=0)
+    name_groups = models.PositiveIntegerField(_('name groups'), default=0)
+    address_groups = models.PositiveIntegerField(_('address groups'), default=0)
+    error = models.TextField(_('error'), blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('finished at'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Duplicate Scan')
+        verbose_name_plural = _('Duplicate Scans')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Duplicate scan #{self.pk} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def duration(self):
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+    @classmethod
+    def latest_completed(cls):
+        return cls.objects.filter(status='completed').order_by('-finished_at').first()
+
+
+class DuplicateGroup(models.Model):
+    """A group of businesses the scan considers potential duplicates"""
+
+    TYPE_CHOICES = [
+        ('exact', _('Exact Match')),
+        ('name', _('Same Name')),
+        ('address', _('Same Address')),
+    ]
+
+    scan = models.ForeignKey(DuplicateScan, on_delete=models.CASCADE, related_name='groups')
+    group_type = models.CharField(_('type'), max_length=10, choices=TYPE_CHOICES)
+
+    # Group key (denormalized so the admin filters need no joins)
+    city = models.ForeignKey(City, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    city_name = models.CharField(_('city name'), max_length=100, blank=True)
+    country_code = models.CharField(_('country code'), max_length=2, blank=True)
+    name = models.CharField(_('business name'), max_length=200, blank=True)
+    address = models.TextField(_('address'), blank=True)
+
+    # Members, oldest first
+    count = models.PositiveIntegerField(_('count'), default=0)
+    business_ids = models.JSONField(_('business IDs'), default=list)
+    suspicious_pairs = models.JSONField(_('suspicious pairs'), default=list, blank=True)
+    distinct_values = models.JSONField(_('distinct values'), default=list, blank=True)
+
+    class Meta:
+        verbose_name = _('Duplicate Group')
+        verbose_name_plural = _('Duplicate Groups')
+        ordering = ['-count', 'id']
+        indexes = [
+            models.Index(fields=['scan', 'group_type', '-count']),
+            models.Index(fields=['scan', 'country_code']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_group_type_display()}: {self.name or self.address[:50]} ({self.count})"
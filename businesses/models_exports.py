@@ -0,0 +1,108 @@
+"""
+Bookkeeping for incremental exports.
+Watermarks: how far each export feed has got, so the next run only reads
+rows whose updated_at moved since.
+Tombstones: rows deleted from the exported tables, so feeds can tell their
+consumers what to drop.
+Admin exports: CSV files written in the background for the admin export
+page, with their progress.
+"""
+
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+
+User = get_user_model()
+
+
+class ExportWatermark(models.Model):
+    """Where an incremental export feed continues from"""
+
+    feed = models.CharField(_('feed'), max_length=50, unique=True)
+    # Rows updated (and deleted) before this moment have been exported
+    exported_until = models.DateTimeField(_('exported until'))
+
+    # Results of the last run
+    rows = models.PositiveIntegerField(_('rows'), default=0)
+    tombstones = models.PositiveIntegerField(_('tombstones'), default=0)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Export Watermark')
+        verbose_name_plural = _('Export Watermarks')
+        ordering = ['feed']
+
+    def __str__(self):
+        return f"{self.feed} (until {self.exported_until:%Y-%m-%d %H:%M:%S})"
+
+
+class Tombstone(models.Model):
+    """A deleted row of an exported table"""
+
+    model = models.CharField(_('model'), max_length=100)
+    object_id = models.CharField(_('object ID'), max_length=64)
+    deleted_at = models.DateTimeField(_('deleted at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Tombstone')
+        verbose_name_plural = _('Tombstones')
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.model}:{self.object_id}"
+
+
+class AdminExport(models.Model):
+    """A CSV export requested in the admin, written to a file in the background"""
+
+    STATUS_CHOICES = [
+        ('queued', _('Queued')),
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+        ('failed', _('Failed')),
+    ]
+
+    # 'all', 'summary' or a country slug
+    export_type = models.CharField(_('export type'), max_length=50)
+    compressed = models.BooleanField(_('gzip compressed'), default=False)
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='queued')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Progress and result
+    rows = models.PositiveIntegerField(_('rows written'), default=0)
+    total_rows = models.PositiveIntegerField(_('total rows'), null=True, blank=True)
+    file_name = models.CharField(_('file name'), max_length=255, blank=True)
+    bytes = models.PositiveBigIntegerField(_('size in bytes'), default=0)
+    error = models.TextField(_('error'), blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('finished at'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Admin Export')
+        verbose_name_plural = _('Admin Exports')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Export #{self.pk} {self.export_type} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status in ('queued', 'running')
+
+    @property
+    def progress(self):
+        """Percentage done, or None while the total is unknown"""
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return None
+        return min(99, int(self.rows * 100 / self.total_rows))
@@ -0,0 +1,97 @@
+"""
+Bookkeeping for imports.
+Checkpoints: every partition (one city of one source) records how far it
+got, so an interrupted import can resume instead of starting again from zero.
+External references: which source record each business came from, so a
+re-sync only writes what changed.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from businesses.models import Business, City
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of one import partition"""
+
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+        ('failed', _('Failed')),
+    ]
+
+    source = models.CharField(_('source'), max_length=50)
+    partition = models.CharField(_('partition'), max_length=200)
+    city = models.ForeignKey(City, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    country_code = models.CharField(_('country code'), max_length=2, blank=True)
+
+    # Source rows already written; a resumed partition skips this many
+    offset = models.PositiveIntegerField(_('offset'), default=0)
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    # Results
+    rows_created = models.PositiveIntegerField(_('rows created'), default=0)
+    rows_updated = models.PositiveIntegerField(_('rows updated'), default=0)
+    rows_unchanged = models.PositiveIntegerField(_('rows unchanged'), default=0)
+    rows_duplicates = models.PositiveIntegerField(_('rows duplicates'), default=0)
+    worker = models.CharField(_('worker'), max_length=50, blank=True)
+    error = models.TextField(_('error'), blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('finished at'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Import Checkpoint')
+        verbose_name_plural = _('Import Checkpoints')
+        ordering = ['source', 'partition']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'partition'], name='unique_import_checkpoint_partition'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.partition} ({self.status}, offset {self.offset})"
+
+    @staticmethod
+    def partition_key(city):
+        """Stable partition name for a city ("PT/porto")"""
+        return f"{city.country.code}/{city.slug or city.pk}"
+
+
+class ExternalReference(models.Model):
+    """A business as known to an external source (OSM node, Google place).
+
+    ``content_hash`` is the hash of the data last imported from the source,
+    so a re-sync only writes records that changed. References not seen by a
+    complete run of their source are flagged ``stale``.
+    """
+
+    source = models.CharField(_('source'), max_length=20)
+    external_id = models.CharField(_('external ID'), max_length=255)
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='external_refs')
+    content_hash = models.CharField(_('content hash'), max_length=64)
+    stale = models.BooleanField(_('stale'), default=False)
+
+    # Timestamps
+    first_seen = models.DateTimeField(_('first seen'), auto_now_add=True)
+    last_seen = models.DateTimeField(_('last seen'))
+
+    class Meta:
+        verbose_name = _('External Reference')
+        verbose_name_plural = _('External References')
+        ordering = ['source', 'external_id']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id'], name='unique_external_reference'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'last_seen']),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.external_id}"
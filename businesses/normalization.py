@@ -0,0 +1,115 @@
+"""
+Canonical keys for duplicate detection.
+
+Phones, emails and addresses are stored as typed by users and importers, so
+"+351 22 123 4567" and "221234567" look different to the database. These
+helpers reduce them to canonical keys that are stored on Business and
+compared with plain indexed equality lookups.
+"""
+
+import re
+import unicodedata
+
+# ISO code -> (international calling code, national trunk prefix)
+COUNTRY_CALLING_CODES = {
+    'AT': ('43', '0'), 'BE': ('32', '0'), 'BG': ('359', '0'), 'HR': ('385', '0'),
+    'CY': ('357', ''), 'CZ': ('420', ''), 'DK': ('45', ''), 'EE': ('372', ''),
+    'FI': ('358', '0'), 'FR': ('33', '0'), 'DE': ('49', '0'), 'GR': ('30', ''),
+    'HU': ('36', '06'), 'IE': ('353', '0'), 'IT': ('39', ''), 'LV': ('371', ''),
+    'LT': ('370', '8'), 'LU': ('352', ''), 'MT': ('356', ''), 'NL': ('31', '0'),
+    'PL': ('48', ''), 'PT': ('351', ''), 'RO': ('40', '0'), 'SK': ('421', '0'),
+    'SI': ('386', '0'), 'ES': ('34', ''), 'SE': ('46', '0'),
+    'NO': ('47', ''), 'IS': ('354', ''), 'CH': ('41', '0'), 'GB': ('44', '0'),
+}
+
+# Common street-type abbreviations across EU languages
+ADDRESS_ABBREVIATIONS = {
+    'r': 'rua', 'av': 'avenida', 'avda': 'avenida', 'avd': 'avenida',
+    'pc': 'praca', 'pca': 'praca', 'lg': 'largo', 'tv': 'travessa', 'trav': 'travessa',
+    'bd': 'boulevard', 'bld': 'boulevard', 'blvd': 'boulevard', 'bvd': 'boulevard',
+    'str': 'strasse', 'pl': 'platz', 'rd': 'road', 'ave': 'avenue',
+    'sq': 'square', 'ln': 'lane', 'dr': 'drive', 'pza': 'plaza', 'cl': 'calle',
+}
+
+# Tokens that carry no information ("nº 5", "no. 5", "nr 5")
+ADDRESS_NOISE = {'n', 'no', 'nr', 'num', 'o'}
+
+MAX_ADDRESS_KEY_LENGTH = 255
+# E.164 numbers have at most 15 digits; longer keys are not phone numbers
+MAX_PHONE_DIGITS = 15
+# A trailing extension ("ext. 12", "x12", "#12") is not part of the number
+PHONE_EXTENSION = re.compile(r'\s*(?:ext\.?|extension|x|#)\s*\d+\s*$', re.IGNORECASE)
+
+
+def normalize_phone(phone, country_code=None):
+    """Return an E.164-style key ("+351221234567") for a phone number.
+
+    Numbers without an international prefix get the calling code of
+    ``country_code`` with the national trunk prefix removed. Numbers from an
+    unknown country are reduced to their digits. Extensions are dropped, and
+    a number longer than E.164 allows gets no key ('').
+    """
+    key = _phone_key(phone, country_code)
+    return key if len(key.lstrip('+')) <= MAX_PHONE_DIGITS else ''
+
+
+def _phone_key(phone, country_code):
+    if not phone:
+        return ''
+
+    phone = PHONE_EXTENSION.sub('', phone.strip())
+    digits = re.sub(r'\D', '', phone)
+    if not digits:
+        return ''
+
+    if phone.startswith('+'):
+        return f'+{digits}'
+    if digits.startswith('00'):
+        return f'+{digits[2:]}'
+
+    calling_code, trunk_prefix = COUNTRY_CALLING_CODES.get((country_code or '').upper(), (None, ''))
+    if calling_code is None:
+        return digits
+
+    # International number written without "+" (e.g. "351221234567")
+    if digits.startswith(calling_code) and len(digits) >= 11:
+        return f'+{digits}'
+
+    if trunk_prefix and digits.startswith(trunk_prefix):
+        digits = digits[len(trunk_prefix):]
+    return f'+{calling_code}{digits}'
+
+
+def normalize_email(email):
+    """Return a lowercased email key with the domain in punycode"""
+    email = (email or '').strip().lower()
+    if '@' not in email:
+        return email
+
+    local, _, domain = email.rpartition('@')
+    try:
+        domain = domain.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    return f'{local}@{domain}'
+
+
+def normalize_address(address):
+    """Return a tokenized address key ("rua santa catarina 112")"""
+    if not address:
+        return ''
+
+    text = unicodedata.normalize('NFKD', address.lower().replace('ß', 'ss'))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    tokens = []
+    for token in re.findall(r'[a-z0-9]+', text):
+        if token in ADDRESS_NOISE:
+            continue
+        token = ADDRESS_ABBREVIATIONS.get(token, token)
+        # German compounds: "Hauptstr." -> "hauptstrasse"
+        if token.endswith('str') and len(token) > 3:
+            token = f'{token}asse'
+        tokens.append(token)
+
+    return ' '.join(tokens)[:MAX_ADDRESS_KEY_LENGTH]
@@ -0,0 +1,155 @@
+"""
+Streaming readers for local OpenStreetMap extracts.
+
+Both readers yield ``(osm_id, latitude, longitude, tags)`` for the business
+nodes of a file one at a time, so memory stays flat whether the extract is a
+single town or a whole country. ``.osm.pbf`` files need pyosmium
+(``pip install osmium``); ``.osm``/``.osm.xml`` files (optionally gzip or
+bzip2 compressed) are read with the standard library.
+
+Only nodes are read, the same as the Overpass queries of collect_businesses.
+"""
+
+import bz2
+import gzip
+import math
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
+from .overpass import BUSINESS_TAGS
+
+# City grid cell size in degrees (~22 km north-south)
+GRID_CELL = 0.2
+KM_PER_DEGREE = 111.32
+
+
+def iter_extract_nodes(path):
+    """Business nodes of an extract, picking the reader from the file name"""
+    if str(path).endswith('.pbf'):
+        return iter_pbf_nodes(path)
+    return iter_xml_nodes(path)
+
+
+def iter_pbf_nodes(path):
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError('Reading .osm.pbf extracts needs pyosmium: pip install osmium') from e
+
+    # The key filter runs in C++, so untagged nodes never reach Python
+    processor = osmium.FileProcessor(str(path), osmium.osm.NODE).with_filter(
+        osmium.filter.KeyFilter(*BUSINESS_TAGS)
+    )
+    for node in processor:
+        if not node.location.valid():
+            continue
+        yield node.id, node.location.lat, node.location.lon, {tag.k: tag.v for tag in node.tags}
+
+
+def iter_xml_nodes(path):
+    path = str(path)
+    if path.endswith('.gz'):
+        file = gzip.open(path, 'rb')
+    elif path.endswith('.bz2'):
+        file = bz2.open(path, 'rb')
+    else:
+        file = open(path, 'rb')
+
+    with file:
+        context = ET.iterparse(file, events=('start', 'end'))
+        _, root = next(context)
+        for event, element in context:
+            if event != 'end' or element.tag not in ('node', 'way', 'relation'):
+                continue
+            if element.tag == 'node':
+                tags = {tag.get('k'): tag.get('v') for tag in element.iter('tag')}
+                if any(key in tags for key in BUSINESS_TAGS) and element.get('lat') is not None:
+                    yield int(element.get('id')), float(element.get('lat')), float(element.get('lon')), tags
+            # Drop every finished element so the tree never grows
+            root.clear()
+
+
+class BoundingBox:
+    """Extent of the nodes read from an extract"""
+
+    def __init__(self):
+        self.south = self.west = math.inf
+        self.north = self.east = -math.inf
+
+    def add(self, latitude, longitude):
+        self.south, self.north = min(self.south, latitude), max(self.north, latitude)
+        self.west, self.east = min(self.west, longitude), max(self.east, longitude)
+
+    @property
+    def empty(self):
+        return self.south > self.north
+
+    def scope(self, prefix='business__'):
+        """Lookups for the businesses inside the box (stored rounded to 6 decimals)"""
+        def bounds(low, high):
+            return Decimal(f'{low:.6f}') - Decimal('0.000001'), Decimal(f'{high:.6f}') + Decimal('0.000001')
+
+        return {
+            f'{prefix}latitude__range': bounds(self.south, self.north),
+            f'{prefix}longitude__range': bounds(self.west, self.east),
+        }
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Equirectangular distance; accurate enough at city scale"""
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return math.hypot(x, y) * 6371
+
+
+class CityLocator:
+    """Assign coordinates (and an optional addr:city) to the cities of a country.
+
+    An ``addr:city`` that matches a city name wins; otherwise the nearest city
+    within ``max_distance`` km is used. Cities are kept in a grid of
+    ``GRID_CELL`` degree cells, so a lookup only looks at nearby cities.
+    """
+
+    def __init__(self, cities, max_distance=15):
+        self.max_distance = max_distance
+        self.by_name = {}
+        self.grid = {}
+        for city in cities:
+            self.by_name.setdefault(city.name.casefold(), []).append(city)
+            if city.latitude is not None and city.longitude is not None:
+                lat, lng = float(city.latitude), float(city.longitude)
+                self.grid.setdefault(self.cell(lat, lng), []).append((lat, lng, city))
+
+    @staticmethod
+    def cell(latitude, longitude):
+        return math.floor(latitude / GRID_CELL), math.floor(longitude / GRID_CELL)
+
+    def locate(self, latitude, longitude, city_name=''):
+        named = self.by_name.get(city_name.strip().casefold()) if city_name else None
+        if named:
+            if len(named) == 1:
+                return named[0]
+            # Several cities share the name: take the closest one
+            return min(named, key=lambda city: self._distance(city, latitude, longitude))
+        return self.nearest(latitude, longitude)
+
+    def nearest(self, latitude, longitude):
+        row, col = self.cell(latitude, longitude)
+        rows = math.ceil(self.max_distance / KM_PER_DEGREE / GRID_CELL)
+        cos_lat = max(math.cos(math.radians(latitude)), 0.1)
+        cols = math.ceil(self.max_distance / (KM_PER_DEGREE * cos_lat) / GRID_CELL)
+
+        best, best_distance = None, self.max_distance
+        for r in range(row - rows, row + rows + 1):
+            for c in range(col - cols, col + cols + 1):
+                for lat, lng, city in self.grid.get((r, c), ()):
+                    distance = distance_km(latitude, longitude, lat, lng)
+                    if distance <= best_distance:
+                        best, best_distance = city, distance
+        return best
+
+    @staticmethod
+    def _distance(city, latitude, longitude):
+        if city.latitude is None or city.longitude is None:
+            return math.inf
+        return distance_km(latitude, longitude, float(city.latitude), float(city.longitude))
@@ -0,0 +1,314 @@
+"""
+Concurrent OpenStreetMap Overpass client with an on-disk response cache.
+
+Queries run on asyncio with a token-bucket rate limit shared by every call
+of a client, a bounded number of requests in flight and exponential-backoff
+retries. Processes share nothing, so a pool of N workers gives each client
+1/N of the budget (see import_sources.OSMSource). Responses the server cut
+short (a ``remark`` such as a query timeout) are retried and never cached.
+Every other response is stored under the SHA-256 of its query, so re-running an import
+(or iterating on the parsing) replays from disk without touching the network.
+Entries older than ``max_age`` seconds (OVERPASS_CACHE_MAX_AGE) are fetched
+again, and ``refresh=True`` skips the cache for reads but still rewrites it.
+With ``offline=True`` only the cache is used, whatever its age.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OVERPASS_URL = 'https://overpass-api.de/api/interpreter'
+RETRY_STATUSES = {429, 502, 503, 504}
+# Budget of one host: requests per second, burst and requests in flight
+OVERPASS_RATE = 1.0
+OVERPASS_BURST = 2
+OVERPASS_CONCURRENCY = 2
+
+# Tags collected as businesses, shared by every OSM importer
+BUSINESS_TAGS = {
+    'amenity': [
+        'restaurant', 'fast_food', 'cafe', 'pub', 'bar', 'hotel', 'pharmacy', 'bank', 'hospital',
+        'doctors', 'dentist', 'fuel', 'cinema', 'theatre', 'museum', 'university', 'school',
+        'fitness_centre', 'gym', 'nightclub', 'casino', 'atm', 'car_wash', 'taxi',
+    ],
+    'shop': [
+        'supermarket', 'clothes', 'shoes', 'bakery', 'hairdresser', 'beauty', 'convenience', 'mall',
+        'department_store', 'electronics', 'books', 'sports', 'jewelry', 'furniture', 'florist', 'hardware',
+    ],
+    'tourism': ['hotel', 'hostel', 'guest_house', 'attraction', 'museum', 'gallery'],
+    'office': ['lawyer', 'accountant', 'insurance', 'real_estate', 'employment_agency', 'it', 'architect', 'engineer'],
+}
+
+# OSM business type -> category name
+OSM_CATEGORY_MAPPING = {
+    'restaurant': 'Fine Dining Restaurants',
+    'fast_food': 'Fast Food Restaurants',
+    'cafe': 'Coffee Shops',
+    'pub': 'Pubs',
+    'bar': 'Cocktail Bars',
+    'hotel': 'Business Hotels',
+    'pharmacy': 'Pharmacies',
+    'bank': 'Banks',
+    'hospital': 'General Hospitals',
+    'doctors': 'Private Clinics',
+    'dentist': 'Dental Clinics',
+    'hairdresser': 'Hair Salons',
+    'beauty': 'Beauty Salons',
+    'shop': 'Department Stores',
+    'supermarket': 'Department Stores',
+    'clothes': 'Clothing Stores',
+    'shoes': 'Shoe Stores',
+    'bakery': 'Bakeries',
+    'fuel': 'Gas Stations',
+    'car_repair': 'Auto Repair Shops',
+    'cinema': 'Movie Theaters',
+    'theatre': 'Theaters',
+    'museum': 'Museums',
+    'university': 'Universities',
+    'school': 'Universities',
+    'fitness_centre': 'Fitness Centers',
+    'gym': 'Fitness Centers',
+    'nightclub': 'Nightclubs',
+    'casino': 'Casinos',
+    'atm': 'ATMs',
+    'car_wash': 'Car Wash',
+    'taxi': 'Taxi Services',
+}
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average, bursts up to ``capacity``"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = None
+        self.loop = None
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # The bucket outlives the event loop of one asyncio.run()
+            self.lock, self.loop = asyncio.Lock(), loop
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class OverpassClient:
+    """Fetch Overpass queries concurrently, caching raw responses on disk"""
+
+    def __init__(self, cache_dir=None, rate=OVERPASS_RATE, burst=OVERPASS_BURST, concurrency=OVERPASS_CONCURRENCY,
+                 max_retries=5, timeout=60, offline=False, max_age=None, refresh=False, url=OVERPASS_URL,
+                 transport=None):
+        self.cache_dir = Path(cache_dir or settings.OVERPASS_CACHE_DIR)
+        self.rate = rate
+        self.burst = burst
+        # One budget for every fetch_all() of this client
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.offline = offline
+        self.max_age = settings.OVERPASS_CACHE_MAX_AGE if max_age is None else max_age
+        self.refresh = refresh
+        self.url = url
+        # An httpx transport to send requests through (an httpx.MockTransport in tests)
+        self.transport = transport
+        self.stats = {'cache_hits': 0, 'fetched': 0, 'retries': 0, 'failed': 0}
+
+    @staticmethod
+    def query_key(query):
+        """Content address of a query (whitespace differences do not matter)"""
+        normalized = ' '.join(query.split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def cache_path(self, query):
+        key = self.query_key(query)
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def read_cache(self, query):
+        """The cached response, or None when missing, expired or refreshing (offline ignores age)"""
+        path = self.cache_path(query)
+        if not self.offline:
+            if self.refresh:
+                return None
+            try:
+                if self.max_age and time.time() - path.stat().st_mtime > self.max_age:
+                    return None
+            except FileNotFoundError:
+                return None
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write_cache(self, query, data):
+        """Write atomically so an interrupted run never leaves a partial file"""
+        path = self.cache_path(query)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    def fetch_all(self, queries):
+        """Fetch ``queries`` concurrently; returns responses in the same order.
+
+        A query that fails after all retries (or misses the cache offline)
+        returns None instead of failing the whole batch.
+        """
+        return asyncio.run(self._fetch_all(list(queries)))
+
+    def fetch(self, query):
+        return self.fetch_all([query])[0]
+
+    async def _fetch_all(self, queries):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            return await asyncio.gather(*[
+                self._fetch_one(client, self.bucket, semaphore, query) for query in queries
+            ])
+
+    async def _fetch_one(self, client, bucket, semaphore, query):
+        cached = self.read_cache(query)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        if self.offline:
+            self.stats['failed'] += 1
+            logger.warning("Overpass cache miss in offline mode: %s", self.query_key(query))
+            return None
+
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    response = await client.post(self.url, data={'data': query})
+                except httpx.HTTPError as e:
+                    response, error = None, str(e)
+                else:
+                    error = f'HTTP {response.status_code}'
+
+            if response is not None and response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict):
+                    error = 'response is not a JSON object'
+                    break
+                if not data.get('remark'):
+                    self.write_cache(query, data)
+                    self.stats['fetched'] += 1
+                    return data
+                # The server timed out or ran out of memory: the elements are partial
+                error = f"remark: {data['remark']}"
+            elif response is not None and response.status_code not in RETRY_STATUSES:
+                break
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, response))
+
+        self.stats['failed'] += 1
+        logger.error("Overpass query %s failed: %s", self.query_key(query), error)
+        return None
+
+    @staticmethod
+    def _backoff(attempt, response=None):
+        """Exponential backoff with jitter, honouring Retry-After when given"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return int(retry_after)
+        return min(60, 2 ** attempt) + random.uniform(0, 1)
+
+
+def build_business_query(latitude, longitude, radius=5000, timeout=25):
+    """Overpass query for business nodes within ``radius`` metres of a point"""
+    return build_area_query(f'around:{radius},{latitude},{longitude}', timeout)
+
+
+def build_area_query(area, timeout=25, limit=None):
+    """Overpass query for business nodes in ``area`` (an around: filter or a bbox).
+
+    With ``limit`` the server returns at most that many elements.
+    """
+    filters = '\n'.join(
+        f'  node["{key}"~"^({"|".join(values)})$"]({area});'
+        for key, values in BUSINESS_TAGS.items()
+    )
+    out = f'out center meta {limit};' if limit else 'out center meta;'
+    return f'[out:json][timeout:{timeout}];\n(\n{filters}\n);\n{out}'
+
+
+def build_bbox_query(south, west, north, east, timeout=25, limit=None):
+    """Overpass query for business nodes inside a bounding box"""
+    return build_area_query(f'{south:.6f},{west:.6f},{north:.6f},{east:.6f}', timeout, limit)
+
+
+def business_type(tags):
+    """The first amenity/shop/tourism/office value we collect, or None"""
+    for key, values in BUSINESS_TAGS.items():
+        if tags.get(key) in values:
+            return tags[key]
+    return None
+
+
+def build_address(tags, parts=('addr:housenumber', 'addr:street', 'addr:city', 'addr:postcode')):
+    """Build an address from OSM tags"""
+    return ', '.join(tags[part] for part in parts if part in tags)
+
+
+def parse_businesses(data, limit=None, address_parts=None):
+    """Turn an Overpass response into business dicts"""
+    businesses = []
+    for element in (data or {}).get('elements', []):
+        if limit is not None and len(businesses) >= limit:
+            break
+
+        tags = element.get('tags', {})
+        name = tags.get('name', '')
+        kind = business_type(tags)
+        if not name or not kind:
+            continue
+
+        # Get coordinates
+        if 'lat' in element and 'lon' in element:
+            lat, lon = element['lat'], element['lon']
+        elif 'center' in element:
+            lat, lon = element['center']['lat'], element['center']['lon']
+        else:
+            continue
+
+        businesses.append({
+            'osm_id': f"{element.get('type', 'node')}/{element.get('id')}",
+            'name': name,
+            'type': kind,
+            'latitude': lat,
+            'longitude': lon,
+            'address': build_address(tags, address_parts) if address_parts else build_address(tags),
+            'phone': tags.get('phone', ''),
+            'website': tags.get('website', ''),
+            'description': tags.get('description', ''),
+        })
+    return businesses
@@ -0,0 +1,267 @@
+"""
+Full-page cache for the anonymous directory pages.
+
+The SEO landing pages (views_seo) and the country/city pages are rendered
+from several aggregate queries, mostly for crawlers. Views decorated with
+``@cached_page`` are served from the 'pages' cache to anonymous GET/HEAD
+requests, keyed by path plus the query parameters the pages read (page
+number and category filter; tracking parameters share an entry).
+
+Entries are invalidated by tags rather than by expiry alone. A view calls
+``tag_page(request, *tags)`` as soon as it has resolved its objects, before
+it reads the data it shows:
+
+    tag_page(request, scope_tag(city=city))
+
+Every tag has a version in the cache, and an entry remembers the versions
+it was rendered under. Writing a business replaces the versions of
+``business:<pk>`` and of every listing it belongs to (its country, city,
+category, category in country, category in city and ``all``), after the
+transaction commits, so only the pages listing it miss. Business.save()
+and delete() go through the signals, Business.objects.bulk_upsert() calls
+invalidate_businesses() itself. Renaming or moving a country, city or
+category bumps the slug registry version (businesses.slug_registry), which
+every entry also remembers, so those rarer writes drop all pages.
+PAGE_CACHE_TIMEOUT bounds what no tag covers (view counters, bulk SQL).
+
+Hits, misses and stale entries are counted per view and process and added
+to shared counters in the cache every STATS_BATCH requests; see
+``python manage.py page_cache``.
+"""
+
+import atexit
+import functools
+import logging
+import threading
+import uuid
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from .slug_registry import slug_registry
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 900
+# Query parameters the cached pages render differently for
+VARY_ON = ('page', 'category')
+STATS_BATCH = 50
+OUTCOMES = ('hits', 'misses', 'stale')
+
+# Names of the decorated views, for the stats
+PAGE_VIEWS = []
+
+
+def page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT)
+
+
+def scope_tag(country=None, city=None, category=None):
+    """Tag of a business listing: ``all``, ``country:<pk>``, ``city:<pk>``, ``category:<pk>`` or ``category:<pk>/city:<pk>``..."""
+    place = f'city:{city.pk}' if city else f'country:{country.pk}' if country else None
+    if category and place:
+        return f'category:{category.pk}/{place}'
+    if category:
+        return f'category:{category.pk}'
+    return place or 'all'
+
+
+def business_tag(business):
+    return f'business:{business.pk}'
+
+
+def business_scope_tags(country_id, city_id, category_id):
+    """Tags of every listing a business in this country, city and category appears in"""
+    tags = ['all', f'country:{country_id}', f'city:{city_id}']
+    if category_id:
+        tags += [
+            f'category:{category_id}',
+            f'category:{category_id}/country:{country_id}',
+            f'category:{category_id}/city:{city_id}',
+        ]
+    return tags
+
+
+def tag_key(tag):
+    return f'tag:{tag}'
+
+
+def page_key(request):
+    params = [(name, request.GET[name]) for name in VARY_ON if request.GET.get(name)]
+    digest = md5(f'{request.path}?{urlencode(params)}'.encode()).hexdigest()
+    return f'page:{digest}'
+
+
+def tag_versions(tags):
+    """Current version of every tag, giving untagged ones a fresh version"""
+    cache = page_cache()
+    keys = {tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def tag_page(request, *tags):
+    """Record the tags of the page being rendered; call before reading the data it shows"""
+    if getattr(request, 'page_cache_tags', None) is not None:
+        request.page_cache_tags.update(tag_versions(tags))
+
+
+def invalidate(tags):
+    """Drop every cached page carrying one of ``tags``"""
+    # A new random version instead of incr(): a tag evicted and re-added never matches an old entry
+    page_cache().set_many({tag_key(tag): uuid.uuid4().hex for tag in set(tags)}, timeout=None)
+
+
+def invalidate_on_commit(tags):
+    tags = set(tags)
+    transaction.on_commit(lambda: invalidate(tags))
+
+
+def invalidate_businesses(rows):
+    """Invalidate the pages of ``(pk, city_id, category_id)`` businesses, after the transaction commits"""
+    from .models import City
+
+    rows = list(rows)
+    countries = dict(City.objects.filter(pk__in={city_id for _, city_id, _ in rows}).values_list('pk', 'country_id'))
+    tags = set()
+    for pk, city_id, category_id in rows:
+        tags.add(f'business:{pk}')
+        tags.update(business_scope_tags(countries.get(city_id), city_id, category_id))
+    invalidate_on_commit(tags)
+
+
+class PageCacheStats:
+    """Per-process hit/miss counts, added to shared cache counters in batches"""
+
+    def __init__(self, batch=STATS_BATCH):
+        self.batch = batch
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def record(self, view_name, outcome):
+        with self.lock:
+            key = (view_name, outcome)
+            self.counts[key] = self.counts.get(key, 0) + 1
+            if sum(self.counts.values()) < self.batch:
+                return
+            counts, self.counts = self.counts, {}
+        self.push(counts)
+
+    def push(self, counts):
+        cache = page_cache()
+        for (view_name, outcome), amount in counts.items():
+            key = f'stats:{view_name}:{outcome}'
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                # First count (or evicted); another worker may add it first
+                if not cache.add(key, amount, timeout=None):
+                    cache.incr(key, amount)
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        if counts:
+            self.push(counts)
+
+    def totals(self, view_names=None):
+        """``{view name: {hits, misses, stale}}`` from the shared counters"""
+        view_names = view_names or PAGE_VIEWS
+        keys = {f'stats:{name}:{outcome}': (name, outcome) for name in view_names for outcome in OUTCOMES}
+        stored = page_cache().get_many(keys)
+        totals = {name: dict.fromkeys(OUTCOMES, 0) for name in view_names}
+        for key, amount in stored.items():
+            name, outcome = keys[key]
+            totals[name][outcome] = amount
+        return totals
+
+    def reset(self, view_names=None):
+        view_names = view_names or PAGE_VIEWS
+        page_cache().delete_many([f'stats:{name}:{outcome}' for name in view_names for outcome in OUTCOMES])
+
+
+page_stats = PageCacheStats()
+
+
+@atexit.register
+def _flush_stats_at_exit():
+    if page_stats.counts:
+        try:
+            page_stats.flush()
+        except Exception:
+            logger.exception("Flushing page cache stats at exit failed")
+
+
+def is_fresh(entry):
+    if entry['registry'] != slug_registry.current_version():
+        return False
+    return page_cache().get_many([tag_key(tag) for tag in entry['tags']]) == {
+        tag_key(tag): version for tag, version in entry['tags'].items()
+    }
+
+
+def cacheable(request, response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        # The page carries a CSRF token of this visitor
+        return False
+    session = getattr(request, 'session', None)
+    return not (session is not None and session.modified)
+
+
+def cached_response(entry):
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def cached_page(view):
+    """Serve ``view`` from the page cache to anonymous visitors; pages that never call tag_page() are not stored"""
+    view_name = view.__name__
+    PAGE_VIEWS.append(view_name)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not cache_timeout() or request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        key = page_key(request)
+        entry = page_cache().get(key)
+        if entry is not None and is_fresh(entry):
+            page_stats.record(view_name, 'hits')
+            return cached_response(entry)
+        page_stats.record(view_name, 'misses' if entry is None else 'stale')
+
+        # Read before rendering: a write committed during the render leaves the entry stale, not wrong
+        registry_version = slug_registry.current_version()
+        request.page_cache_tags = {}
+        response = view(request, *args, **kwargs)
+        if request.page_cache_tags and request.method == 'GET' and cacheable(request, response):
+            page_cache().set(key, {
+                'content': response.content,
+                'status': response.status_code,
+                'headers': dict(response.items()),
+                'tags': request.page_cache_tags,
+                'registry': registry_version,
+            }, timeout=cache_timeout())
+        response['X-Page-Cache'] = 'miss'
+        return response
+
+    return wrapper
@@ -0,0 +1,386 @@
+"""
+Staged ingestion pipeline.
+
+Every import runs through the same explicit stages:
+
+    fetch → parse → normalize → geo-assign → dedupe → load
+
+Sources plug in as adapters (businesses.pipeline_sources) that only know how
+to fetch raw pages and parse them into record dicts; everything after that
+is shared. Fetching runs in its own thread and hands pages over through a
+bounded queue, so network waits overlap with the database work without
+unbounded read-ahead. The other stages are chained generators (one item in
+flight) and the load stage writes in fixed-size batches.
+
+Each stage counts what it received, emitted and dropped (with reasons) and
+the time spent in its own work, so the slowest stage is visible instead of
+guessed.
+
+    pipeline = Pipeline(GooglePlacesAdapter(queries, countries=['NL']), owner)
+    pipeline.run()
+    pipeline.report()
+"""
+
+import math
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .external_refs import ExternalSync
+from .models import Business, City
+from .osm_extract import CityLocator
+
+PIPELINE_BATCH_SIZE = 500
+PIPELINE_QUEUE_SIZE = 64
+
+_DONE = object()
+
+
+def placeholder_email(name):
+    """The contact address listed for a business that has none of its own"""
+    safe_name = re.sub(r'[^a-zA-Z0-9]', '', name.lower())[:20]
+    return f'info.{safe_name}@example.com'
+
+
+def business_from_osm(place, city, category, owner):
+    """Unsaved Business for a place parsed from OSM (or a pipeline record, which has the same keys).
+
+    ``place`` needs ``name``, ``latitude`` and ``longitude``; a missing
+    email, address or description gets a placeholder built from the name,
+    the category and the city. Values are cut to the field lengths.
+    """
+    name = place['name'][:200]
+    return Business(
+        name=name,
+        slug=f"{slugify(name)[:40]}-{city.slug}",
+        description=place.get('description') or f"{name} - {category.name} in {city.name}, {city.country.name}",
+        email=place.get('email') or placeholder_email(name),
+        category=category,
+        city=city,
+        address=(place.get('address') or f"{city.name}, {city.country.name}")[:500],
+        postal_code=(place.get('postal_code') or '')[:20],
+        phone=(place.get('phone') or '')[:20],
+        website=(place.get('website') or '')[:200],
+        latitude=Decimal(f"{float(place['latitude']):.6f}"),
+        longitude=Decimal(f"{float(place['longitude']):.6f}"),
+        owner=owner,
+    )
+
+
+class StageStats:
+    """Counters and own time of one stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.received = 0
+        self.emitted = 0
+        self.seconds = 0.0
+        self.counters = Counter()
+
+    @property
+    def rate(self):
+        return self.received / self.seconds if self.seconds else 0
+
+
+class Stage:
+    """A pipeline step: ``process()`` turns one item into zero or more items"""
+
+    name = None
+
+    def __init__(self):
+        self.stats = StageStats(self.name)
+
+    def setup(self, pipeline):
+        self.pipeline = pipeline
+
+    def process(self, item):
+        raise NotImplementedError
+
+    def finish(self):
+        """Outputs still buffered when the input is exhausted"""
+        return ()
+
+    def run(self, items):
+        for item in items:
+            started = time.perf_counter()
+            outputs = list(self.process(item))
+            self.stats.seconds += time.perf_counter() - started
+            self.stats.received += 1
+            self.stats.emitted += len(outputs)
+            yield from outputs
+
+        started = time.perf_counter()
+        outputs = list(self.finish())
+        self.stats.seconds += time.perf_counter() - started
+        self.stats.emitted += len(outputs)
+        yield from outputs
+
+    def drop(self, reason):
+        self.stats.counters[reason] += 1
+        return ()
+
+
+class FetchStage(Stage):
+    """Pull pages from the adapter in a thread, through a bounded queue"""
+
+    name = 'fetch'
+
+    def __init__(self, queue_size=PIPELINE_QUEUE_SIZE):
+        super().__init__()
+        self.queue_size = queue_size
+
+    def run(self, items=None):
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                source = iter(self.pipeline.adapter.fetch())
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        page = next(source)
+                    except StopIteration:
+                        break
+                    finally:
+                        self.stats.seconds += time.perf_counter() - started
+                    self.stats.received += 1
+                    pages.put(page)
+                pages.put(_DONE)
+            except BaseException as e:
+                pages.put(e)
+
+        thread = threading.Thread(target=produce, name='pipeline-fetch', daemon=True)
+        thread.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is _DONE:
+                    break
+                if isinstance(page, BaseException):
+                    raise page
+                self.stats.emitted += 1
+                yield page
+        finally:
+            # Unblock the producer if the consumer stopped early
+            stop.set()
+            while thread.is_alive():
+                try:
+                    pages.get_nowait()
+                except queue.Empty:
+                    thread.join(0.1)
+
+
+class ParseStage(Stage):
+    """Raw page → record dicts"""
+
+    name = 'parse'
+
+    def process(self, page):
+        return self.pipeline.adapter.parse(page)
+
+
+class NormalizeStage(Stage):
+    """Clean up fields and drop records that cannot be listed"""
+
+    name = 'normalize'
+
+    def process(self, record):
+        name = ' '.join((record.get('name') or '').split())[:200]
+        if not name:
+            return self.drop('no name')
+        try:
+            latitude, longitude = float(record['latitude']), float(record['longitude'])
+        except (KeyError, TypeError, ValueError):
+            return self.drop('no location')
+        if not (math.isfinite(latitude) and math.isfinite(longitude)) or (latitude == 0 and longitude == 0):
+            return self.drop('no location')
+
+        record.update(
+            name=name,
+            latitude=Decimal(f'{latitude:.6f}'),
+            longitude=Decimal(f'{longitude:.6f}'),
+            address=' '.join((record.get('address') or '').split())[:500],
+            postal_code=(record.get('postal_code') or '').strip()[:20],
+            phone=(record.get('phone') or '').strip()[:20],
+            website=(record.get('website') or '').strip()[:200],
+            email=(record.get('email') or '').strip() or placeholder_email(name),
+            description=(record.get('description') or '').strip(),
+        )
+        return [record]
+
+
+class GeoAssignStage(Stage):
+    """Attach the city: the adapter's own city, an addr:city match or the nearest city"""
+
+    name = 'geo-assign'
+
+    def __init__(self, max_distance=15):
+        super().__init__()
+        self.max_distance = max_distance
+
+    def setup(self, pipeline):
+        super().setup(pipeline)
+        cities = City.objects.select_related('country')
+        if pipeline.adapter.countries:
+            cities = cities.filter(country__code__in=pipeline.adapter.countries)
+        cities = list(cities)
+        self.cities = {city.pk: city for city in cities}
+        self.locator = CityLocator(cities, max_distance=self.max_distance)
+
+    def process(self, record):
+        city = self.cities.get(record.get('city_id'))
+        if city is None:
+            city = self.locator.locate(
+                float(record['latitude']), float(record['longitude']), record.get('city_name', '')
+            )
+        if city is None:
+            return self.drop('no city')
+        record['city'] = city
+        return [record]
+
+
+class DedupeStage(Stage):
+    """Drop records seen earlier in this run (same external ID, or same name in the city)"""
+
+    name = 'dedupe'
+
+    def __init__(self):
+        super().__init__()
+        # Key -> external ID of the record that kept it
+        self.seen = {}
+        # External ID of a dropped record -> external ID of its survivor, linked after the load
+        self.aliases = {}
+
+    def process(self, record):
+        external_id = record.get('external_id')
+        keys = [('name', record['name'].casefold(), record['city'].pk)]
+        if external_id:
+            keys.append(('id', str(external_id)))
+        survivors = [self.seen[key] for key in keys if key in self.seen]
+        if survivors:
+            if external_id and survivors[0] and survivors[0] != str(external_id):
+                self.aliases[str(external_id)] = survivors[0]
+            return self.drop('duplicate')
+        self.seen.update(dict.fromkeys(keys, str(external_id) if external_id else None))
+        return [record]
+
+
+class LoadStage(Stage):
+    """Build businesses and write them in batches"""
+
+    name = 'load'
+
+    def __init__(self, owner, batch_size=PIPELINE_BATCH_SIZE, dry_run=False):
+        super().__init__()
+        self.owner = owner
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.batch = []
+
+    def setup(self, pipeline):
+        super().setup(pipeline)
+        adapter = pipeline.adapter
+        self.sync = ExternalSync(adapter.external_source, adapter.update_fields) if adapter.external_source else None
+
+    def process(self, record):
+        category = self.pipeline.adapter.category(record)
+        if category is None:
+            return self.drop('no category')
+        business = business_from_osm(record, record['city'], category, self.owner)
+        self.batch.append((record.get('external_id'), business))
+        if len(self.batch) >= self.batch_size:
+            return self.flush()
+        return ()
+
+    def finish(self):
+        return self.flush()
+
+    def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return []
+        with transaction.atomic():
+            if self.sync:
+                counts = self.sync.write(batch)
+            else:
+                counts = Business.objects.bulk_upsert(
+                    [business for _, business in batch], update_fields=self.pipeline.adapter.update_fields
+                )
+            if self.dry_run:
+                transaction.set_rollback(True)
+        self.stats.counters.update(counts)
+        if self.pipeline.on_batch:
+            self.pipeline.on_batch(self)
+        return [business for _, business in batch]
+
+
+class Pipeline:
+    """Run an adapter through fetch → parse → normalize → geo-assign → dedupe → load"""
+
+    def __init__(self, adapter, owner, batch_size=PIPELINE_BATCH_SIZE, queue_size=PIPELINE_QUEUE_SIZE,
+                 max_distance=15, dry_run=False, on_batch=None):
+        self.adapter = adapter
+        self.dry_run = dry_run
+        self.on_batch = on_batch
+        self.stages = [
+            FetchStage(queue_size),
+            ParseStage(),
+            NormalizeStage(),
+            GeoAssignStage(max_distance),
+            DedupeStage(),
+            LoadStage(owner, batch_size, dry_run),
+        ]
+        self.seconds = 0.0
+        self.stale = 0
+
+    @property
+    def load(self):
+        return self.stages[-1]
+
+    @property
+    def dedupe(self):
+        return self.stages[-2]
+
+    def run(self):
+        started = time.monotonic()
+        for stage in self.stages:
+            stage.setup(self)
+
+        items = None
+        for stage in self.stages:
+            items = stage.run(items)
+        for _ in items:
+            pass
+
+        if self.load.sync and not self.dry_run:
+            # Duplicates of this run are still at the source
+            self.load.sync.link_aliases(self.dedupe.aliases)
+        # Only the area a source read completely proves that unseen records are gone
+        scope = self.adapter.stale_scope()
+        if scope is not None and self.load.sync and not self.dry_run:
+            self.stale = self.load.sync.mark_stale(**scope)
+        self.seconds = time.monotonic() - started
+        return self
+
+    def report(self):
+        """One row per stage: name, received, emitted, own seconds, share of the run, counters"""
+        total = sum(stage.stats.seconds for stage in self.stages) or 1
+        return [
+            {
+                'stage': stage.name,
+                'received': stage.stats.received,
+                'emitted': stage.stats.emitted,
+                'seconds': stage.stats.seconds,
+                'share': stage.stats.seconds / total,
+                'rate': stage.stats.rate,
+                'counters': dict(stage.stats.counters),
+            }
+            for stage in self.stages
+        ]
@@ -0,0 +1,198 @@
+"""
+Source adapters for the staged ingestion pipeline.
+
+An adapter only fetches raw pages (``fetch()``, run in the pipeline's fetch
+thread, so it must not touch the database) and parses a page into record
+dicts (``parse()``). Normalizing, city assignment, deduplication and
+writing are shared pipeline stages.
+
+Record keys: ``name``, ``type``, ``latitude``, ``longitude`` and optionally
+``external_id``, ``address``, ``postal_code``, ``phone``, ``website``,
+``email``, ``description``, ``city_name`` (an address city to match) and
+``city_id`` (a city the source already knows).
+"""
+
+from itertools import islice
+
+from .models import Category
+from .osm_extract import BoundingBox, iter_extract_nodes
+from .overpass import (
+    OSM_CATEGORY_MAPPING, OverpassClient, build_address, build_business_query, business_type, parse_businesses,
+)
+
+# Pages handed to the fetch queue at once
+FETCH_BATCH = 16
+EXTRACT_PAGE_SIZE = 1000
+
+
+class SourceAdapter:
+    """Base class: fetch raw pages and parse them into records"""
+
+    name = None
+    # Source name of the external IDs (None: records have no stable ID)
+    external_source = None
+    # Fields refreshed on businesses that already exist ([] = insert only)
+    update_fields = ['address', 'phone', 'website', 'latitude', 'longitude']
+    # Whether a run reads everything the source has for ``countries``
+    complete = False
+
+    def __init__(self, countries=None):
+        self.countries = [code.upper() for code in countries or []]
+        self.categories = {}
+
+    def fetch(self):
+        raise NotImplementedError
+
+    def parse(self, page):
+        raise NotImplementedError
+
+    def category(self, record):
+        raise NotImplementedError
+
+    def stale_scope(self):
+        """Lookups of the references a finished run proves gone, or None to flag nothing"""
+        if not self.complete:
+            return None
+        return {'business__city__country__code__in': self.countries}
+
+
+class OSMCategoryMixin:
+    """Map OSM business types to categories like collect_businesses"""
+
+    def category(self, record):
+        kind = record['type']
+        if kind not in self.categories:
+            name = OSM_CATEGORY_MAPPING.get(kind)
+            category = Category.objects.filter(name=name).first() if name else None
+            # Fallback to first available category
+            self.categories[kind] = category or Category.objects.first()
+        return self.categories[kind]
+
+
+class GooglePlacesAdapter(SourceAdapter):
+    """Text searches on the Google Places API"""
+
+    name = 'google'
+    external_source = 'google'
+
+    def __init__(self, queries, countries=None, per_query=None, service=None, refresh=False):
+        super().__init__(countries)
+        from .google_places_service import GooglePlacesService
+        self.queries = list(queries)
+        self.per_query = per_query
+        self.service = service or GooglePlacesService(refresh=refresh)
+
+    def fetch(self):
+        queries = iter(self.queries)
+        while True:
+            batch = list(islice(queries, FETCH_BATCH))
+            if not batch:
+                return
+            # One concurrent, rate-limited batch of searches
+            yield from zip(batch, self.service.search_places_many(batch))
+
+    def parse(self, page):
+        query, places = page
+        for place in places[:self.per_query]:
+            parsed = self.service.parse_place_data(place)
+            if not parsed['is_operational']:
+                continue
+            yield {
+                'external_id': parsed['google_place_id'],
+                'name': parsed['name'],
+                'type': parsed['primary_type'],
+                'address': parsed['address'],
+                'phone': parsed['phone'],
+                'website': parsed['website'],
+                'email': '',
+                'description': parsed['description'],
+                'latitude': parsed['latitude'],
+                'longitude': parsed['longitude'],
+            }
+
+    def category(self, record):
+        kind = record['type']
+        if kind not in self.categories:
+            self.categories[kind] = self.service.map_google_type_to_category(kind)
+        return self.categories[kind]
+
+
+class OverpassAdapter(OSMCategoryMixin, SourceAdapter):
+    """Businesses around each city centre from the Overpass API"""
+
+    name = 'osm'
+    external_source = 'osm'
+
+    def __init__(self, cities, limit=60, countries=None, offline=False, concurrency=2, refresh=False):
+        super().__init__(countries)
+        # (pk, latitude, longitude) only: fetch() runs outside the database thread
+        self.cities = [(city.pk, float(city.latitude), float(city.longitude)) for city in cities]
+        self.limit = limit
+        self.client = OverpassClient(offline=offline, concurrency=concurrency, refresh=refresh)
+
+    def fetch(self):
+        cities = iter(self.cities)
+        while True:
+            batch = list(islice(cities, FETCH_BATCH))
+            if not batch:
+                return
+            responses = self.client.fetch_all(build_business_query(lat, lng) for _, lat, lng in batch)
+            for (city_id, _, _), data in zip(batch, responses):
+                yield city_id, data
+
+    def parse(self, page):
+        city_id, data = page
+        for place in parse_businesses(data, self.limit):
+            place['external_id'] = place.pop('osm_id')
+            place['city_id'] = city_id
+            yield place
+
+
+class OSMExtractAdapter(OSMCategoryMixin, SourceAdapter):
+    """A local .osm.pbf / .osm.xml extract of (part of) the given countries"""
+
+    name = 'extract'
+    external_source = 'osm'
+
+    def __init__(self, path, countries, complete=False):
+        super().__init__(countries)
+        self.path = path
+        # Whether the extract covers the whole countries, not only the area of its nodes
+        self.complete = complete
+        self.bbox = BoundingBox()
+
+    def fetch(self):
+        nodes = iter_extract_nodes(self.path)
+        while True:
+            page = list(islice(nodes, EXTRACT_PAGE_SIZE))
+            if not page:
+                return
+            yield page
+
+    def stale_scope(self):
+        if self.bbox.empty:
+            return None
+        if self.complete:
+            return super().stale_scope()
+        return {'business__city__country__code__in': self.countries, **self.bbox.scope()}
+
+    def parse(self, page):
+        for osm_id, latitude, longitude, tags in page:
+            self.bbox.add(latitude, longitude)
+            kind = business_type(tags)
+            if not kind:
+                continue
+            yield {
+                'external_id': f'node/{osm_id}',
+                'name': tags.get('name', ''),
+                'type': kind,
+                'address': build_address(tags),
+                'postal_code': tags.get('addr:postcode', ''),
+                'phone': tags.get('phone') or tags.get('contact:phone', ''),
+                'website': tags.get('website') or tags.get('contact:website', ''),
+                'email': tags.get('email') or tags.get('contact:email', ''),
+                'description': tags.get('description', ''),
+                'city_name': tags.get('addr:city', ''),
+                'latitude': latitude,
+                'longitude': longitude,
+            }
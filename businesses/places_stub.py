@@ -0,0 +1,148 @@
+"""
+Local stand-in for the Google Places (New) API.
+
+Serves deterministic fake places for ``places:searchText`` and
+``places/{id}`` on a local port, with optional latency and injected
+429/503 responses, so the Places client and import pipeline can be run and
+benchmarked without network access or API quota:
+
+    with PlacesStubServer(latency=0.05, error_rate=0.1) as stub:
+        client = GooglePlacesClient('stub-key', search_url=stub.search_url,
+                                    details_url=stub.details_url)
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_TYPES = ['restaurant', 'cafe', 'bar', 'hotel', 'pharmacy', 'bank', 'gym', 'bakery', 'dentist', 'lawyer']
+
+
+def stub_place(place_id, city='Lisboa', country='Portugal'):
+    """A fake place; the same ID always gives the same place"""
+    rng = random.Random(place_id)
+    primary_type = rng.choice(STUB_TYPES)
+    return {
+        'id': place_id,
+        'displayName': {'text': f"{primary_type.replace('_', ' ').title()} {place_id[-10:]}"},
+        'primaryType': primary_type,
+        'formattedAddress': f'Rua {rng.randint(1, 300)}, {rng.randint(1000, 9999)}-{rng.randint(100, 999)} {city}, {country}',
+        'location': {'latitude': 38.7 + rng.random() / 10, 'longitude': -9.2 + rng.random() / 10},
+        'nationalPhoneNumber': f'2{rng.randint(10000000, 99999999)}',
+        'websiteUri': f'https://example.com/{place_id}',
+        'businessStatus': 'OPERATIONAL',
+        'rating': round(rng.uniform(3, 5), 1),
+        'userRatingCount': rng.randint(0, 2000),
+        'editorialSummary': {'text': f'A {primary_type} in {city}.'},
+        'openingHours': {'weekdayDescriptions': ['Monday: 9:00 AM – 6:00 PM']},
+    }
+
+
+class PlacesStubServer:
+    """Threaded stub server; use as a context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def search_url(self):
+        return f'{self.url}/v1/places:searchText'
+
+    @property
+    def details_url(self):
+        return self.url + '/v1/places/{place_id}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def fail_next(self):
+        """Whether to answer this request with an injected error"""
+        with self.lock:
+            self.requests += 1
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, data, headers=None):
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def respond(self, build):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if not self.headers.get('X-Goog-Api-Key'):
+                    return self.send_json(403, {'error': {'message': 'API key missing'}})
+                if stub.fail_next():
+                    status = stub.rng.choice([429, 503])
+                    return self.send_json(status, {'error': {'code': status}}, {'Retry-After': '0'})
+                result = build()
+                if result is None:
+                    return self.send_json(404, {'error': {'message': 'Not found'}})
+                self.send_json(200, result)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.endswith('places:searchText'):
+                    return self.send_json(404, {'error': {'message': 'Not found'}})
+
+                def build():
+                    query = payload.get('textQuery', '')
+                    location = query.rsplit(' in ', 1)[-1]
+                    city, _, country = location.partition(', ')
+                    prefix = hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]
+                    return {'places': [
+                        stub_place(f'stub{prefix}{index:06d}', city, country or 'Portugal')
+                        for index in range(payload.get('maxResultCount', 20))
+                    ]}
+                self.respond(build)
+
+            def do_GET(self):
+                prefix = '/v1/places/'
+                if not self.path.startswith(prefix):
+                    return self.send_json(404, {'error': {'message': 'Not found'}})
+                self.respond(lambda: stub_place(self.path[len(prefix):]))
+
+        return Handler
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Business, Category, Country, City, Review
+from .normalization import normalize_email, normalize_phone
 
 
 class CountrySerializer(serializers.ModelSerializer):
@@ -124,18 +125,44 @@ class BusinessCreateSerializer(serializers.ModelSerializer):
     def validate_email(self, value):
         """Ensure unique email per city (preserving your duplicate prevention logic)"""
         city_id = self.initial_data.get('city_id')
-        if city_id and Business.objects.filter(email=value, city_id=city_id).exists():
+        email_key = normalize_email(value)
+        if city_id and email_key and Business.objects.filter(email_key=email_key, city_id=city_id).exists():
             raise serializers.ValidationError("A business with this email already exists in this city.")
         return value
 
     def validate_phone(self, value):
         """Ensure unique phone per city (preserving your duplicate prevention logic)"""
         city_id = self.initial_data.get('city_id')
-        if city_id and Business.objects.filter(phone=value, city_id=city_id).exists():
+        country_code = City.objects.filter(pk=city_id).values_list('country__code', flat=True).first() if city_id else None
+        phone_key = normalize_phone(value, country_code)
+        if city_id and phone_key and Business.objects.filter(phone_key=phone_key, city_id=city_id).exists():
             raise serializers.ValidationError("A business with this phone number already exists in this city.")
         return value
 
 
+class DuplicateCandidateSerializer(serializers.Serializer):
+    """One row of a bulk duplicate pre-check"""
+    name = serializers.CharField(max_length=200)
+    city_id = serializers.IntegerField()
+    email = serializers.CharField(max_length=254, required=False, allow_blank=True)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    exclude_id = serializers.UUIDField(required=False, allow_null=True)
+
+
+class DuplicateCheckSerializer(serializers.Serializer):
+    """Bulk duplicate pre-check request for partner uploads"""
+    MAX_ROWS = 10000
+    
+    businesses = DuplicateCandidateSerializer(many=True)
+    
+    def validate_businesses(self, value):
+        if not value:
+            raise serializers.ValidationError("Provide at least one business.")
+        if len(value) > self.MAX_ROWS:
+            raise serializers.ValidationError(f"At most {self.MAX_ROWS} businesses per request.")
+        return value
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Serializer for reviews"""
     reviewer_name = serializers.CharField(source='reviewer.get_full_name', read_only=True)
@@ -0,0 +1,56 @@
+"""
+Signal receivers of the businesses app.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Business, Category, City, Country, Tombstone
+from .page_cache import invalidate_businesses
+from .slug_registry import slug_registry
+
+
+# Connected per model: a receiver for every sender would stop Django from
+# fast-deleting rows of unrelated tables
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Business)
+def record_tombstone(sender, instance, **kwargs):
+    """Remember deleted rows of exported tables for incremental export feeds"""
+    Tombstone.objects.create(model=sender._meta.label_lower, object_id=str(instance.pk))
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Category)
+def invalidate_slug_registry(sender, **kwargs):
+    """Routable slugs changed: every process reloads its slug registry"""
+    slug_registry.invalidate()
+
+
+@receiver(pre_save, sender=Business)
+def remember_business_listing(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the city and category a business is moved out of, for invalidate_business_pages"""
+    instance._previous_listing = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'city', 'category'} & set(update_fields):
+        return
+    instance._previous_listing = sender.objects.filter(pk=instance.pk).values_list(
+        'pk', 'city_id', 'category_id'
+    ).first()
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+def invalidate_business_pages(sender, instance, **kwargs):
+    """Drop the cached pages showing this business, once the write commits"""
+    rows = [(instance.pk, instance.city_id, instance.category_id)]
+    previous = getattr(instance, '_previous_listing', None)
+    if previous and previous != rows[0]:
+        rows.append(previous)
+    invalidate_businesses(rows)
@@ -0,0 +1,114 @@
+"""
+In-memory registry of the slugs the smart URL routers resolve.
+
+/<slug>/ and /<slug>/<slug>/ can be a category, a country, a country/city
+or a category/country. The registry holds every category, every active
+country and every city by slug (and every country by code, for links and
+the flag manifest), so the routers resolve a URL without a
+query and hand the resolved objects to the views, which then skip their
+own lookups.
+
+The registry is loaded lazily (three queries) on the first resolve in each
+process. It is versioned: saving or deleting a category, country or city
+bumps a version number in the default cache (shared between the workers
+through files or Redis, see CACHES), and every process reloads when its
+version is behind. A process reads the shared version at most every
+VERSION_CHECK_INTERVAL seconds, so routing a request or rendering the flag
+slider usually touches neither the cache file nor Redis. Versions are random
+tokens written with set(), because the file cache's incr() and add() are not
+atomic between workers. Bulk writes bypass the signals, so commands that
+bulk-write slugs call invalidate() themselves, and a registry older than
+MAX_AGE is reloaded regardless.
+"""
+
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from .models import Category, City, Country
+
+VERSION_KEY = 'slug_registry:version'
+MAX_AGE = 300
+# Seconds a process trusts the shared version it last read
+VERSION_CHECK_INTERVAL = 5
+
+
+class SlugRegistry:
+    """Categories, active countries and cities by slug (and all countries by code), reloaded when the version moves"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.loaded_at = 0
+        # (shared version, monotonic time it was read)
+        self.checked = (None, 0)
+        self.categories = {}
+        self.countries = {}
+        self.cities = {}
+        # Every country, active or not, by upper-case code
+        self.countries_by_code = {}
+
+    def current_version(self):
+        version, checked_at = self.checked
+        if version is not None and time.monotonic() - checked_at < VERSION_CHECK_INTERVAL:
+            return version
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # First process after a cache flush: start a version everyone reads
+            cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(VERSION_KEY) or uuid.uuid4().hex
+        self.checked = (version, time.monotonic())
+        return version
+
+    def ensure_loaded(self):
+        version = self.current_version()
+        if version == self.version and time.monotonic() - self.loaded_at < MAX_AGE:
+            return
+        with self.lock:
+            if version != self.version or time.monotonic() - self.loaded_at >= MAX_AGE:
+                self.load(version)
+
+    def load(self, version):
+        categories = {category.slug: category for category in Category.objects.all()}
+        all_countries = list(Country.objects.all())
+        countries = {country.slug: country for country in all_countries if country.is_active}
+        countries_by_code = {country.code.upper(): country for country in all_countries}
+        by_id = {country.pk: country for country in countries.values()}
+        cities = {}
+        for city in City.objects.filter(country__is_active=True).exclude(slug=''):
+            # city.country without a query
+            city.country = by_id[city.country_id]
+            cities[(city.country_id, city.slug)] = city
+        # Swap in whole dicts: readers never see a half-loaded registry
+        self.categories, self.countries, self.cities = categories, countries, cities
+        self.countries_by_code = countries_by_code
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def category(self, slug):
+        self.ensure_loaded()
+        return self.categories.get(slug)
+
+    def country(self, slug):
+        self.ensure_loaded()
+        return self.countries.get(slug)
+
+    def country_by_code(self, code):
+        self.ensure_loaded()
+        return self.countries_by_code.get(code.upper())
+
+    def city(self, country, slug):
+        self.ensure_loaded()
+        return self.cities.get((country.pk, slug))
+
+    def invalidate(self):
+        """Make every process reload on its next version check (this one at once)"""
+        # A new random version instead of incr(): concurrent invalidations never cancel out
+        cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        self.version = None
+        self.checked = (None, 0)
+
+
+slug_registry = SlugRegistry()
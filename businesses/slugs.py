@@ -0,0 +1,103 @@
+"""
+Unique slug allocation.
+
+Finding a free slug with ``while ...exists(): counter += 1`` costs one query
+per taken suffix, so the 300th "Pingo Doce" needs 300 queries, and bulk
+inserts skip it altogether. A SlugAllocator instead loads the slugs taken
+for a whole batch of base slugs in at most two queries (exact bases, then
+the suffixes of the bases that collided) and hands out suffixes in memory.
+
+    allocator = SlugAllocator(Business.objects.all())
+    allocator.preload(slugify(business.name) for business in batch)
+    for business in batch:
+        business.slug = allocator.allocate(slugify(business.name))
+
+Scope the queryset to what the slug must be unique in, e.g.
+``City.objects.filter(country=country)``.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+# Bases per suffix query, to keep the OR of LIKEs reasonable
+PRELOAD_CHUNK = 200
+
+_FREE = object()
+
+
+class SlugAllocator:
+    """Hand out unique slugs within ``queryset``, remembering what it gave out"""
+
+    def __init__(self, queryset, field='slug', max_length=None):
+        self.queryset = queryset
+        self.field = field
+        self.max_length = max_length or queryset.model._meta.get_field(field).max_length
+        # slug -> primary key of the row holding it
+        self.taken = {}
+        self.loaded = set()
+        self.complete = False
+        self.next_suffix = {}
+
+    def load_all(self):
+        """Load every slug in the queryset, for commands that rewrite all of them"""
+        self.taken.update(self.queryset.values_list(self.field, 'pk').iterator(chunk_size=5000))
+        self.complete = True
+
+    def preload(self, bases):
+        """Load the taken slugs for ``bases`` (and their suffixes) in one go"""
+        bases = {self._trim(base) for base in bases if base} - self.loaded
+        if not bases or self.complete:
+            return
+        self.loaded |= bases
+
+        self.taken.update(self.queryset.filter(**{f'{self.field}__in': bases}).values_list(self.field, 'pk'))
+        collided = sorted(base for base in bases if base in self.taken)
+        for start in range(0, len(collided), PRELOAD_CHUNK):
+            chunk = collided[start:start + PRELOAD_CHUNK]
+            condition = reduce(or_, [Q(**{f'{self.field}__startswith': f'{base}-'}) for base in chunk])
+            self.taken.update(self.queryset.filter(condition).values_list(self.field, 'pk'))
+
+    def allocate(self, base, pk=None):
+        """Reserve and return a free slug for ``base``.
+
+        A slug already held by ``pk`` counts as free, so regenerating a row's
+        slug does not move it to a suffix because of itself.
+        """
+        base = self._trim(base)
+        self.preload([base])
+
+        if self._is_free(base, pk):
+            self.taken[base] = pk
+            return base
+
+        counter = self.next_suffix.get(base, 1)
+        while True:
+            suffix = f'-{counter}'
+            slug = f'{base[:self.max_length - len(suffix)]}{suffix}'
+            counter += 1
+            if self._is_free(slug, pk):
+                break
+        self.next_suffix[base] = counter
+        self.taken[slug] = pk
+        return slug
+
+    def release(self, slug, pk):
+        """Free a slug ``pk`` no longer holds (after giving it a new one)"""
+        if pk is not None and self.taken.get(slug, _FREE) == pk:
+            del self.taken[slug]
+
+    def _is_free(self, slug, pk):
+        holder = self.taken.get(slug, _FREE)
+        return holder is _FREE or (pk is not None and holder == pk)
+
+    def _trim(self, base):
+        return base[:self.max_length].strip('-') if self.max_length else base
+
+
+def unique_slug(queryset, base, pk=None, field='slug'):
+    """A free slug for one row (at most two queries, whatever the collisions)"""
+    if pk is not None:
+        queryset = queryset.exclude(pk=pk)
+    return SlugAllocator(queryset, field).allocate(base)
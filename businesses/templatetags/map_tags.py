@@ -27,17 +27,9 @@ def flag_slider(show_all=True):
     Render the infinite flag slider with all available countries
     Usage: {% flag_slider %} or {% flag_slider show_all=False %}
     """
-    countries = get_countries_with_flags()
-    
-    # Sort countries alphabetically, but put EU flag first
-    eu_flag = [c for c in countries if c['code'] == 'EU']
-    other_countries = sorted([c for c in countries if c['code'] != 'EU'], 
-                           key=lambda x: x['name'])
-    
-    all_countries = eu_flag + other_countries
-    
+    # EU flag first, then countries alphabetically (built once, see businesses.flag_manifest)
     return {
-        'countries': all_countries,
+        'countries': get_countries_with_flags(),
         'show_all': show_all,
     }
 
@@ -56,12 +48,8 @@ def country_url(country_code):
     Generate URL for country page using slug
     Usage: {{ country.code|country_url }}
     """
-    from businesses.models import Country
-    try:
-        country = Country.objects.get(code=country_code.upper())
-        return f'/{country.slug}/'
-    except Country.DoesNotExist:
-        return f'/country/{country_code.lower()}/'
+    from businesses.flag_manifest import flag_manifest
+    return flag_manifest.country_url(country_code)
 
 @register.filter 
 def city_url(city_slug):
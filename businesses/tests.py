@@ -0,0 +1,584 @@
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+import httpx
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .counters import CounterBuffer, RedisCounterBackend
+from .google_places_client import GooglePlacesClient
+from .google_places_config import MAX_RESULTS_PER_SEARCH
+from .merge import merge_businesses, resolve_merge_groups
+from .models import (
+    Business, Category, City, Country, CounterDrain, ExternalReference, Review, SimilarNameIndex,
+)
+from .normalization import normalize_address, normalize_email, normalize_phone
+from .overpass import OverpassClient, build_business_query, parse_businesses
+from .pipeline import business_from_osm
+from .places_stub import PlacesStubServer
+from .slugs import SlugAllocator, unique_slug
+
+QUERY = build_business_query(38.7223, -9.1393, radius=1000)
+
+OVERPASS_RESPONSE = {
+    'elements': [
+        {
+            'type': 'node', 'id': 1, 'lat': 38.71, 'lon': -9.14,
+            'tags': {'name': 'Café Central', 'amenity': 'cafe', 'addr:street': 'Rua Augusta',
+                     'addr:housenumber': '10', 'phone': '+351 21 000 0000'},
+        },
+        {
+            'type': 'way', 'id': 2, 'center': {'lat': 38.72, 'lon': -9.15},
+            'tags': {'name': 'Farmácia Lisboa', 'amenity': 'pharmacy'},
+        },
+        # No name: skipped
+        {'type': 'node', 'id': 3, 'lat': 38.7, 'lon': -9.1, 'tags': {'amenity': 'cafe'}},
+        # Not a business type we collect: skipped
+        {'type': 'node', 'id': 4, 'lat': 38.7, 'lon': -9.1, 'tags': {'name': 'Bench', 'amenity': 'bench'}},
+    ],
+}
+
+
+class OverpassClientTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        # Retries without sleeping
+        patcher = mock.patch.object(OverpassClient, '_backoff', return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def overpass(self, responses=(), **kwargs):
+        """A client whose requests get ``responses`` in turn; records the requests sent"""
+        self.requests = []
+        responses = list(responses)
+
+        def handler(request):
+            self.requests.append(request)
+            return responses.pop(0)
+
+        return OverpassClient(cache_dir=self.cache_dir.name, rate=1000, burst=10,
+                              transport=httpx.MockTransport(handler), **kwargs)
+
+    def test_offline_replays_the_cache(self):
+        self.overpass().write_cache(QUERY, OVERPASS_RESPONSE)
+
+        client = self.overpass(offline=True)
+        data, missing = client.fetch_all([QUERY, build_business_query(0, 0)])
+
+        self.assertEqual(data, OVERPASS_RESPONSE)
+        self.assertIsNone(missing)
+        self.assertEqual(self.requests, [])
+        self.assertEqual(client.stats, {'cache_hits': 1, 'fetched': 0, 'retries': 0, 'failed': 1})
+        self.assertEqual(parse_businesses(data), [
+            {
+                'osm_id': 'node/1', 'name': 'Café Central', 'type': 'cafe', 'latitude': 38.71, 'longitude': -9.14,
+                'address': '10, Rua Augusta', 'phone': '+351 21 000 0000', 'website': '', 'description': '',
+            },
+            {
+                'osm_id': 'way/2', 'name': 'Farmácia Lisboa', 'type': 'pharmacy', 'latitude': 38.72,
+                'longitude': -9.15, 'address': '', 'phone': '', 'website': '', 'description': '',
+            },
+        ])
+
+    def test_retries_then_caches(self):
+        client = self.overpass([
+            httpx.Response(503),
+            httpx.Response(429),
+            httpx.Response(200, json=OVERPASS_RESPONSE),
+        ])
+
+        self.assertEqual(client.fetch(QUERY), OVERPASS_RESPONSE)
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(client.stats, {'cache_hits': 0, 'fetched': 1, 'retries': 2, 'failed': 0})
+        self.assertEqual(client.read_cache(QUERY), OVERPASS_RESPONSE)
+
+    def test_gives_up_after_max_retries(self):
+        client = self.overpass([httpx.Response(503)] * 3, max_retries=2)
+
+        self.assertIsNone(client.fetch(QUERY))
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(client.stats, {'cache_hits': 0, 'fetched': 0, 'retries': 2, 'failed': 1})
+
+    def test_partial_response_is_retried_and_never_cached(self):
+        partial = dict(OVERPASS_RESPONSE, remark='runtime error: Query timed out in "query" at line 3')
+        client = self.overpass([httpx.Response(200, json=partial), httpx.Response(200, json=OVERPASS_RESPONSE)])
+
+        self.assertEqual(client.fetch(QUERY), OVERPASS_RESPONSE)
+        self.assertEqual(client.stats['retries'], 1)
+
+        client = self.overpass([httpx.Response(200, json=partial)] * 2, max_retries=1, refresh=True)
+        self.assertIsNone(client.fetch(QUERY))
+        self.assertEqual(client.stats, {'cache_hits': 0, 'fetched': 0, 'retries': 1, 'failed': 1})
+        # The cache still holds the last complete response
+        self.assertEqual(self.overpass(offline=True).read_cache(QUERY), OVERPASS_RESPONSE)
+
+    def test_non_json_response_fails_without_retrying(self):
+        for response in (httpx.Response(200, text='<html>Too busy</html>'), httpx.Response(200, json=[1, 2])):
+            client = self.overpass([response])
+
+            self.assertIsNone(client.fetch(QUERY))
+            self.assertEqual(len(self.requests), 1)
+            self.assertEqual(client.stats, {'cache_hits': 0, 'fetched': 0, 'retries': 0, 'failed': 1})
+            self.assertIsNone(self.overpass(offline=True).read_cache(QUERY))
+
+    def test_client_error_is_not_retried(self):
+        client = self.overpass([httpx.Response(400, text='parse error')])
+
+        self.assertIsNone(client.fetch(QUERY))
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(client.stats['failed'], 1)
+
+
+class GooglePlacesClientTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def places(self, stub, **kwargs):
+        return GooglePlacesClient('test-key', cache_dir=self.cache_dir.name, rate=1000, burst=10,
+                                  search_url=stub.search_url, details_url=stub.details_url, **kwargs)
+
+    def test_repeated_call_is_a_cache_hit(self):
+        with PlacesStubServer() as stub:
+            client = self.places(stub)
+            places = client.search('cafes in Lisbon, Portugal')
+            details = client.details(places[0]['id'])
+
+            self.assertEqual(client.search('cafes in Lisbon, Portugal'), places)
+            self.assertEqual(client.details(places[0]['id']), details)
+
+        self.assertEqual(len(places), MAX_RESULTS_PER_SEARCH)
+        self.assertEqual(details['id'], places[0]['id'])
+        self.assertEqual(stub.requests, 2)
+        self.assertEqual(client.stats, {'cache_hits': 2, 'fetched': 2, 'retries': 0, 'failed': 0})
+
+    def test_injected_errors_are_retried(self):
+        queries = [f'restaurants in City {index}, Portugal' for index in range(10)]
+        # Retry-After: 0 from the stub keeps the backoff short
+        with PlacesStubServer(error_rate=0.3, seed=1) as stub:
+            client = self.places(stub)
+            results = [client.search(query) for query in queries]
+
+        self.assertGreater(stub.errors, 0)
+        self.assertTrue(all(results))
+        self.assertEqual(stub.requests, len(queries) + stub.errors)
+        self.assertEqual(client.stats['retries'], stub.errors)
+        self.assertEqual(client.stats['failed'], 0)
+
+    def test_field_mask_is_part_of_the_cache_key(self):
+        query = 'pharmacies in Porto, Portugal'
+        with PlacesStubServer() as stub:
+            client = self.places(stub)
+            client.search(query, field_mask='places.id')
+            client.search(query, field_mask='places.id,places.displayName')
+            client.search(query, field_mask='places.id')
+
+        self.assertEqual(stub.requests, 2)
+        self.assertEqual(client.stats['cache_hits'], 1)
+        payload = json.dumps(client.search_payload(query), sort_keys=True)
+        self.assertNotEqual(client.cache_key('search', payload, 'places.id'),
+                            client.cache_key('search', payload, 'places.id,places.displayName'))
+        self.assertTrue(client.cache_path(client.cache_key('search', payload, 'places.id')).exists())
+
+
+class DirectoryTestCase(TestCase):
+    """A country, a city, a category and an owner to list businesses under"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user(
+            username='owner', email='owner@example.com', password='secret', first_name='Ana', last_name='Silva',
+        )
+        cls.country = Country.objects.create(name='Portugal', code='PT')
+        cls.city = City.objects.create(name='Lisbon', country=cls.country, latitude='38.722300', longitude='-9.139300')
+        cls.category = Category.objects.create(name='Coffee Shops', slug='coffee-shops')
+
+    def business_row(self, name, **fields):
+        return {
+            'name': name,
+            'description': f'{name} in Lisbon',
+            'email': f"{slugify(name)}@example.com",
+            'address': 'Rua Augusta 10, Lisboa',
+            'city': self.city,
+            'category': self.category,
+            'owner': self.owner,
+            **fields,
+        }
+
+    def create_business(self, name, **fields):
+        return Business.objects.create(**self.business_row(name, **fields))
+
+
+class BulkUpsertTests(DirectoryTestCase):
+    def test_counts(self):
+        skipped = []
+        counts = Business.objects.bulk_upsert([
+            self.business_row('Café Central', phone='21 000 0001'),
+            self.business_row('Pastelaria Nova'),
+            # Repeats a name of the batch: the last row wins
+            self.business_row('Pastelaria Nova', description='Pastries and coffee'),
+        ], skipped=skipped)
+
+        self.assertEqual(counts, {'created': 2, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'invalid': 0, 'merged': 1})
+        nova = Business.objects.get(name='Pastelaria Nova')
+        self.assertEqual(nova.description, 'Pastries and coffee')
+        self.assertEqual(nova.slug, 'pastelaria-nova')
+        self.assertEqual(Business.objects.get(name='Café Central').phone_key, '+351210000001')
+        self.assertEqual([pk for row, pk in skipped], [nova.pk])
+
+        skipped = []
+        counts = Business.objects.bulk_upsert([
+            self.business_row('Café Central', phone='21 000 0001'),
+            self.business_row('Pastelaria Nova', description='Now with brunch'),
+            # Another name with Café Central's phone number
+            self.business_row('Central Coffee', phone='+351 21 000 0001'),
+            self.business_row('No Email', email='not an email'),
+        ], skipped=skipped)
+
+        self.assertEqual(counts, {'created': 0, 'updated': 1, 'unchanged': 1, 'duplicates': 1, 'invalid': 1, 'merged': 0})
+        self.assertEqual(Business.objects.get(pk=nova.pk).description, 'Now with brunch')
+        self.assertFalse(Business.objects.filter(name__in=['Central Coffee', 'No Email']).exists())
+        central = Business.objects.get(name='Café Central')
+        self.assertEqual([(row.name, pk) for row, pk in skipped], [('No Email', None), ('Central Coffee', central.pk)])
+
+    def test_insert_only_leaves_existing_rows(self):
+        existing = self.create_business('Café Central')
+
+        counts = Business.objects.bulk_upsert(
+            [self.business_row('Café Central', description='Changed'), self.business_row('Café Novo')],
+            update_fields=[],
+        )
+
+        self.assertEqual(counts['created'], 1)
+        self.assertEqual(counts['unchanged'], 1)
+        self.assertEqual(Business.objects.get(pk=existing.pk).description, existing.description)
+
+
+class NormalizationTests(SimpleTestCase):
+    def test_phone_keys(self):
+        cases = [
+            (('+351 22 123 4567', 'PT'), '+351221234567'),
+            (('22 123 4567', 'PT'), '+351221234567'),
+            (('351221234567', 'PT'), '+351221234567'),
+            (('+1 (555) 010-9999', 'PT'), '+15550109999'),
+            # National trunk prefix
+            (('030 12345678', 'DE'), '+493012345678'),
+            (('06 1 234 5678', 'HU'), '+3612345678'),
+            # International "00" prefix
+            (('0049 30 12345678', 'PT'), '+493012345678'),
+            # Extensions are not part of the number
+            (('22 123 4567 ext. 12', 'PT'), '+351221234567'),
+            (('+44 20 7946 0000 x 305', None), '+442079460000'),
+            (('+351 22 123 4567 #9', None), '+351221234567'),
+            # Unknown country: digits only
+            (('22 123 4567', None), '221234567'),
+            # More than the 15 digits of E.164
+            (('0049 30 1234567890123', 'DE'), ''),
+            (('+351 22 123 4567 8901 23', 'PT'), ''),
+            (('', 'PT'), ''),
+            (('n/a', 'PT'), ''),
+        ]
+        for (phone, country_code), key in cases:
+            with self.subTest(phone=phone, country_code=country_code):
+                self.assertEqual(normalize_phone(phone, country_code), key)
+
+    def test_email_keys(self):
+        self.assertEqual(normalize_email(' Info@Café.PT '), 'info@xn--caf-dma.pt')
+        self.assertEqual(normalize_email('not an email'), 'not an email')
+
+    def test_address_keys(self):
+        cases = [
+            ('R. de Santa Catarina, nº 112', 'rua de santa catarina 112'),
+            ('Rua de Santa Catarina 112', 'rua de santa catarina 112'),
+            ('Av. da Liberdade 10', 'avenida da liberdade 10'),
+            ('Hauptstr. 5', 'hauptstrasse 5'),
+            ('Große Straße 1', 'grosse strasse 1'),
+            ('', ''),
+        ]
+        for address, key in cases:
+            with self.subTest(address=address):
+                self.assertEqual(normalize_address(address), key)
+        self.assertEqual(len(normalize_address('Rua ' * 100)), 255)
+
+
+class SlugAllocatorTests(DirectoryTestCase):
+    def test_suffixes_colliding_slugs(self):
+        for name in ['Pingo Doce', 'Pingo Doce Baixa', 'Pingo Doce Chiado']:
+            self.create_business(name, slug=slugify(name))
+        # Suffixes taken out of order
+        self.create_business('Pingo Doce Rossio', slug='pingo-doce-2')
+        self.create_business('Pingo Doce Alfama', slug='pingo-doce-4')
+
+        allocator = SlugAllocator(Business.objects.all())
+        with self.assertNumQueries(2):
+            allocator.preload(['pingo-doce', 'pingo-doce-baixa', 'cafe-central'])
+        with self.assertNumQueries(0):
+            slugs = [allocator.allocate(base) for base in
+                     ['pingo-doce', 'pingo-doce', 'pingo-doce', 'cafe-central', 'cafe-central', 'pingo-doce-baixa']]
+
+        self.assertEqual(slugs, ['pingo-doce-1', 'pingo-doce-3', 'pingo-doce-5',
+                                 'cafe-central', 'cafe-central-1', 'pingo-doce-baixa-1'])
+
+    def test_own_slug_is_free(self):
+        business = self.create_business('Pingo Doce', slug='pingo-doce')
+
+        allocator = SlugAllocator(Business.objects.all())
+        self.assertEqual(allocator.allocate('pingo-doce', pk=business.pk), 'pingo-doce')
+        self.assertEqual(allocator.allocate('pingo-doce'), 'pingo-doce-1')
+        self.assertEqual(unique_slug(Business.objects.all(), 'pingo-doce', pk=business.pk), 'pingo-doce')
+
+    def test_suffix_fits_max_length(self):
+        base = 'a' * 50
+        self.create_business('Long Name', slug=base)
+
+        self.assertEqual(SlugAllocator(Business.objects.all()).allocate(base), f"{'a' * 48}-1")
+
+
+class MergeBusinessesTests(DirectoryTestCase):
+    def review(self, business, reviewer):
+        return Review.objects.create(business=business, reviewer=reviewer, rating=5, title='Great', content='Great coffee')
+
+    def test_repoints_related_rows_and_sums_counters(self):
+        survivor = self.create_business('Café Central', views_count=10, clicks_count=1)
+        first = self.create_business('Cafe Central Lisboa', views_count=5, clicks_count=2)
+        second = self.create_business('Café Central Baixa', views_count=7, clicks_count=3)
+        other = get_user_model().objects.create_user(
+            username='reviewer', email='reviewer@example.com', password='secret', first_name='Rui', last_name='Costa',
+        )
+        kept = self.review(survivor, self.owner)
+        # The owner already reviewed the survivor: dropped
+        self.review(first, self.owner)
+        moved = self.review(second, other)
+        reference = ExternalReference.objects.create(
+            source='osm', external_id='node/1', business=first, content_hash='0' * 64, last_seen=timezone.now(),
+        )
+        subcategory = Category.objects.create(name='Bakeries', slug='bakeries', parent=self.category)
+        first.subcategories.add(subcategory)
+
+        groups = resolve_merge_groups([[survivor.pk, first.pk, second.pk]])
+        stats = merge_businesses(groups)
+
+        self.assertEqual(groups, [(str(survivor.pk), [str(first.pk), str(second.pk)])])
+        self.assertEqual(stats['groups'], 1)
+        self.assertEqual(stats['deleted'], 2)
+        self.assertEqual(stats['moved']['Reviews'], 1)
+        self.assertEqual(stats['dropped']['Reviews'], 1)
+        self.assertEqual(stats['moved']['External References'], 1)
+        self.assertEqual(stats['moved']['subcategory links'], 1)
+        self.assertEqual(list(Business.objects.values_list('pk', flat=True)), [survivor.pk])
+        self.assertEqual(set(survivor.reviews.values_list('pk', flat=True)), {kept.pk, moved.pk})
+        self.assertEqual(ExternalReference.objects.get(pk=reference.pk).business_id, survivor.pk)
+        self.assertEqual(list(survivor.subcategories.all()), [subcategory])
+        survivor.refresh_from_db()
+        self.assertEqual((survivor.views_count, survivor.clicks_count), (22, 6))
+
+    def test_dry_run_changes_nothing(self):
+        survivor = self.create_business('Café Central', views_count=10)
+        loser = self.create_business('Cafe Central Lisboa', views_count=5)
+        self.review(loser, self.owner)
+
+        stats = merge_businesses([(str(survivor.pk), [str(loser.pk)])], dry_run=True)
+
+        self.assertEqual(stats['deleted'], 1)
+        self.assertEqual(stats['moved']['Reviews'], 1)
+        self.assertEqual(Business.objects.count(), 2)
+        self.assertEqual(loser.reviews.count(), 1)
+        survivor.refresh_from_db()
+        self.assertEqual(survivor.views_count, 10)
+
+
+class FakeRedis:
+    """The part of redis.Redis the counter backend uses, in memory"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def hincrby(self, name, key, amount):
+        values = self.hashes.setdefault(name, {})
+        values[key.encode()] = values.get(key.encode(), 0) + amount
+
+    def hgetall(self, name):
+        return {key: str(amount).encode() for key, amount in self.hashes.get(name, {}).items()}
+
+    def lock(self, name, timeout=None):
+        return threading.Lock()
+
+    def scan_iter(self, match):
+        return [name.encode() for name in self.hashes if name.startswith(match.rstrip('*'))]
+
+    def exists(self, name):
+        return name in self.hashes
+
+    def rename(self, source, target):
+        self.hashes[target] = self.hashes.pop(source)
+
+    def delete(self, name):
+        self.hashes.pop(name, None)
+
+
+class CounterTests(DirectoryTestCase):
+    def setUp(self):
+        self.business = self.create_business('Café Central', views_count=10)
+
+    def buffer(self, **kwargs):
+        buffer = CounterBuffer(Business, fields=('views_count', 'clicks_count'), flush_interval=60, **kwargs)
+        # No flusher thread: the tests flush themselves
+        buffer.pid = os.getpid()
+        return buffer
+
+    def test_flush_adds_to_the_stored_counters(self):
+        buffer = self.buffer()
+        for _ in range(3):
+            buffer.increment(self.business.pk, 'views_count')
+        buffer.increment(self.business.pk, 'clicks_count', 2)
+        self.assertEqual(buffer.pending_count(self.business.pk, 'views_count'), 3)
+        # Another worker writes in between
+        Business.objects.filter(pk=self.business.pk).update(views_count=100)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(buffer.flush(), 2)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"views_count" = ("businesses_business"."views_count" + CASE', updates[0] + updates[1])
+        stored = Business.objects.get(pk=self.business.pk)
+        self.assertEqual((stored.views_count, stored.clicks_count), (103, 2))
+        self.assertEqual(stored.updated_at, self.business.updated_at)
+        self.assertEqual(buffer.pending, {})
+        self.assertEqual(buffer.flush(), 0)
+
+    def test_unknown_counter(self):
+        with self.assertRaises(ValueError):
+            self.buffer().increment(self.business.pk, 'rating')
+
+    def test_shared_increments_are_drained(self):
+        redis = FakeRedis()
+        buffer = self.buffer(backend=RedisCounterBackend(client=redis, key='counters'))
+        buffer.increment(self.business.pk, 'views_count', 4)
+
+        self.assertEqual(buffer.flush(), 1)
+
+        self.assertEqual(Business.objects.get(pk=self.business.pk).views_count, 14)
+        self.assertEqual(redis.hashes, {})
+        self.assertEqual(CounterDrain.objects.count(), 1)
+
+    def test_drain_is_never_applied_twice(self):
+        redis = FakeRedis()
+        backend = RedisCounterBackend(client=redis, key='counters')
+        buffer = self.buffer(backend=backend)
+        # A flusher committed drain "done" and died before deleting its hash
+        CounterDrain.objects.create(drain_id='done')
+        redis.hincrby('counters:draining:done', f'views_count:{self.business.pk}', 5)
+        # Another one died before committing drain "open"
+        redis.hincrby('counters:draining:open', f'views_count:{self.business.pk}', 7)
+
+        self.assertEqual(buffer.flush(), 1)
+
+        self.assertEqual(Business.objects.get(pk=self.business.pk).views_count, 17)
+        self.assertEqual(redis.hashes, {})
+        self.assertEqual(set(CounterDrain.objects.values_list('drain_id', flat=True)), {'done', 'open'})
+
+        redis.hincrby('counters:draining:open', f'views_count:{self.business.pk}', 7)
+        self.assertEqual(backend.apply_drain('counters:draining:open', 'open', buffer.apply), 0)
+        self.assertEqual(Business.objects.get(pk=self.business.pk).views_count, 17)
+        self.assertEqual(redis.hashes, {})
+
+
+OSM_EXTRACT = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="38.7101234" lon="-9.1401234">
+    <tag k="amenity" v="cafe"/><tag k="name" v="Café Central"/>
+    <tag k="addr:street" v="Rua Augusta"/><tag k="addr:housenumber" v="10"/><tag k="addr:postcode" v="1100-048"/>
+    <tag k="contact:email" v="ola@cafecentral.pt"/>
+  </node>
+  <node id="2" lat="38.72" lon="-9.15"><tag k="amenity" v="pharmacy"/><tag k="name" v="Farmácia Lisboa"/></node>
+  <node id="3" lat="38.72" lon="-9.15"><tag k="amenity" v="cafe"/></node>
+  <node id="4" lat="41.15" lon="-8.61"><tag k="amenity" v="cafe"/><tag k="name" v="Café do Porto"/></node>
+</osm>
+"""
+
+
+class OSMBusinessTests(DirectoryTestCase):
+    def test_business_from_osm_fills_placeholders(self):
+        place = {'name': 'Farmácia Lisboa', 'latitude': 38.7201234, 'longitude': -9.15,
+                 'address': '', 'phone': '', 'website': ''}
+
+        business = business_from_osm(place, self.city, self.category, self.owner)
+
+        self.assertEqual(business.slug, 'farmacia-lisboa-lisbon')
+        self.assertEqual(business.email, 'info.farmcialisboa@example.com')
+        self.assertEqual(business.address, 'Lisbon, Portugal')
+        self.assertEqual(business.description, 'Farmácia Lisboa - Coffee Shops in Lisbon, Portugal')
+        self.assertEqual(str(business.latitude), '38.720123')
+        self.assertEqual(business.owner, self.owner)
+
+    def test_load_extract_through_the_pipeline(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.osm', encoding='utf-8', delete=False) as file:
+            file.write(OSM_EXTRACT)
+        self.addCleanup(os.remove, file.name)
+
+        call_command('load_osm_extract', file.name, country='PT', owner='owner', stdout=StringIO())
+
+        self.assertEqual(sorted(Business.objects.values_list('name', flat=True)), ['Café Central', 'Farmácia Lisboa'])
+        central = Business.objects.get(name='Café Central')
+        self.assertEqual(central.email, 'ola@cafecentral.pt')
+        self.assertEqual(central.address, '10, Rua Augusta, 1100-048')
+        self.assertEqual(central.postal_code, '1100-048')
+        self.assertEqual(central.external_refs.get().external_id, 'node/1')
+
+        output = StringIO()
+        call_command('load_osm_extract', file.name, country='PT', owner='owner', stdout=output)
+        self.assertIn('Unchanged: 2', output.getvalue())
+
+
+class SimilarNameTests(DirectoryTestCase):
+    NAMES = [
+        'Café Central', 'Cafe Central Lisboa', 'Bar', 'Barca', 'Pastelaria Nova Lisboa', 'Nova Pastelaria Lisboa',
+        'Pingo Doce', 'Pingo Doce Baixa', 'Restaurante O Sol', 'Sol', 'Casa do Mar', 'Hotel Mar', '!!',
+    ]
+
+    def test_index_finds_what_a_full_scan_finds(self):
+        index = SimilarNameIndex()
+        for marker, name in enumerate(self.NAMES):
+            with self.subTest(name=name):
+                full = Business.match_similar_names(name, [signature for _, signature in index.signatures])
+                self.assertEqual(Business.match_similar_names(name, index.candidates(name)), full)
+            index.add(marker, name)
+
+        self.assertEqual(Business.match_similar_names('Barc', index.candidates('Barc')), ['Bar', 'Barca'])
+        self.assertNotIn(Business.name_signature('Hotel Mar'), index.candidates('Pingo Doce'))
+        self.assertEqual(index.candidates('Bar', exclude={3}), [Business.name_signature('Bar')])
+
+    def test_batch_check_reports_similar_names(self):
+        self.create_business('Pastelaria Nova Lisboa')
+
+        issues = Business.check_potential_duplicates([
+            {'name': 'Nova Pastelaria Lisboa', 'city': self.city},
+            {'name': 'Pingo Doce', 'city': self.city.pk},
+            {'name': 'Pingo Doce Sé', 'city': self.city},
+            # Six characters longer: not similar
+            {'name': 'Pingo Doce Baixa', 'city': self.city},
+        ])
+
+        self.assertEqual(issues, [
+            ['Similar names found: Pastelaria Nova Lisboa'],
+            [],
+            ['Similar names found: Pingo Doce'],
+            [],
+        ])
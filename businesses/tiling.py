@@ -0,0 +1,148 @@
+"""
+Adaptive quadtree crawl of city bounding boxes on the Overpass API.
+
+Every city starts as one bounding-box tile. A tile whose response hits the
+per-query cap is split into four and its children are queried again; a tile
+under the cap is complete, and an empty tile is simply a leaf. Dense centres
+are therefore crawled in small tiles while quiet suburbs cost one query.
+
+All tiles of one quadtree level (across every city) are fetched in a single
+concurrent OverpassClient batch. Nodes are deduplicated by OSM ID across
+tiles and cities; the first tile that returns a node keeps it.
+"""
+
+import math
+from collections import namedtuple
+
+from .overpass import build_bbox_query, parse_businesses
+
+TILE_CAP = 500
+MAX_DEPTH = 6
+KM_PER_DEGREE = 111.32
+
+
+class Tile(namedtuple('Tile', 'south west north east depth')):
+    """A bounding box at a quadtree depth"""
+
+    __slots__ = ()
+
+    def split(self):
+        mid_lat = (self.south + self.north) / 2
+        mid_lng = (self.west + self.east) / 2
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, mid_lat, mid_lng, depth),
+            Tile(self.south, mid_lng, mid_lat, self.east, depth),
+            Tile(mid_lat, self.west, self.north, mid_lng, depth),
+            Tile(mid_lat, mid_lng, self.north, self.east, depth),
+        ]
+
+    def area_km2(self):
+        cos_lat = math.cos(math.radians((self.south + self.north) / 2))
+        return (self.north - self.south) * (self.east - self.west) * cos_lat * KM_PER_DEGREE ** 2
+
+
+def city_radius_km(city):
+    """Half the side of a city's crawl box, growing with its population"""
+    if not city.population:
+        return 5
+    return min(25, max(3, math.sqrt(city.population) / 100))
+
+
+def city_tile(city, radius_km=None):
+    """Root tile: a square of ``2 * radius_km`` around the city centre"""
+    radius_km = radius_km or city_radius_km(city)
+    lat, lng = float(city.latitude), float(city.longitude)
+    dlat = radius_km / KM_PER_DEGREE
+    dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.1))
+    return Tile(lat - dlat, lng - dlng, lat + dlat, lng + dlng, 0)
+
+
+class CityCoverage:
+    """What the crawl of one city found and how complete it is"""
+
+    def __init__(self, city, root):
+        self.city = city
+        self.root = root
+        self.places = []
+        self.tiles = 0
+        self.splits = 0
+        self.empty = 0
+        self.max_depth = 0
+        # Leaf area that still hit the cap at MAX_DEPTH, or failed to fetch
+        self.truncated_km2 = 0.0
+        self.failed_km2 = 0.0
+        self.duplicates = 0
+
+    @property
+    def coverage(self):
+        """Share of the bounding box crawled completely (0..1)"""
+        total = self.root.area_km2()
+        if not total:
+            return 1.0
+        return max(0.0, 1 - (self.truncated_km2 + self.failed_km2) / total)
+
+
+class TileCrawler:
+    """Crawl cities tile by tile with an OverpassClient"""
+
+    def __init__(self, client, cap=TILE_CAP, max_depth=MAX_DEPTH, timeout=25):
+        self.client = client
+        self.cap = cap
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.seen = set()
+
+    def query(self, tile):
+        return build_bbox_query(tile.south, tile.west, tile.north, tile.east, self.timeout, self.cap)
+
+    def crawl(self, cities, radius_km=None, on_level=None):
+        """Crawl ``cities`` (with coordinates) and return one CityCoverage each.
+
+        ``on_level(depth, tiles)`` is called before each level is fetched.
+        """
+        coverages = []
+        frontier = []
+        for city in cities:
+            root = city_tile(city, radius_km)
+            coverage = CityCoverage(city, root)
+            coverages.append(coverage)
+            frontier.append((coverage, root))
+
+        depth = 0
+        while frontier:
+            if on_level:
+                on_level(depth, len(frontier))
+            responses = self.client.fetch_all(self.query(tile) for _, tile in frontier)
+
+            next_frontier = []
+            for (coverage, tile), data in zip(frontier, responses):
+                coverage.tiles += 1
+                coverage.max_depth = max(coverage.max_depth, tile.depth)
+                if data is None:
+                    coverage.failed_km2 += tile.area_km2()
+                    continue
+
+                elements = data.get('elements', [])
+                if len(elements) >= self.cap:
+                    if tile.depth < self.max_depth:
+                        # The children will find everything this tile returned
+                        coverage.splits += 1
+                        next_frontier.extend((coverage, child) for child in tile.split())
+                        continue
+                    coverage.truncated_km2 += tile.area_km2()
+                elif not elements:
+                    coverage.empty += 1
+                    continue
+
+                for place in parse_businesses(data):
+                    if place['osm_id'] in self.seen:
+                        coverage.duplicates += 1
+                        continue
+                    self.seen.add(place['osm_id'])
+                    coverage.places.append(place)
+
+            frontier = next_frontier
+            depth += 1
+
+        return coverages
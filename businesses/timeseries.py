@@ -0,0 +1,92 @@
+"""
+Daily view/click time series per business, for the owner analytics.
+
+The buffered counters (businesses.counters) pass every batch they write
+to add_daily_stats(), so BusinessDailyStats holds at most one row per
+business and day and nothing is derived from raw events. business_series()
+reads the longest window with one range scan of the (business, date)
+unique index and slices the shorter windows out of it.
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .counters import UPDATE_BATCH_SIZE, add_amounts
+from .models import Business, BusinessDailyStats
+
+SERIES_WINDOWS = (30, 90, 365)
+# Buffered counter field -> BusinessDailyStats column
+METRICS = {'views_count': 'views', 'clicks_count': 'clicks'}
+
+
+def add_daily_stats(increments, day=None, batch_size=UPDATE_BATCH_SIZE):
+    """Add ``{(counter field, business pk): amount}`` to the stats of ``day`` (default today).
+
+    Increments are dated when they are written, so a hit buffered just
+    before midnight can land on the next day.
+    """
+    day = day or timezone.localdate()
+    by_metric = {}
+    for (field, pk), amount in increments.items():
+        if field in METRICS and amount:
+            by_metric.setdefault(METRICS[field], {})[str(pk)] = amount
+    if not by_metric:
+        return
+
+    # Create the missing rows first, then add in place, so concurrent flushes never overwrite each other
+    pks = {pk for amounts in by_metric.values() for pk in amounts}
+    existing = Business.objects.filter(pk__in=pks).values_list('pk', flat=True)
+    BusinessDailyStats.objects.bulk_create(
+        [BusinessDailyStats(business_id=pk, date=day) for pk in existing],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    day_stats = BusinessDailyStats.objects.filter(date=day)
+    for metric, amounts in by_metric.items():
+        add_amounts(day_stats, metric, amounts, key='business_id', batch_size=batch_size)
+
+
+def merge_daily_stats(mapping):
+    """Add the daily stats of merged businesses (``{loser pk: survivor pk}``) to their survivors"""
+    by_day = {}
+    rows = BusinessDailyStats.objects.filter(business_id__in=list(mapping)).values_list(
+        'business_id', 'date', 'views', 'clicks'
+    )
+    for business_id, day, views, clicks in rows:
+        increments = by_day.setdefault(day, {})
+        survivor = mapping[str(business_id)]
+        for field, amount in (('views_count', views), ('clicks_count', clicks)):
+            increments[(field, survivor)] = increments.get((field, survivor), 0) + amount
+    for day, increments in by_day.items():
+        add_daily_stats(increments, day=day)
+
+
+def business_series(business_id, windows=SERIES_WINDOWS, today=None):
+    """``{days: {start, end, dates, views, clicks, total_views, total_clicks}}`` per window, zero-filled"""
+    today = today or timezone.localdate()
+    longest = max(windows)
+    first = today - timedelta(days=longest - 1)
+    stats = {
+        day: (views, clicks)
+        for day, views, clicks in BusinessDailyStats.objects.filter(
+            business_id=business_id, date__gte=first, date__lte=today
+        ).values_list('date', 'views', 'clicks')
+    }
+
+    dates = [first + timedelta(days=offset) for offset in range(longest)]
+    views = [stats.get(day, (0, 0))[0] for day in dates]
+    clicks = [stats.get(day, (0, 0))[1] for day in dates]
+
+    series = {}
+    for days in windows:
+        series[days] = {
+            'start': dates[-days].isoformat(),
+            'end': today.isoformat(),
+            'dates': [day.isoformat() for day in dates[-days:]],
+            'views': views[-days:],
+            'clicks': clicks[-days:],
+            'total_views': sum(views[-days:]),
+            'total_clicks': sum(clicks[-days:]),
+        }
+    return series
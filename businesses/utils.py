@@ -1,66 +1,21 @@
 # businesses/utils.py
-import os
-from django.conf import settings
-from django.contrib.staticfiles import finders
 from .models import Country
 
 def get_available_flags():
     """
-    Automatically detect available flag files in static/assets/flags/
-    Returns a list of country codes with available flags
+    Country codes of the flag files in static/assets/flags/
+    (listed once per process, see businesses.flag_manifest)
     """
-    flag_dir = os.path.join(settings.STATIC_ROOT or settings.BASE_DIR, 'static', 'assets', 'flags')
-    if not os.path.exists(flag_dir):
-        flag_dir = finders.find('assets/flags')
-        if not flag_dir:
-            return []
-    
-    available_flags = []
-    try:
-        for filename in os.listdir(flag_dir):
-            if filename.endswith('.png'):
-                country_code = filename.replace('.png', '').lower()
-                available_flags.append(country_code)
-    except (FileNotFoundError, TypeError):
-        # Fallback to known flags
-        available_flags = [
-            'at', 'be', 'bg', 'hr', 'cy', 'cz', 'dk', 'ee', 'fi', 'fr', 'de', 
-            'gr', 'hu', 'ie', 'it', 'lv', 'lt', 'lu', 'mt', 'nl', 'pl', 'pt', 
-            'ro', 'sk', 'si', 'es', 'se', 'eu'
-        ]
-    
-    return available_flags
+    from .flag_manifest import flag_manifest
+    return flag_manifest.available_flags()
 
 def get_countries_with_flags():
     """
-    Get all active EU countries with their flag information
+    Get all active EU countries with their flag information, EU flag first
+    (cached in businesses.flag_manifest, no queries per call)
     """
-    from .models import Country
-    
-    countries_with_flags = []
-    
-    # Add EU flag first
-    countries_with_flags.append({
-        'code': 'EU',
-        'name': 'European Union',
-        'slug': '',
-        'flag_url': 'assets/flags/eu.png'
-    })
-    
-    # Get all active countries in alphabetical order
-    countries = Country.objects.filter(is_active=True).order_by('name')
-    
-    for country in countries:
-        # Use country code in lowercase for flag filename
-        flag_code = country.code.lower()
-        countries_with_flags.append({
-            'code': country.code,
-            'name': country.name,
-            'slug': country.slug,
-            'flag_url': f'assets/flags/{flag_code}.png'
-        })
-    
-    return countries_with_flags
+    from .flag_manifest import flag_manifest
+    return flag_manifest.slider_countries()
 
 def get_map_coordinates(location_type, location_code):
     """
@@ -8,14 +8,19 @@ from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
 from django.db.models import Count
 from .models import Country, City, Business, Category
+from .page_cache import cached_page, scope_tag, tag_page
 
 
-def country_businesses(request, country_slug):
+@cached_page
+def country_businesses(request, country_slug, country=None):
     """
     Show all businesses in a country
     URL: /portugal/
+    (``country`` is passed in when the router has already resolved it)
     """
-    country = get_object_or_404(Country, slug=country_slug, is_active=True)
+    if country is None:
+        country = get_object_or_404(Country, slug=country_slug, is_active=True)
+    tag_page(request, scope_tag(country=country))
     
     # Get all businesses in this country
     businesses = Business.objects.filter(
@@ -85,13 +90,18 @@ def country_businesses(request, country_slug):
     return render(request, 'businesses/country_detail.html', context)
 
 
-def city_businesses(request, country_slug, city_slug):
+@cached_page
+def city_businesses(request, country_slug, city_slug, country=None, city=None):
     """
     Show all businesses in a specific city
     URL: /portugal/porto/
+    (``country`` and ``city`` are passed in when the router has already resolved them)
     """
-    country = get_object_or_404(Country, slug=country_slug, is_active=True)
-    city = get_object_or_404(City, slug=city_slug, country=country)
+    if country is None:
+        country = get_object_or_404(Country, slug=country_slug, is_active=True)
+    if city is None:
+        city = get_object_or_404(City, slug=city_slug, country=country)
+    tag_page(request, scope_tag(city=city))
     
     # Get all businesses in this city
     businesses = Business.objects.filter(
@@ -198,11 +208,13 @@ def city_businesses(request, country_slug, city_slug):
     return render(request, 'businesses/city_detail.html', context)
 
 
+@cached_page
 def country_list(request):
     """
     List all countries with business counts
     URL: /countries/
     """
+    tag_page(request, scope_tag())
     countries = Country.objects.filter(
         is_active=True,
         cities__businesses__verified=True
@@ -3,9 +3,8 @@
 Dynamic routing for single-slug URLs (categories vs countries)
 """
 
-from django.shortcuts import render, get_object_or_404
 from django.http import Http404
-from .models import Country, Category
+from .slug_registry import slug_registry
 from .views_seo import global_category_page
 from .views_country_city import country_businesses
 
@@ -20,21 +19,14 @@ def smart_single_slug_router(request, slug):
     3. Return 404 if neither
     """
     
-    # First, check if it's a category
-    try:
-        category = Category.objects.get(slug=slug)
-        # It's a valid category - use global_category_page view
-        return global_category_page(request, slug)
-    except Category.DoesNotExist:
-        pass
+    # Resolved from the in-memory slug registry, without queries
+    category = slug_registry.category(slug)
+    if category:
+        return global_category_page(request, slug, category_obj=category)
     
-    # Second, check if it's a country
-    try:
-        country = Country.objects.get(slug=slug, is_active=True)
-        # It's a valid country - use country_businesses view
-        return country_businesses(request, slug)
-    except Country.DoesNotExist:
-        pass
+    country = slug_registry.country(slug)
+    if country:
+        return country_businesses(request, slug, country=country)
     
     # If neither pattern matches, raise 404
-    raise Http404("Page not found")
\ No newline at end of file
+    raise Http404("Page not found")
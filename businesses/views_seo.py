@@ -8,13 +8,18 @@ from django.core.paginator import Paginator
 from django.http import Http404
 from django.db.models import Q, Count
 from .models import Business, Country, City, Category
+from .page_cache import business_tag, cached_page, scope_tag, tag_page
+from .slug_registry import slug_registry
 
-def global_category_page(request, category):
+@cached_page
+def global_category_page(request, category, category_obj=None):
     """Global category pages like /restaurants/ - High authority pages"""
-    try:
-        category_obj = Category.objects.get(slug=category)
-    except Category.DoesNotExist:
-        raise Http404("Category not found")
+    if category_obj is None:
+        try:
+            category_obj = Category.objects.get(slug=category)
+        except Category.DoesNotExist:
+            raise Http404("Category not found")
+    tag_page(request, scope_tag(category=category_obj))
     
     businesses = Business.objects.filter(category=category_obj).select_related('city', 'city__country')
     
@@ -46,10 +51,14 @@ def global_category_page(request, category):
     
     return render(request, 'businesses/seo/global_category.html', context)
 
-def category_country_businesses(request, category_slug, country_slug):
+@cached_page
+def category_country_businesses(request, category_slug, country_slug, category=None, country=None):
     """Category + Country pages like /restaurants/portugal/"""
-    category = get_object_or_404(Category, slug=category_slug)
-    country = get_object_or_404(Country, slug=country_slug)
+    if category is None:
+        category = get_object_or_404(Category, slug=category_slug)
+    if country is None:
+        country = get_object_or_404(Country, slug=country_slug)
+    tag_page(request, scope_tag(country=country, category=category))
     
     businesses = Business.objects.filter(
         category=category,
@@ -79,11 +88,14 @@ def category_country_businesses(request, category_slug, country_slug):
     
     return render(request, 'businesses/seo/category_country.html', context)
 
+@cached_page
 def category_country_city_businesses(request, category_slug, country_slug, city_slug, page=1):
     """Category + Country + City pages like /restaurants/portugal/porto/"""
     category = get_object_or_404(Category, slug=category_slug)
     country = get_object_or_404(Country, slug=country_slug)
     city = get_object_or_404(City, slug=city_slug, country=country)
+    # Also lists the other categories of the city
+    tag_page(request, scope_tag(city=city))
     
     businesses = Business.objects.filter(
         category=category,
@@ -115,10 +127,12 @@ def category_country_city_businesses(request, category_slug, country_slug, city_
     
     return render(request, 'businesses/seo/category_country_city.html', context)
 
+@cached_page
 def country_category_businesses(request, country_slug, category_slug):
     """Enhanced country category pages like /portugal/restaurants/"""
     country = get_object_or_404(Country, slug=country_slug)
     category = get_object_or_404(Category, slug=category_slug)
+    tag_page(request, scope_tag(country=country, category=category))
     
     businesses = Business.objects.filter(
         city__country=country,
@@ -148,11 +162,14 @@ def country_category_businesses(request, country_slug, category_slug):
     
     return render(request, 'businesses/seo/country_category.html', context)
 
+@cached_page
 def city_category_businesses(request, country_slug, city_slug, category_slug):
     """Enhanced city category pages like /portugal/porto/restaurants/"""
     country = get_object_or_404(Country, slug=country_slug)
     city = get_object_or_404(City, slug=city_slug, country=country)
     category = get_object_or_404(Category, slug=category_slug)
+    # Also lists the other cities of the country with this category
+    tag_page(request, scope_tag(country=country, category=category))
     
     businesses = Business.objects.filter(
         city=city,
@@ -187,6 +204,7 @@ def city_category_businesses(request, country_slug, city_slug, category_slug):
     
     return render(request, 'businesses/seo/city_category.html', context)
 
+@cached_page
 def business_detail_seo(request, country_slug, city_slug, category_slug, business_slug):
     """Enhanced business detail with full SEO path"""
     country = get_object_or_404(Country, slug=country_slug)
@@ -199,6 +217,7 @@ def business_detail_seo(request, country_slug, city_slug, category_slug, busines
         city=city,
         category=category
     )
+    tag_page(request, business_tag(business), scope_tag(city=city, category=category))
     
     # Related businesses in same category and city
     related_businesses = Business.objects.filter(
@@ -219,8 +238,10 @@ def business_detail_seo(request, country_slug, city_slug, category_slug, busines
     
     return render(request, 'businesses/seo/business_detail_seo.html', context)
 
+@cached_page
 def top_restaurants_europe(request):
     """SEO landing page for top restaurants"""
+    tag_page(request, scope_tag(category=slug_registry.category('restaurants')))
     restaurants = Business.objects.filter(
         category__slug='restaurants'
     ).select_related('city', 'city__country')[:50]
@@ -233,8 +254,10 @@ def top_restaurants_europe(request):
     
     return render(request, 'businesses/seo/top_restaurants_europe.html', context)
 
+@cached_page
 def best_tech_companies_europe(request):
     """SEO landing page for top tech companies"""
+    tag_page(request, scope_tag(category=slug_registry.category('technology')))
     tech_companies = Business.objects.filter(
         category__slug='technology'
     ).select_related('city', 'city__country')[:50]
@@ -247,8 +270,10 @@ def best_tech_companies_europe(request):
     
     return render(request, 'businesses/seo/best_tech_companies_europe.html', context)
 
+@cached_page
 def european_business_directory(request):
     """Main SEO landing page"""
+    tag_page(request, scope_tag())
     # Get statistics
     total_businesses = Business.objects.count()
     total_countries = Country.objects.filter(is_active=True).count()
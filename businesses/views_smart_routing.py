@@ -3,9 +3,8 @@
 Smart routing view that can distinguish between different URL patterns
 """
 
-from django.shortcuts import render, get_object_or_404
 from django.http import Http404
-from .models import Country, City, Category, Business
+from .slug_registry import slug_registry
 from .views_country_city import city_businesses
 from .views_seo import category_country_businesses
 
@@ -19,23 +18,16 @@ def smart_two_slug_router(request, first_slug, second_slug):
     2. category/country (e.g., /technology/belgium/)
     """
     
-    # First, check if it's a country/city combination
-    try:
-        country = Country.objects.get(slug=first_slug, is_active=True)
-        city = City.objects.get(slug=second_slug, country=country)
-        # It's a valid country/city - use city_businesses view
-        return city_businesses(request, first_slug, second_slug)
-    except (Country.DoesNotExist, City.DoesNotExist):
-        pass
+    # Resolved from the in-memory slug registry, without queries
+    country = slug_registry.country(first_slug)
+    city = slug_registry.city(country, second_slug) if country else None
+    if city:
+        return city_businesses(request, first_slug, second_slug, country=country, city=city)
     
-    # Second, check if it's a category/country combination
-    try:
-        category = Category.objects.get(slug=first_slug)
-        country = Country.objects.get(slug=second_slug, is_active=True)
-        # It's a valid category/country - use category_country_businesses view
-        return category_country_businesses(request, first_slug, second_slug)
-    except (Category.DoesNotExist, Country.DoesNotExist):
-        pass
+    category = slug_registry.category(first_slug)
+    country = slug_registry.country(second_slug) if category else None
+    if country:
+        return category_country_businesses(request, first_slug, second_slug, category=category, country=country)
     
     # If neither pattern matches, raise 404
-    raise Http404("Page not found")
\ No newline at end of file
+    raise Http404("Page not found")
@@ -4,6 +4,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, DetailView, TemplateView
 from django.contrib import messages
 from django.http import JsonResponse
+from businesses.counters import count_view
 from businesses.models import Business, Category, Country, City
 
 
@@ -99,9 +100,8 @@ class BusinessDetailView(DetailView):
     
     def get_object(self):
         business = super().get_object()
-        # Increment view count
-        business.views_count += 1
-        business.save(update_fields=['views_count'])
+        # Count the view (buffered, see businesses.counters)
+        count_view(business.pk)
         return business
 
 
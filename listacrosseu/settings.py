@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 import os
 from pathlib import Path
+
+import django
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -120,8 +122,16 @@ if DEBUG:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Parallel import workers wait for each other's writes instead of failing
+                'timeout': 30,
+            },
         }
     }
+    if django.VERSION >= (5, 1):
+        # Take the write lock at BEGIN, so a waiting writer honours the timeout
+        # instead of failing on a lock upgrade (older Django has no such option)
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
 else:
     DATABASES = {
         'default': {
@@ -183,6 +193,53 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Raw OpenStreetMap Overpass responses, replayed by re-runs of the importers
+OVERPASS_CACHE_DIR = env('OVERPASS_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'overpass'))
+# Seconds before a cached Overpass response is fetched again (0 = keep forever)
+OVERPASS_CACHE_MAX_AGE = int(env('OVERPASS_CACHE_MAX_AGE', default=24 * 3600))
+
+# Google Places responses, keyed by query or place ID and field mask
+GOOGLE_PLACES_CACHE_DIR = env('GOOGLE_PLACES_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'google_places'))
+# Seconds before a cached Places response is fetched again (0 = keep forever)
+GOOGLE_PLACES_CACHE_MAX_AGE = int(env('GOOGLE_PLACES_CACHE_MAX_AGE', default=7 * 24 * 3600))
+
+# Business view/click counters are buffered per worker and flushed this often (0 = write every hit)
+COUNTER_FLUSH_INTERVAL = int(env('COUNTER_FLUSH_INTERVAL', default=10))
+# Optional Redis URL to share the buffered counters between workers (needs the redis package)
+COUNTER_REDIS_URL = env('COUNTER_REDIS_URL', default='')
+
+# Caches: Redis when CACHE_URL is a redis:// URL (needs the redis package),
+# otherwise files under CACHE_DIR, which every worker on the host shares.
+# 'pages' holds the full-page cache of the directory pages (businesses.page_cache).
+CACHE_URL = env('CACHE_URL', default='')
+CACHE_DIR = env('CACHE_DIR', default=str(BASE_DIR / 'cache' / 'django'))
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'pages',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'default'),
+        },
+        'pages': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'pages'),
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        },
+    }
+# Seconds a cached page is served at most (0 disables the page cache)
+PAGE_CACHE_TIMEOUT = int(env('PAGE_CACHE_TIMEOUT', default=900))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
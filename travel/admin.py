@@ -12,7 +12,7 @@ from django.conf import settings
 
 from .models import (
     Tag, ArticleCategory, Article, ArticleBusinessFeature,
-    TravelItinerary, ItineraryDay, ItineraryStop, ArticleView
+    TravelItinerary, ItineraryDay, ItineraryStop, ArticleView, ArticleDailyStats
 )
 from .magicai_integration import MagicAIClient
 
@@ -360,6 +360,20 @@ class ArticleViewAdmin(admin.ModelAdmin):
         return False  # Views shouldn't be modified
 
 
+class ArticleDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['article', 'date', 'views', 'unique_ips']
+    list_filter = ['date']
+    search_fields = ['article__title']
+    date_hierarchy = 'date'
+    readonly_fields = ['article', 'date', 'views', 'unique_ips', 'top_referrers', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False  # Rolled up by the rollup_article_views command
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # Import the custom admin site from businesses app
 from businesses.admin import admin_site
 
@@ -370,4 +384,5 @@ admin_site.register(Article, ArticleAdmin)
 admin_site.register(TravelItinerary, TravelItineraryAdmin)
 admin_site.register(ItineraryDay, ItineraryDayAdmin)
 admin_site.register(ItineraryStop, ItineraryStopAdmin)
-admin_site.register(ArticleView, ArticleViewAdmin)
\ No newline at end of file
+admin_site.register(ArticleView, ArticleViewAdmin)
+admin_site.register(ArticleDailyStats, ArticleDailyStatsAdmin)
\ No newline at end of file
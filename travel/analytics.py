@@ -0,0 +1,204 @@
+"""
+Article view analytics.
+
+track_view does not write per request: views are appended to an in-process
+log and a flusher thread writes them every COUNTER_FLUSH_INTERVAL seconds
+as one bulk INSERT of ArticleView rows plus one F() update of the
+articles' view_count (see businesses.counters).
+
+A periodic job (``python manage.py rollup_article_views``) then
+
+- rolls the raw rows up into one ArticleDailyStats row per article and day
+  (views, unique IPs, top referrers), which is what reports read, and
+- compacts raw rows older than the retention window into one gzipped JSON
+  Lines file per day (Django fixture format, loadable with ``loaddata``)
+  and deletes them, so the ArticleView table stays a few months deep.
+"""
+
+import atexit
+import ipaddress
+import logging
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from businesses.counters import FLUSH_INTERVAL, CounterBuffer
+from businesses.exporting import EXPORT_CHUNK_SIZE, ExportFile, ExportTable
+
+from .models import Article, ArticleDailyStats, ArticleView
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 500
+TOP_REFERRERS = 5
+RETENTION_DAYS = 90
+# Rows kept in memory at most when flushes fail (the oldest go first)
+MAX_BUFFERED_VIEWS = 50000
+
+
+class ArticleViewLog(CounterBuffer):
+    """Buffered ArticleView rows and view_count increments, flushed together"""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_events=MAX_BUFFERED_VIEWS):
+        super().__init__(Article, fields=('view_count',), flush_interval=flush_interval)
+        self.events = []
+        self.max_events = max_events
+        # Rows thrown away because the buffer was full
+        self.dropped = 0
+
+    def record(self, article_id, ip_address, user_agent='', referrer=''):
+        try:
+            ip_address = str(ipaddress.ip_address(str(ip_address).strip()))
+        except ValueError:
+            # No row for an unusable address (it would fail the whole batch); the view still counts
+            ip_address = None
+        if ip_address is not None:
+            view = ArticleView(
+                article_id=article_id,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                referrer=referrer,
+                viewed_at=timezone.now(),
+            )
+            if not self.flush_interval:
+                view.save()
+            else:
+                with self.lock:
+                    self.ensure_flusher()
+                    self.events.append(view)
+                    self.trim()
+        self.increment(article_id, 'view_count')
+
+    def trim(self):
+        """Drop the oldest rows beyond max_events; call with the lock held"""
+        excess = len(self.events) - self.max_events
+        if excess > 0:
+            del self.events[:excess]
+            self.dropped += excess
+
+    def reset(self):
+        super().reset()
+        self.events = []
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+        try:
+            if events:
+                # Views of articles deleted since are dropped, not retried
+                existing = set(Article.objects.filter(
+                    pk__in={view.article_id for view in events}
+                ).values_list('pk', flat=True))
+                ArticleView.objects.bulk_create(
+                    [view for view in events if view.article_id in existing], batch_size=INSERT_BATCH_SIZE
+                )
+        except Exception:
+            with self.lock:
+                self.events[:0] = events
+                self.trim()
+            # The counts do not depend on the rows
+            super().flush()
+            raise
+        finally:
+            if self.dropped:
+                logger.warning("Article view buffer full: dropped %s views", self.dropped)
+                self.dropped = 0
+        return super().flush()
+
+
+article_views = ArticleViewLog(flush_interval=getattr(settings, 'COUNTER_FLUSH_INTERVAL', FLUSH_INTERVAL))
+
+
+@atexit.register
+def _flush_at_exit():
+    if article_views.events or article_views.pending:
+        try:
+            article_views.flush()
+        except Exception:
+            logger.exception("Flushing article views at exit failed")
+
+
+def day_bounds(day):
+    """[start, end) of a calendar day in the current time zone"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def views_on(day):
+    start, end = day_bounds(day)
+    return ArticleView.objects.filter(viewed_at__gte=start, viewed_at__lt=end)
+
+
+def rollup_day(day):
+    """(Re)compute the ArticleDailyStats of one day from the raw rows; returns the rows written"""
+    views = views_on(day)
+    totals = views.values('article_id').annotate(
+        views=Count('id'), unique_ips=Count('ip_address', distinct=True)
+    ).order_by()
+
+    referrers = {}
+    for article_id, referrer, count in views.exclude(referrer='').values_list(
+        'article_id', 'referrer'
+    ).annotate(count=Count('id')).order_by('article_id', '-count', 'referrer'):
+        top = referrers.setdefault(article_id, [])
+        if len(top) < TOP_REFERRERS:
+            top.append([referrer, count])
+
+    stats = [
+        ArticleDailyStats(
+            article_id=row['article_id'],
+            date=day,
+            views=row['views'],
+            unique_ips=row['unique_ips'],
+            top_referrers=referrers.get(row['article_id'], []),
+        )
+        for row in totals
+    ]
+    ArticleDailyStats.objects.bulk_create(
+        stats,
+        batch_size=INSERT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['article', 'date'],
+        update_fields=['views', 'unique_ips', 'top_referrers', 'updated_at'],
+    )
+    return len(stats)
+
+
+def compact_day(day, archive_dir, chunk_size=EXPORT_CHUNK_SIZE):
+    """Archive one day of raw rows to ``article_views_<day>.jsonl.gz`` and delete them.
+
+    The day is rolled up first, so its daily stats survive. Returns the
+    archive manifest entry, or None when the day has no raw rows.
+    """
+    # Rows written while the archive is made are left for the next run
+    last_id = views_on(day).order_by('-id').values_list('id', flat=True).first()
+    if last_id is None:
+        return None
+    rollup_day(day)
+
+    views = views_on(day).filter(id__lte=last_id)
+    os.makedirs(archive_dir, exist_ok=True)
+    table = ExportTable('article_views', views, [])
+    path = os.path.join(archive_dir, f'article_views_{day.isoformat()}.jsonl')
+    if os.path.exists(f'{path}.gz'):
+        # Never overwrite an earlier archive of the same day
+        path = os.path.join(archive_dir, f'article_views_{day.isoformat()}_{last_id}.jsonl')
+    with ExportFile(path, 'gzip') as output:
+        output.write_chunks(table.jsonl(chunk_size))
+
+    deleted, _ = views.delete()
+    if deleted != output.rows:
+        raise RuntimeError(f'{day}: archived {output.rows} views but deleted {deleted}')
+    return output.manifest()
+
+
+def compactable_days(retention_days=RETENTION_DAYS):
+    """Days with raw rows older than the retention window, oldest first"""
+    cutoff = day_bounds(timezone.localdate() - timedelta(days=retention_days))[0]
+    return [
+        timezone.localtime(moment).date()
+        for moment in ArticleView.objects.filter(viewed_at__lt=cutoff).datetimes('viewed_at', 'day')
+    ]
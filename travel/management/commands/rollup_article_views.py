@@ -0,0 +1,77 @@
+"""
+Roll up article views into daily stats and compact old raw views.
+
+Recomputes the ArticleDailyStats of the last few days from the raw
+ArticleView rows, then archives the raw rows older than the retention
+window to one gzipped JSON Lines file per day (loadable with loaddata) and
+deletes them. Run it daily from cron.
+
+    python manage.py rollup_article_views
+    python manage.py rollup_article_views --days 30 --skip-compaction
+    python manage.py rollup_article_views --retention-days 180 --archive-dir /backups/article_views
+"""
+
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from travel.analytics import RETENTION_DAYS, article_views, compact_day, compactable_days, rollup_day
+
+
+class Command(BaseCommand):
+    help = 'Roll up article views into daily stats and archive raw views past the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Recompute the daily stats of this many days, today included (default: 2)'
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=RETENTION_DAYS,
+            help=f'Keep raw views this many days (default: {RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=os.path.join('data_export', 'article_views'),
+            help='Directory for the compacted raw views (default: data_export/article_views)'
+        )
+        parser.add_argument(
+            '--skip-compaction',
+            action='store_true',
+            help='Only roll up, keep all raw views'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['retention_days'] < 1:
+            raise CommandError('--days and --retention-days must be at least 1')
+
+        # Views buffered by this process (none unless run in-process) land first
+        article_views.flush()
+
+        today = timezone.localdate()
+        self.stdout.write(f'📊 Rolling up article views of the last {options["days"]} days...')
+        for offset in range(options['days'] - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            articles = rollup_day(day)
+            self.stdout.write(f'  ✅ {day}: {articles} articles')
+
+        if options['skip_compaction']:
+            self.stdout.write(self.style.SUCCESS('✅ Rollup completed (compaction skipped)'))
+            return
+
+        days = compactable_days(options['retention_days'])
+        self.stdout.write(f'🗜️  Compacting {len(days)} days of raw views older than {options["retention_days"]} days...')
+        for day in days:
+            entry = compact_day(day, options['archive_dir'])
+            if entry:
+                self.stdout.write(
+                    f'  ✅ {day}: {entry["rows"]:,} views → {entry["path"]} ({entry["bytes"] / 1024:.1f} KB)'
+                )
+
+        self.stdout.write(self.style.SUCCESS('✅ Article view rollup completed successfully!'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('travel', '0003_add_article_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('unique_ips', models.PositiveIntegerField(default=0, verbose_name='unique IPs')),
+                ('top_referrers', models.JSONField(blank=True, default=list, verbose_name='top referrers')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'Article Daily Stats',
+                'verbose_name_plural': 'Article Daily Stats',
+                'ordering': ['-date', 'article'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='articleview',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='articleview',
+            index=models.Index(fields=['viewed_at'], name='travel_arti_viewed__136bc3_idx'),
+        ),
+        migrations.AddField(
+            model_name='articledailystats',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='travel.article'),
+        ),
+        migrations.AddIndex(
+            model_name='articledailystats',
+            index=models.Index(fields=['date'], name='travel_arti_date_eed293_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='articledailystats',
+            constraint=models.UniqueConstraint(fields=('article', 'date'), name='unique_article_daily_stats'),
+        ),
+    ]
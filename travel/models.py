@@ -386,7 +386,8 @@ class ArticleView(models.Model):
     ip_address = models.GenericIPAddressField()
     user_agent = models.TextField(blank=True)
     referrer = models.URLField(blank=True)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    # Set when the view happens, not when the buffered row is written
+    viewed_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         verbose_name = _('Article View')
@@ -394,9 +395,36 @@ class ArticleView(models.Model):
         indexes = [
             models.Index(fields=['article', 'viewed_at']),
             models.Index(fields=['ip_address', 'viewed_at']),
+            models.Index(fields=['viewed_at']),
         ]
 
 
+class ArticleDailyStats(models.Model):
+    """Daily view totals per article, rolled up from ArticleView rows"""
+    
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField(_('date'))
+    views = models.PositiveIntegerField(_('views'), default=0)
+    unique_ips = models.PositiveIntegerField(_('unique IPs'), default=0)
+    # [[referrer, views], ...] most frequent first
+    top_referrers = models.JSONField(_('top referrers'), default=list, blank=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Article Daily Stats')
+        verbose_name_plural = _('Article Daily Stats')
+        ordering = ['-date', 'article']
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'date'], name='unique_article_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.article} on {self.date}: {self.views} views"
+
+
 class ArticleImage(models.Model):
     """Images associated with travel articles"""
     
@@ -3,7 +3,8 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from .models import Article, ArticleView
+from .analytics import article_views
+from .models import Article
 import json
 
 
@@ -71,7 +72,7 @@ def article_detail(request, slug):
 def track_view(request, article_id):
     """Track article view for analytics"""
     try:
-        article = get_object_or_404(Article, id=article_id)
+        article = get_object_or_404(Article.objects.only('id'), id=article_id)
         
         # Get client IP
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -80,18 +81,14 @@ def track_view(request, article_id):
         else:
             ip = request.META.get('REMOTE_ADDR')
         
-        # Create view record
-        ArticleView.objects.create(
-            article=article,
-            ip_address=ip,
+        # Append the view to the buffered log (rows and view_count are written in batches)
+        article_views.record(
+            article.pk,
+            ip,
             user_agent=request.META.get('HTTP_USER_AGENT', '')[:200],
             referrer=request.META.get('HTTP_REFERER', '')[:200]
         )
         
-        # Update article view count
-        article.view_count += 1
-        article.save(update_fields=['view_count'])
-        
         return JsonResponse({'success': True})
         
     except Exception as e: